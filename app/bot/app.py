@@ -13,32 +13,89 @@ from app.bot.handlers.broadcast import setup_broadcast_handlers
 from app.bot.middlewares.concurrency import ConcurrencyConfig, ConcurrencyMiddleware
 from app.bot.middlewares.activity_log import ActivityLogMiddleware, LoggingController
 from app.bot.middlewares.user_tracker import UserTrackerMiddleware
+from app.bot.middlewares.api_calls import (
+    ApiCallCounter,
+    ApiCallStats,
+    ApiCallsPerUpdateMiddleware,
+)
 from app.config.settings import Settings
+from app.services.bot_identity import BotIdentity
+from app.services.cache import video_cache
+from app.services.deferred import deletion_scheduler
+from app.services.file_id_cache import file_id_cache
+from app.services.persistent_cache import PersistentCache
+from app.services.providers.base import VideoResult
+from app.services.user_language import user_language_storage
+from app.services.user_storage import user_storage
 from app.services.providers.tikwm import TikwmProvider
 from app.services.providers.ytdlp_local import YtDlpLocalProvider
+from app.services.singleflight import SingleFlight
+from app.services.spool import release_video
+from app.services.workspace import download_workspace
+from app.services.ytdlp_pool import YtDlpWorkerPool
 from app.services.providers.resolver import MultiProviderResolver
+from app.utils.net import aclose_http_client
 
 
 class BotApplication:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._session = AiohttpSession()
+        # Счетчик вызовов Bot API на апдейт - чтобы замечать лишние запросы
+        self._api_call_stats = ApiCallStats()
+        self._session.middleware(ApiCallCounter(self._api_call_stats))
         self._bot = Bot(settings.bot_token, session=self._session)
         self._dispatcher = Dispatcher()
+        self._dispatcher.update.outer_middleware(ApiCallsPerUpdateMiddleware(self._api_call_stats))
+        # Профиль бота запрашивается один раз и доступен обработчикам как bot_identity
+        self._bot_identity = BotIdentity()
+        self._dispatcher["bot_identity"] = self._bot_identity
         self._dispatcher.message.middleware(
             ConcurrencyMiddleware(ConcurrencyConfig(max_concurrent=20))
         )
         self._log_controller = LoggingController()
         self._dispatcher.message.middleware(ActivityLogMiddleware(self._log_controller))
         self._dispatcher.message.middleware(UserTrackerMiddleware())
+        self._ytdlp_pool = YtDlpWorkerPool(
+            max_workers=settings.ytdlp_workers,
+            max_jobs_per_worker=settings.ytdlp_max_jobs_per_worker,
+        )
         providers = [
-            YtDlpLocalProvider(timeout_sec=20.0),     # 1-й метод (основной)
-            TikwmProvider(timeout_sec=10.0),          # 2-й метод
+            YtDlpLocalProvider(                       # 1-й метод (основной)
+                timeout_sec=20.0,
+                pool=self._ytdlp_pool,
+                spool_max_bytes=settings.download_spool_max_bytes,
+            ),
+            TikwmProvider(                            # 2-й метод
+                base_url=settings.tikwm_api_base_url,
+                api_key=settings.tikwm_api_key,
+                timeout_sec=10.0,
+            ),
         ]
-        self._resolver = MultiProviderResolver(providers)
+        # Временные файлы скачиваний живут в отдельном каталоге с квотой
+        download_workspace.configure(
+            root=settings.download_dir, quota_bytes=settings.download_quota_bytes
+        )
+        # Дисковый уровень кэша: результаты переживают перезапуск
+        self._cache_store = PersistentCache("video_cache.sqlite3")
+        video_cache.attach_backend(self._cache_store)
+        self._resolver = MultiProviderResolver(
+            providers,
+            mode=settings.resolver_mode,  # type: ignore[arg-type]
+            hedge_delay_sec=settings.resolver_hedge_delay_sec,
+        )
+
+        # Общий для обработчика и админской статистики
+        self._video_flight: SingleFlight[VideoResult] = SingleFlight(on_release=release_video)
 
         self._dispatcher.include_router(start_router)
-        self._dispatcher.include_router(setup_admin_handlers(settings, self._log_controller))
+        self._dispatcher.include_router(setup_admin_handlers(
+            settings,
+            self._log_controller,
+            self._resolver,
+            self._api_call_stats,
+            self._video_flight,
+        ))
         
         # Сначала создаем рассылку, чтобы получить данные
         broadcast_router, broadcast_data = setup_broadcast_handlers(settings)
@@ -47,16 +104,48 @@ class BotApplication:
         self._dispatcher.include_router(broadcast_router)
         
         # Затем создаем TikTok с доступом к данным рассылки
-        self._dispatcher.include_router(setup_tiktok_handlers(self._resolver, broadcast_data))
+        self._dispatcher.include_router(setup_tiktok_handlers(
+            self._resolver,
+            broadcast_data,
+            progress_mode=settings.progress_mode,
+            video_flight=self._video_flight,
+        ))
 
     async def run(self) -> None:
+        # Прогрев кэша идет в фоне и не задерживает запуск поллинга
+        warmup = asyncio.create_task(self._cache_store.warm(video_cache))
+        # Процессы yt-dlp поднимаются заранее, чтобы первый запрос не ждал импорта
+        ytdlp_warmup = asyncio.create_task(self._ytdlp_pool.warm())
+        self._cache_store.start_compaction()
+        # Уборщик сразу удаляет хвосты прошлых запусков, затем работает периодически
+        download_workspace.start_janitor()
+        # Перенос пользователей из users.json (для SQLite) - при запуске, а не при импорте
+        await user_storage.open()
+        # Пользователи сохраняются пачками по таймеру, а не на каждое сообщение
+        user_storage.start_flusher()
+        file_id_cache.start_flusher()
+        # Журнал языков, накопленный с прошлого запуска, сжимается в снимок в фоне
+        user_language_storage.schedule_compaction()
         try:
-            me = await self._bot.get_me()
+            me = await self._bot_identity.get(self._bot)
+            self._bot_identity.start_refresh(self._bot)
             logging.getLogger(__name__).info("Authenticated as @%s (id=%s)", me.username, me.id)
             logging.getLogger(__name__).info("Starting long polling...")
             await self._dispatcher.start_polling(self._bot)
         finally:
+            # Оставшиеся статусные сообщения удаляем до закрытия сессии
+            await deletion_scheduler.aclose()
+            await self._bot_identity.aclose()
             await self._resolver.aclose()
+            await aclose_http_client()
+            warmup.cancel()
+            ytdlp_warmup.cancel()
+            await video_cache.flush()
+            await self._cache_store.aclose()
+            await download_workspace.aclose()
+            await user_storage.aclose()
+            await file_id_cache.aclose()
+            await user_language_storage.aclose()
             await self._bot.session.close()
 
 
@@ -1,17 +1,33 @@
 from __future__ import annotations
 
+import html
+
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
 
 from app.config.settings import Settings
 from app.bot.middlewares.activity_log import LoggingController
-from app.services.cache import video_cache
+from app.bot.middlewares.api_calls import ApiCallStats
+from app.services.cache import failed_video_cache, video_cache
+from app.services.deferred import deletion_scheduler
+from app.services.file_id_cache import file_id_cache
+from app.services.message_editor import status_edit_stats
+from app.services.providers.base import VideoResult
+from app.services.providers.resolver import MultiProviderResolver
 from app.services.localization import get_localization
+from app.services.singleflight import SingleFlight
 from app.services.user_language import user_language_storage
+from app.services.workspace import download_workspace
 
 
-def setup_admin_handlers(settings: Settings, controller: LoggingController) -> Router:
+def setup_admin_handlers(
+    settings: Settings,
+    controller: LoggingController,
+    resolver: MultiProviderResolver,
+    api_call_stats: ApiCallStats | None = None,
+    video_flight: SingleFlight[VideoResult] | None = None,
+) -> Router:
     router = Router()
 
     @router.message(Command("log"))
@@ -37,7 +53,127 @@ def setup_admin_handlers(settings: Settings, controller: LoggingController) -> R
         
         stats = video_cache.get_stats()
         video_cache.clear()
-        await message.answer(loc.get("cache_cleared", size=stats['size'], max_size=stats['max_size']))
+        failed_video_cache.clear()
+        lookups = stats["hits"] + stats["misses"]
+        await message.answer(
+            loc.get("cache_cleared", size=stats['size'], max_size=stats['max_size'])
+            + "\n"
+            + loc.get(
+                "cache_stats",
+                hits=stats["hits"],
+                misses=stats["misses"],
+                hit_rate=stats["hits"] / lookups * 100 if lookups else 0.0,
+                evictions=stats["evictions"],
+                expirations=stats["expirations"],
+            )
+        )
+
+    @router.message(Command("providers"))
+    async def provider_stats(message: Message) -> None:
+        if message.from_user is None or message.from_user.id not in set(settings.admin_ids):
+            return
+
+        # Получаем язык админа
+        user_language = user_language_storage.get_language(message.from_user.id)
+        loc = get_localization(user_language)
+
+        state_icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+        lines = [loc.get("providers_title")]
+        for i, stats in enumerate(resolver.get_stats(), start=1):
+            latency = stats["ewma_latency_sec"]
+            lines.append(
+                loc.get(
+                    "providers_item",
+                    index=i,
+                    icon=state_icons.get(stats["state"], "⚪"),
+                    name=stats["name"],
+                    latency=(
+                        loc.get("providers_seconds", value=latency) if latency is not None else "—"
+                    ),
+                    success=stats["ewma_success"] * 100,
+                    calls=stats["calls"],
+                    failures=stats["failures"],
+                    consecutive=stats["consecutive_failures"],
+                )
+            )
+            if stats["state"] != "closed":
+                lines.append(loc.get("providers_cooldown", cooldown=stats["cooldown_sec"]))
+            metrics = stats["metrics"]
+            if "reuse_ratio" in metrics:
+                lines.append(
+                    loc.get(
+                        "providers_http",
+                        requests=metrics["requests"],
+                        new_connections=metrics["new_connections"],
+                        reuse=metrics["reuse_ratio"] * 100,
+                        http2=", HTTP/2" if metrics["http2"] else "",
+                    )
+                )
+            if "retries" in metrics:
+                lines.append(
+                    loc.get(
+                        "providers_retries",
+                        retries=metrics["retries"],
+                        exhausted=metrics["retry_budget_exhausted"],
+                    )
+                )
+            if "warm_avg_sec" in metrics:
+                lines.append(
+                    loc.get(
+                        "providers_pool",
+                        busy=metrics["busy"],
+                        max_workers=metrics["max_workers"],
+                        jobs=metrics["jobs"],
+                        killed=metrics["killed"],
+                        recycled=metrics["recycled"],
+                        cold=metrics["cold_avg_sec"],
+                        cold_jobs=metrics["cold_jobs"],
+                        warm=metrics["warm_avg_sec"],
+                        warm_jobs=metrics["warm_jobs"],
+                        init=metrics["init_avg_sec"],
+                    )
+                )
+            if stats["last_error"]:
+                lines.append(
+                    loc.get("providers_last_error", error=html.escape(stats["last_error"]))
+                )
+
+        mb = 1024 * 1024
+        disk = download_workspace.get_stats()
+        free = disk["disk_free_bytes"]
+        lines.append(
+            loc.get(
+                "providers_downloads",
+                dirs=disk["active_dirs"],
+                reserved=disk["reserved_bytes"] / mb,
+                quota=disk["quota_bytes"] / mb,
+                used=disk["disk_used_bytes"] / mb,
+                free=loc.get("providers_disk_free", free=free / mb) if free is not None else "",
+                waiting=disk["waiting"],
+                waited=disk["waited"],
+                removed=disk["janitor_removed"],
+            )
+        )
+        if api_call_stats is not None:
+            api = api_call_stats.as_dict()
+            histogram = ", ".join(f"{k}: {v}" for k, v in api["histogram"].items())
+            lines.append(
+                loc.get(
+                    "providers_bot_api",
+                    avg=api["avg_per_update"],
+                    max_calls=api["max_per_update"],
+                    updates=api["updates"],
+                    background=api["background_calls"],
+                )
+            )
+            if histogram:
+                lines.append(f"   {html.escape(histogram)}")
+        if video_flight is not None:
+            lines.append(loc.get("providers_flights", **video_flight.get_stats()))
+        lines.append(loc.get("providers_file_ids", **file_id_cache.get_stats()))
+        lines.append(loc.get("providers_status_edits", **status_edit_stats.as_dict()))
+        lines.append(loc.get("providers_deletions", **deletion_scheduler.get_stats()))
+        await message.answer("\n".join(lines), parse_mode="HTML")
 
     return router
 
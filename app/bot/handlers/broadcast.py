@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
-from aiogram import Router
+from aiogram import Bot, Router
 from aiogram.filters import Command
 from aiogram.types import (
     CallbackQuery,
@@ -14,11 +15,46 @@ from aiogram.types import (
 )
 
 from app.config.settings import Settings
+from app.services.broadcaster import BroadcastEngine
 from app.services.user_storage import user_storage
 from app.services.localization import get_localization
 from app.services.user_language import user_language_storage
 
 
+async def _send_content(bot: Bot, chat_id: int, content_message: Message) -> None:
+    """Отправляет пользователю копию сообщения рассылки"""
+    if content_message.text:
+        await bot.send_message(chat_id, content_message.text, parse_mode="HTML")
+    elif content_message.photo:
+        await bot.send_photo(
+            chat_id,
+            content_message.photo[-1].file_id,
+            caption=content_message.caption,
+            parse_mode="HTML"
+        )
+    elif content_message.video:
+        await bot.send_video(
+            chat_id,
+            content_message.video.file_id,
+            caption=content_message.caption,
+            parse_mode="HTML"
+        )
+    elif content_message.document:
+        await bot.send_document(
+            chat_id,
+            content_message.document.file_id,
+            caption=content_message.caption,
+            parse_mode="HTML"
+        )
+    elif content_message.audio:
+        await bot.send_audio(
+            chat_id,
+            content_message.audio.file_id,
+            caption=content_message.caption,
+            parse_mode="HTML"
+        )
+
+
 def setup_broadcast_handlers(settings: Settings) -> tuple[Router, dict[int, dict[str, Any]]]:
     router = Router()
     logger = logging.getLogger(__name__)
@@ -229,12 +265,11 @@ def setup_broadcast_handlers(settings: Settings) -> tuple[Router, dict[int, dict
             await callback.answer("❌ Нет доступа", show_alert=True)
             return
 
-        users = user_storage.get_all_users()
-        user_count = len(users)
-        
-        # Подсчитываем статистику
-        with_username = sum(1 for u in users if u.username)
-        with_first_name = sum(1 for u in users if u.first_name)
+        await user_storage.flush()
+        stats = user_storage.get_stats()
+        user_count = stats["total"]
+        with_username = stats["with_username"]
+        with_first_name = stats["with_first_name"]
         
         stats_text = (
             f"📊 <b>Статистика пользователей</b>\n\n"
@@ -304,71 +339,33 @@ def setup_broadcast_handlers(settings: Settings) -> tuple[Router, dict[int, dict
             return
 
         content_message = _broadcast_data[admin_id]["content"]
-        users = user_storage.get_all_users()
-        
-        success_count = 0
-        error_count = 0
-        
-        logger.info("Начинаем рассылку для %d пользователей", len(users))
-
-        for user_info in users:
-            try:
-                if content_message.text:
-                    await bot.send_message(
-                        user_info.user_id,
-                        content_message.text,
-                        parse_mode="HTML"
-                    )
-                elif content_message.photo:
-                    await bot.send_photo(
-                        user_info.user_id,
-                        content_message.photo[-1].file_id,
-                        caption=content_message.caption,
-                        parse_mode="HTML"
-                    )
-                elif content_message.video:
-                    await bot.send_video(
-                        user_info.user_id,
-                        content_message.video.file_id,
-                        caption=content_message.caption,
-                        parse_mode="HTML"
-                    )
-                elif content_message.document:
-                    await bot.send_document(
-                        user_info.user_id,
-                        content_message.document.file_id,
-                        caption=content_message.caption,
-                        parse_mode="HTML"
-                    )
-                elif content_message.audio:
-                    await bot.send_audio(
-                        user_info.user_id,
-                        content_message.audio.file_id,
-                        caption=content_message.caption,
-                        parse_mode="HTML"
-                    )
-                
-                success_count += 1
-                
-                # Небольшая задержка между сообщениями
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                error_count += 1
-                logger.warning("Ошибка отправки пользователю %d: %s", user_info.user_id, e)
-                
-                # Если пользователь заблокировал бота, удаляем его
-                if "bot was blocked" in str(e).lower():
-                    user_storage.remove_user(user_info.user_id)
+
+        async def send(chat_id: int) -> None:
+            await _send_content(bot, chat_id, content_message)
+
+        async def recipients() -> AsyncIterator[int]:
+            # Пользователи читаются пачками, а не загружаются все разом
+            async for user_info in user_storage.iter_users():
+                yield user_info.user_id
+
+        engine = BroadcastEngine(
+            send,
+            rate_per_sec=settings.broadcast_rate_per_sec,
+            concurrency=settings.broadcast_concurrency,
+            # Заблокировавших бота удаляем из базы
+            on_blocked=user_storage.remove_user,
+        )
+        logger.info("Начинаем рассылку для %d пользователей", user_storage.get_user_count())
+        result = await engine.run(recipients())
 
         # Отправляем отчет админу
         try:
             await bot.send_message(
                 admin_id,
                 f"📢 <b>Рассылка завершена!</b>\n\n"
-                f"✅ Успешно отправлено: <b>{success_count}</b>\n"
-                f"❌ Ошибок: <b>{error_count}</b>\n"
-                f"👥 Всего получателей: <b>{len(users)}</b>",
+                f"✅ Успешно отправлено: <b>{result.sent}</b>\n"
+                f"❌ Ошибок: <b>{result.failed + result.blocked}</b>\n"
+                f"👥 Всего получателей: <b>{result.total}</b>",
                 parse_mode="HTML"
             )
         except Exception as e:
@@ -378,7 +375,12 @@ def setup_broadcast_handlers(settings: Settings) -> tuple[Router, dict[int, dict
         if admin_id in _broadcast_data:
             del _broadcast_data[admin_id]
 
-        logger.info("Рассылка завершена: %d успешно, %d ошибок", success_count, error_count)
+        logger.info(
+            "Рассылка завершена за %.1f с: %d успешно, %d ошибок, %d заблокировали, "
+            "повторов %d, пауз flood control %d",
+            result.elapsed_sec, result.sent, result.failed, result.blocked,
+            result.retries, result.flood_waits,
+        )
 
     @router.message(Command("broadcast_reset"))
     async def reset_broadcast_state(message: Message) -> None:
@@ -7,6 +7,7 @@ from aiogram.filters import CommandStart, Command
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, ChatMemberUpdated, CallbackQuery
 from aiogram.filters.chat_member_updated import ChatMemberUpdatedFilter, MEMBER, ADMINISTRATOR, CREATOR, KICKED
 
+from app.services.bot_identity import BotIdentity
 from app.services.localization import get_localization
 from app.services.user_language import user_language_storage
 
@@ -14,13 +15,13 @@ router = Router()
 
 
 @router.message(CommandStart())
-async def on_start(message: Message) -> None:
+async def on_start(message: Message, bot_identity: BotIdentity) -> None:
     # Получаем язык пользователя
     user_id = message.from_user.id if message.from_user else 0
     user_language = user_language_storage.get_language(user_id)
     loc = get_localization(user_language)
     
-    bot_info = await message.bot.get_me()
+    bot_info = await bot_identity.get(message.bot)
     bot_username = bot_info.username
     
     if message.chat.type in ["group", "supergroup"]:
@@ -2,27 +2,74 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
-import tempfile
+from typing import Any
 
 from aiogram import Router
 from aiogram.filters import Command
-from aiogram.types import Message, FSInputFile
+from aiogram.types import BufferedInputFile, FSInputFile, Message
 
-from app.services.providers.resolver import MultiProviderResolver
-from app.services.progress_bar import TikTokProgressBar
+from app.services.bot_identity import BotIdentity
+from app.services.cache import failed_video_cache, video_cache
+from app.services.file_id_cache import extract_file_id, file_id_cache
 from app.services.localization import get_localization
+from app.services.progress_bar import TikTokProgressBar
+from app.services.providers.base import VideoResult, download_progress
+from app.services.providers.errors import VideoTooLargeError, is_permanent
+from app.services.providers.resolver import MultiProviderResolver
+from app.services.singleflight import SingleFlight
+from app.services.spool import release_video
 from app.services.user_language import user_language_storage
-from app.utils.net import expand_url_if_short
-from app.utils.validators import extract_tiktok_url
+from app.utils.net import canonicalize_tiktok_url
+from app.utils.validators import canonical_link_key, extract_tiktok_url
 
 
-def setup_tiktok_handlers(resolver: MultiProviderResolver, broadcast_data: dict = None) -> Router:
+def _video_params(video: VideoResult) -> dict:
+    """Метаданные от провайдера, чтобы Telegram не определял их сам"""
+    params: dict = {"supports_streaming": True}
+    if video.duration:
+        params["duration"] = round(video.duration)
+    if video.width and video.height:
+        params["width"] = video.width
+        params["height"] = video.height
+    return params
+
+
+def setup_tiktok_handlers(
+    resolver: MultiProviderResolver,
+    broadcast_data: dict = None,
+    progress_mode: str = "fast",
+    video_flight: SingleFlight[VideoResult] | None = None,
+) -> Router:
     router = Router()
     logger = logging.getLogger("activity")
+    # В быстром режиме прогресс-бар обновляется в фоне и не задерживает скачивание
+    fast_progress = progress_mode == "fast"
+    # Одновременные запросы одного видео делят одно скачивание
+    if video_flight is None:
+        video_flight = SingleFlight(on_release=release_video)
+
+    async def resolve_video(video_key: str, url: str) -> VideoResult:
+        """Прямая ссылка из кэша, иначе - запрос к провайдерам"""
+        # Кэш проверяется до провайдеров: попадание не должно ждать их ранжирования
+        # и не попадает в статистику задержек провайдера
+        video: VideoResult | None = None
+
+        async def load_link() -> dict[str, Any] | None:
+            nonlocal video
+            video = await resolver.get_video(url)
+            # Кэшируем только ссылки: файлы удаляются после отправки
+            return video.to_dict() if video.source == "url" else None
+
+        # У video_cache нет stale-периода: ссылки CDN не отдаются после TTL
+        # и не обновляются в фоне
+        cached = await video_cache.get_or_load(video_key, load_link)
+        if video is not None:
+            return video
+        logger.info("Ссылка на видео %s найдена в кэше", video_key)
+        return VideoResult.from_dict(cached)
 
     @router.message(lambda m: m.text and not m.text.startswith('/'))
-    async def on_text(message: Message) -> None:
+    async def on_text(message: Message, bot_identity: BotIdentity) -> None:
         # Проверяем, не находится ли пользователь в режиме рассылки
         if (broadcast_data and 
             message.from_user and 
@@ -46,8 +93,32 @@ def setup_tiktok_handlers(resolver: MultiProviderResolver, broadcast_data: dict
             await message.answer(loc.get("invalid_link"))
             return
 
+        # Все кэши и объединение запросов работают по числовому id видео
+        link = await canonicalize_tiktok_url(url)
+        video_key = link.video_id or canonical_link_key(link.url)
+
+        # Видео уже отправлялось - пересылаем по file_id без скачивания
+        cached_file_id = file_id_cache.get(video_key)
+        if cached_file_id:
+            bot_username = await bot_identity.username(message.bot)
+            caption = loc.get("video_caption", bot_username=bot_username)
+            try:
+                await message.reply_video(cached_file_id, caption=caption)
+                logger.info("Видео отправлено по file_id: %s", url)
+                return
+            except Exception as e:
+                logger.warning("file_id для %s не сработал: %s", video_key, e)
+                await file_id_cache.remove(video_key)
+
+        # Видео недавно оказалось недоступным у всех провайдеров - не тратим на него слот
+        failed_reason = failed_video_cache.get(video_key)
+        if failed_reason:
+            logger.info("Видео %s в негативном кэше, пропускаем загрузку", video_key)
+            await message.reply(loc.get(failed_reason))
+            return
+
         # Создаем прогресс-бар
-        progress = TikTokProgressBar(message, loc)
+        progress = TikTokProgressBar(message, loc, background=fast_progress)
         
         try:
             # Начинаем процесс скачивания
@@ -55,15 +126,17 @@ def setup_tiktok_handlers(resolver: MultiProviderResolver, broadcast_data: dict
             
             # Этап 1: Анализ URL
             await progress.analyzing_url()
-            await asyncio.sleep(0.5)  # Небольшая задержка для визуального эффекта
+            if not fast_progress:
+                await asyncio.sleep(0.5)  # Небольшая задержка для визуального эффекта
             
             # Этап 2: Получение видео
             await progress.getting_video()
-            video_url = await resolver.get_fastest_url(url)
-            
-            # Этап 3: Скачивание файла
-            await progress.downloading_file()
-            await asyncio.sleep(0.3)
+            # Байтовый прогресс от провайдера видит только инициатор загрузки
+            if fast_progress:
+                download_progress.set(progress.download_progress)
+            video = await video_flight.acquire(
+                video_key, lambda: resolve_video(video_key, link.url)
+            )
             
         except Exception as e:
             logger.warning("Ошибка скачивания видео от %s(%s): %s", 
@@ -71,72 +144,75 @@ def setup_tiktok_handlers(resolver: MultiProviderResolver, broadcast_data: dict
                           message.from_user.id if message.from_user else None,
                           str(e))
             
+            # В негативном кэше храним ключ сообщения для пользователя
+            reason = "video_too_large" if isinstance(e, VideoTooLargeError) else "download_error"
+            if is_permanent(e):
+                failed_video_cache.set(video_key, reason)
+
             # Показываем ошибку в прогресс-баре
             error_msg = str(e)
             if "Сервис временно недоступен" in error_msg:
                 await progress.error_occurred(loc.get("service_unavailable"))
             else:
-                await progress.error_occurred(loc.get("download_error"))
+                await progress.error_occurred(loc.get(reason))
             return
 
-        me = await message.bot.get_me()
-        caption = loc.get("video_caption", bot_username=me.username or me.id)
-        
-        # Этап 4: Отправка видео
-        await progress.sending_video()
-        
-        # Если провайдер вернул локальный путь — отправим файл; иначе URL
-        temp_file_path: str | None = None
-        temp_dir: str | None = None
-        
         try:
-            if video_url.startswith("/") or video_url.startswith("./"):
-                from aiogram.types import FSInputFile
-                import os
-
-                temp_file_path = video_url
-                temp_dir = os.path.dirname(video_url)
-                
-                await message.reply_video(FSInputFile(video_url), caption=caption)
+            # Этап 3: Скачивание файла
+            await progress.downloading_file()
+            if not fast_progress:
+                await asyncio.sleep(0.3)
+
+            bot_username = await bot_identity.username(message.bot)
+            caption = loc.get("video_caption", bot_username=bot_username)
+            
+            # Этап 4: Отправка видео
+            await progress.sending_video()
+            
+            # Если провайдер вернул файл (на диске или в памяти) — отправим его; иначе URL
+            params = _video_params(video)
+            if video.source == "memory" and video.data is not None:
+                sent = await message.reply_video(
+                    BufferedInputFile(video.data, filename=video.location),
+                    caption=caption,
+                    **params,
+                )
+            elif video.is_file:
+                sent = await message.reply_video(
+                    FSInputFile(video.location), caption=caption, **params
+                )
             else:
                 # Проверяем доступность URL перед отправкой
                 try:
                     # Пробуем reply_video, если не работает - обычный answer_video
                     try:
-                        await message.reply_video(video_url, caption=caption)
+                        sent = await message.reply_video(video.location, caption=caption, **params)
                     except Exception as reply_error:
                         logger.warning("reply_video не сработал, пробуем answer_video: %s", reply_error)
-                        await message.answer_video(video_url, caption=caption)
+                        sent = await message.answer_video(video.location, caption=caption, **params)
                 except Exception as e:
-                    logger.warning("Ошибка отправки видео по URL %s: %s", video_url, str(e))
+                    logger.warning("Ошибка отправки видео по URL %s: %s", video.location, str(e))
+                    # Ссылка могла истечь - следующий запрос пойдет к провайдерам
+                    video_cache.delete(video_key)
                     await progress.error_occurred(loc.get("invalid_video_url"))
                     return
             
+            # Запоминаем file_id, чтобы в следующий раз обойтись без скачивания
+            file_id = extract_file_id(sent)
+            if file_id:
+                await file_id_cache.set(video_key, file_id)
+
             # Успешное завершение
             await progress.success()
             
             # Логируем успешное скачивание
-            logger.info("Успешно скачано видео от %s(%s): %s", 
+            logger.info("Успешно скачано видео от %s(%s): %s [%s, %s, %s байт]", 
                        message.from_user.username if message.from_user else None,
                        message.from_user.id if message.from_user else None,
-                       url)
+                       url, video.provider, video.source, video.size)
         finally:
-            # Автоматически удаляем временные файлы
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.remove(temp_file_path)
-                    logger.info("Удален временный файл: %s", temp_file_path)
-                except Exception as e:
-                    logger.warning("Не удалось удалить файл %s: %s", temp_file_path, e)
-            
-            # Удаляем временную папку если она пустая
-            if temp_dir and os.path.exists(temp_dir):
-                try:
-                    if not os.listdir(temp_dir):  # Если папка пустая
-                        os.rmdir(temp_dir)
-                        logger.info("Удалена временная папка: %s", temp_dir)
-                except Exception as e:
-                    logger.warning("Не удалось удалить папку %s: %s", temp_dir, e)
+            # Файл удаляется после отправки последним из ожидающих
+            await video_flight.release(video_key)
 
 
     return router
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+# Счетчик вызовов Bot API текущего апдейта (None - вызов вне обработки апдейта)
+_current_calls: ContextVar[list[int] | None] = ContextVar("bot_api_calls", default=None)
+
+# Границы корзин гистограммы "вызовов на апдейт"
+_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+
+@dataclass(slots=True)
+class ApiCallStats:
+    """Сколько вызовов Bot API приходится на один обработанный апдейт"""
+
+    updates: int = 0
+    calls: int = 0
+    background_calls: int = 0
+    max_per_update: int = 0
+    histogram: dict[str, int] = field(default_factory=dict)
+
+    def record_update(self, calls: int) -> None:
+        self.updates += 1
+        self.calls += calls
+        self.max_per_update = max(self.max_per_update, calls)
+        bucket = next((f"≤{b}" for b in _BUCKETS if calls <= b), f">{_BUCKETS[-1]}")
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "calls": self.calls,
+            "avg_per_update": self.calls / self.updates if self.updates else 0.0,
+            "max_per_update": self.max_per_update,
+            "background_calls": self.background_calls,
+            "histogram": dict(self.histogram),
+        }
+
+
+class ApiCallCounter(BaseRequestMiddleware):
+    """Middleware сессии: засчитывает каждый вызов Bot API текущему апдейту"""
+
+    def __init__(self, stats: ApiCallStats) -> None:
+        self._stats = stats
+
+    async def __call__(self, make_request, bot: Bot, method):  # type: ignore[override]
+        counter = _current_calls.get()
+        if counter is None:
+            self._stats.background_calls += 1
+        else:
+            counter[0] += 1
+        return await make_request(bot, method)
+
+
+class ApiCallsPerUpdateMiddleware(BaseMiddleware):
+    """Внешний middleware апдейтов: считает вызовы Bot API на один апдейт"""
+
+    def __init__(self, stats: ApiCallStats, warn_threshold: int = 10) -> None:
+        self._stats = stats
+        self._warn_threshold = warn_threshold
+        self._logger = logging.getLogger(__name__)
+
+    async def __call__(self, handler, event: TelegramObject, data: dict[str, Any]):  # type: ignore[override]
+        counter = [0]
+        token = _current_calls.set(counter)
+        try:
+            return await handler(event, data)
+        finally:
+            _current_calls.reset(token)
+            # Фоновые задачи апдейта (прогресс-бар) могут дописать вызовы позже -
+            # учитываем то, что набежало к концу обработки
+            self._stats.record_update(counter[0])
+            if counter[0] > self._warn_threshold:
+                self._logger.warning(
+                    "Апдейт %s сделал %d вызовов Bot API",
+                    getattr(event, "update_id", "?"), counter[0],
+                )
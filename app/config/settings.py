@@ -7,6 +7,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Лимиты Bot API: загрузка файла ботом и отправка по ссылке (Telegram скачивает сам)
+TELEGRAM_UPLOAD_LIMIT_BYTES = 50 * 1024 * 1024
+TELEGRAM_URL_SEND_LIMIT_BYTES = 20 * 1024 * 1024
+
+# Хранилище пользователей: json | sqlite (глобальное хранилище создается при импорте)
+USER_STORAGE_BACKEND = os.getenv("USER_STORAGE", "json").strip().lower()
+
 
 @dataclass(frozen=True, slots=True)
 class Settings:
@@ -18,6 +25,16 @@ class Settings:
     custom_api_key: str | None
     tikmeh_path: str | None
     admin_ids: list[int]
+    resolver_mode: str
+    resolver_hedge_delay_sec: float
+    ytdlp_workers: int
+    ytdlp_max_jobs_per_worker: int
+    download_spool_max_bytes: int
+    download_dir: str | None
+    download_quota_bytes: int
+    progress_mode: str
+    broadcast_rate_per_sec: float
+    broadcast_concurrency: int
 
     @staticmethod
     def from_env() -> Settings:
@@ -53,6 +70,32 @@ class Settings:
                 if part.isdigit():
                     admin_ids.append(int(part))
 
+        # Режим резолвера: sequential | hedged | race
+        resolver_mode = os.getenv("RESOLVER_MODE", "hedged").strip().lower()
+        if resolver_mode not in ("sequential", "hedged", "race"):
+            resolver_mode = "hedged"
+        resolver_hedge_delay_sec = float(os.getenv("RESOLVER_HEDGE_DELAY_SEC", "3"))
+
+        # Пул процессов yt-dlp (размер не зависит от лимита одновременных апдейтов)
+        ytdlp_workers = int(os.getenv("YTDLP_WORKERS", "4"))
+        ytdlp_max_jobs_per_worker = int(os.getenv("YTDLP_MAX_JOBS_PER_WORKER", "50"))
+
+        # Файлы yt-dlp до этого размера держим в памяти, а не на диске (0 - выключено)
+        download_spool_max_bytes = int(float(os.getenv("DOWNLOAD_SPOOL_MAX_MB", "8")) * 1024 * 1024)
+
+        # Каталог скачиваний и квота на диск для всех временных файлов
+        download_dir = os.getenv("DOWNLOAD_DIR", "").strip()
+        download_quota_bytes = int(float(os.getenv("DOWNLOAD_QUOTA_MB", "1024")) * 1024 * 1024)
+
+        # Прогресс-бар: fast - обновляется в фоне, classic - с паузами между этапами
+        progress_mode = os.getenv("PROGRESS_MODE", "fast").strip().lower()
+        if progress_mode not in ("fast", "classic"):
+            progress_mode = "fast"
+
+        # Рассылка: общий лимит сообщений в секунду (Bot API - около 30) и число отправителей
+        broadcast_rate_per_sec = float(os.getenv("BROADCAST_RATE", "25"))
+        broadcast_concurrency = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+
         return Settings(
             bot_token=bot_token,
             tikwm_api_base_url=tikwm_api_base_url,
@@ -62,6 +105,16 @@ class Settings:
             custom_api_base_url=custom_api_base_url,
             custom_api_key=custom_api_key if custom_api_key else None,
             admin_ids=admin_ids,
+            resolver_mode=resolver_mode,
+            resolver_hedge_delay_sec=resolver_hedge_delay_sec,
+            ytdlp_workers=ytdlp_workers,
+            ytdlp_max_jobs_per_worker=ytdlp_max_jobs_per_worker,
+            download_spool_max_bytes=download_spool_max_bytes,
+            download_dir=download_dir if download_dir else None,
+            download_quota_bytes=download_quota_bytes,
+            progress_mode=progress_mode,
+            broadcast_rate_per_sec=broadcast_rate_per_sec,
+            broadcast_concurrency=broadcast_concurrency,
         )
 
 
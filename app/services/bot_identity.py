@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from aiogram import Bot
+from aiogram.types import User
+
+
+class BotIdentity:
+    """Профиль бота (get_me), полученный при запуске и обновляемый в фоне.
+
+    Обработчики получают его из ``workflow_data`` диспетчера как ``bot_identity``
+    и не делают лишний вызов Bot API на каждый запрос.
+    """
+
+    def __init__(self, refresh_interval_sec: float = 6 * 3600) -> None:
+        self._refresh_interval_sec = refresh_interval_sec
+        self._user: User | None = None
+        self._lock = asyncio.Lock()
+        self._refresher: asyncio.Task[None] | None = None
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def user(self) -> User | None:
+        return self._user
+
+    async def get(self, bot: Bot) -> User:
+        """Возвращает профиль бота, запрашивая его только при первом обращении"""
+        if self._user is None:
+            async with self._lock:
+                if self._user is None:
+                    self._user = await bot.get_me()
+        return self._user
+
+    async def username(self, bot: Bot) -> str | int:
+        """Имя бота для подписей (id, если у бота нет username)"""
+        me = await self.get(bot)
+        return me.username or me.id
+
+    def start_refresh(self, bot: Bot) -> None:
+        """Периодически обновляет профиль (например, после смены username)"""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop(bot))
+
+    async def _refresh_loop(self, bot: Bot) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval_sec)
+            try:
+                self._user = await bot.get_me()
+            except Exception as e:
+                self._logger.warning("Не удалось обновить профиль бота: %s", e)
+
+    async def aclose(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
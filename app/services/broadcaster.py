@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterable, Awaitable, Callable
+from dataclasses import dataclass
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+# Bot API допускает около 30 сообщений в секунду в разные чаты
+DEFAULT_BROADCAST_RATE = 25.0
+
+
+class TokenBucket:
+    """Общий для всех отправителей лимит частоты с глобальной паузой.
+
+    Токены пополняются со скоростью ``rate`` в секунду, запас не больше
+    ``capacity`` (по умолчанию 1 - равномерно, без всплесков). ``pause``
+    останавливает выдачу токенов всем ожидающим до указанного момента (ответ
+    429 с ``retry_after``) и один раз за паузу снижает скорость в ``backoff`` раз.
+    Через ``recovery_after_sec`` без новых 429 скорость растет на ``recovery_step``
+    в секунду, пока не вернется к исходной.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        backoff: float = 0.8,
+        recovery_after_sec: float = 10.0,
+        recovery_step: float = 0.5,
+    ) -> None:
+        self._max_rate = max(0.1, rate)
+        # Скорость после последнего снижения - от нее идет восстановление
+        self._rate = self._max_rate
+        self._recovery_after_sec = recovery_after_sec
+        self._recovery_step = recovery_step
+        self._capacity = max(1.0, capacity)
+        self._backoff = backoff
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Дожидается токена (очередь ожидающих - по порядку прихода)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                rate = self._current_rate(now)
+                refill = (now - self._updated_at) * rate
+                self._tokens = min(self._capacity, self._tokens + refill)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / rate)
+
+    @property
+    def rate(self) -> float:
+        return self._current_rate(time.monotonic())
+
+    def _current_rate(self, now: float) -> float:
+        """Сниженная скорость плюс линейный прирост после спокойного периода"""
+        quiet_sec = now - self._paused_until - self._recovery_after_sec
+        if quiet_sec <= 0:
+            return self._rate
+        return min(self._max_rate, self._rate + quiet_sec * self._recovery_step)
+
+    def pause(self, seconds: float) -> None:
+        """Останавливает выдачу токенов на seconds и сбрасывает накопленный запас"""
+        now = time.monotonic()
+        if now >= self._paused_until:
+            # Остальные 429 той же волны уже летели - скорость снижаем один раз
+            self._rate = max(0.1, self._current_rate(now) * self._backoff)
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0
+        self._updated_at = self._paused_until
+
+
+@dataclass(slots=True)
+class BroadcastResult:
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    retries: int = 0
+    flood_waits: int = 0
+    elapsed_sec: float = 0.0
+    final_rate: float = 0.0
+
+
+class BroadcastEngine:
+    """Рассылка с общим лимитом частоты и ограниченным числом отправителей.
+
+    Получатели читаются из асинхронного источника в ограниченную очередь,
+    ``concurrency`` отправителей берут из нее id и перед каждым запросом
+    получают токен из общего ``TokenBucket``. На 429 рассылка целиком встает
+    на ``retry_after``, сообщение повторяется. Сетевые и серверные ошибки
+    повторяются с паузой, но не больше ``max_retries`` раз. Пользователи,
+    заблокировавшие бота, передаются в ``on_blocked``.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[int], Awaitable[object]],
+        rate_per_sec: float = DEFAULT_BROADCAST_RATE,
+        concurrency: int = 8,
+        max_retries: int = 3,
+        on_blocked: Callable[[int], Awaitable[object]] | None = None,
+    ) -> None:
+        self._send = send
+        self._bucket = TokenBucket(rate_per_sec)
+        self._concurrency = max(1, concurrency)
+        self._max_retries = max(0, max_retries)
+        self._on_blocked = on_blocked
+        self._logger = logging.getLogger(__name__)
+
+    async def run(self, chat_ids: AsyncIterable[int]) -> BroadcastResult:
+        """Отправляет сообщение всем получателям, возвращает итог"""
+        result = BroadcastResult()
+        started = time.monotonic()
+        queue: asyncio.Queue[int | None] = asyncio.Queue(maxsize=self._concurrency * 2)
+        workers = [
+            asyncio.create_task(self._worker(queue, result)) for _ in range(self._concurrency)
+        ]
+        try:
+            async for chat_id in chat_ids:
+                result.total += 1
+                await queue.put(chat_id)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        result.elapsed_sec = time.monotonic() - started
+        result.final_rate = self._bucket.rate
+        return result
+
+    async def _worker(self, queue: asyncio.Queue[int | None], result: BroadcastResult) -> None:
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            await self._deliver(chat_id, result)
+
+    async def _deliver(self, chat_id: int, result: BroadcastResult) -> None:
+        attempt = 0
+        while True:
+            await self._bucket.acquire()
+            try:
+                await self._send(chat_id)
+                result.sent += 1
+                return
+            except TelegramRetryAfter as e:
+                # Лимит превышен для всего бота - останавливаем всех отправителей
+                result.flood_waits += 1
+                self._bucket.pause(e.retry_after)
+                self._logger.warning("Flood control при рассылке: пауза %s с", e.retry_after)
+                error: Exception = e
+            except TelegramForbiddenError as e:
+                # Бот заблокирован или пользователь удален - повторять бессмысленно
+                result.blocked += 1
+                self._logger.info("Пользователь %d недоступен: %s", chat_id, e.message)
+                if self._on_blocked is not None:
+                    try:
+                        await self._on_blocked(chat_id)
+                    except Exception as e:
+                        self._logger.error("Ошибка удаления пользователя %d: %s", chat_id, e)
+                return
+            except TelegramBadRequest as e:
+                result.failed += 1
+                self._logger.warning("Ошибка отправки пользователю %d: %s", chat_id, e.message)
+                return
+            except (TelegramNetworkError, TelegramServerError) as e:
+                error = e
+                await asyncio.sleep(min(2**attempt, 30))
+            except Exception as e:
+                result.failed += 1
+                self._logger.warning("Ошибка отправки пользователю %d: %s", chat_id, e)
+                return
+            if attempt >= self._max_retries:
+                result.failed += 1
+                self._logger.warning(
+                    "Не удалось отправить пользователю %d после %d попыток: %s",
+                    chat_id, attempt + 1, error,
+                )
+                return
+            attempt += 1
+            result.retries += 1
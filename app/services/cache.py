@@ -2,45 +2,252 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
-from functools import lru_cache
+if TYPE_CHECKING:
+    from app.services.persistent_cache import PersistentCache
 
 
-class SimpleCache:
-    """Простой кэш для URL видео"""
-    
-    def __init__(self, max_size: int = 100) -> None:
-        self._cache: dict[str, str] = {}
-        self._max_size = max_size
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+    size: int
+
+
+def _default_sizeof(value: Any) -> int:
+    """Примерный размер значения: строки по длине, контейнеры по содержимому"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_default_sizeof(k) + _default_sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_default_sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """LRU-кэш с TTL записей, бюджетом по записям/байтам и метриками.
+
+    Опционально поддерживает stale-while-revalidate: в течение ``stale_ttl_sec``
+    после истечения TTL ``get_or_load`` отдает устаревшее значение и обновляет
+    его в фоне. К кэшу можно подключить дисковый уровень (``attach_backend``):
+    записи дублируются на диск в фоне, а ``aget`` и ``get_or_load`` дочитывают
+    промахи оттуда.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int | None = None,
+        default_ttl_sec: float | None = None,
+        stale_ttl_sec: float = 0.0,
+        sizeof: Callable[[Any], int] = _default_sizeof,
+    ) -> None:
+        self._cache: OrderedDict[str, _Entry] = OrderedDict()
+        self._max_entries = max(1, max_entries)
+        self._max_bytes = max_bytes
+        self._default_ttl_sec = default_ttl_sec
+        self._stale_ttl_sec = max(0.0, stale_ttl_sec)
+        self._sizeof = sizeof
+        self._bytes = 0
+        self._refreshing: dict[str, asyncio.Task[None]] = {}
+        self._backend: PersistentCache | None = None
+        self._pending_writes: set[asyncio.Future[None]] = set()
+        # Один поток записи сохраняет порядок операций с диском
+        self._write_executor: ThreadPoolExecutor | None = None
         self._logger = logging.getLogger(__name__)
 
-    def get(self, key: str) -> str | None:
-        """Получить значение из кэша"""
-        return self._cache.get(key)
-
-    def set(self, key: str, value: str) -> None:
-        """Сохранить значение в кэш"""
-        if len(self._cache) >= self._max_size:
-            # Удаляем самый старый элемент
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
-        
-        self._cache[key] = value
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any | None:
+        """Получить свежее значение из кэша"""
+        value, fresh = self._lookup(key)
+        if value is None or not fresh:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def aget(self, key: str) -> Any | None:
+        """Получить значение из памяти, а при промахе - с диска"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        return await self._get_from_disk(key)
+
+    def set(self, key: str, value: Any, ttl_sec: float | None = None) -> None:
+        """Сохранить значение в кэш (и в фоне - на диск)"""
+        ttl = self._default_ttl_sec if ttl_sec is None else ttl_sec
+        self.set_local(key, value, ttl)
+        if self._backend is not None:
+            self._write_behind(self._backend.set, key, value, ttl)
+
+    def set_local(self, key: str, value: Any, ttl_sec: float | None = None) -> None:
+        """Сохранить значение только в памяти"""
+        ttl = self._default_ttl_sec if ttl_sec is None else ttl_sec
+        now = time.monotonic()
+        expires_at = now + ttl if ttl is not None else float("inf")
+        size = len(key) + self._sizeof(value)
+
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._cache[key] = _Entry(value, expires_at, expires_at + self._stale_ttl_sec, size)
+        self._bytes += size
+        self._enforce_budget()
         self._logger.debug("Кэширован URL для %s", key)
 
+    def delete(self, key: str) -> None:
+        self._drop(key)
+        if self._backend is not None:
+            self._write_behind(self._backend.delete, key)
+
+    def attach_backend(self, backend: PersistentCache) -> None:
+        """Подключает дисковый уровень кэша"""
+        self._backend = backend
+
+    async def flush(self) -> None:
+        """Дожидается фоновых записей на диск"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_sec: float | None = None,
+    ) -> Any:
+        """Значение из памяти, с диска или из ``loader``; устаревшее обновляется в фоне"""
+        value, fresh = self._lookup(key)
+        if value is not None and fresh:
+            self.hits += 1
+            return value
+        if value is not None:
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(self._refresh(key, loader, ttl_sec))
+            return value
+
+        self.misses += 1
+        value = await self._get_from_disk(key)
+        if value is not None:
+            return value
+        value = await loader()
+        if value is not None:
+            self.set(key, value, ttl_sec)
+        return value
+
     def clear(self) -> None:
         """Очистить кэш"""
         self._cache.clear()
+        self._bytes = 0
+        if self._backend is not None:
+            self._write_behind(self._backend.clear)
         self._logger.info("Кэш очищен")
-    
+
     def get_stats(self) -> dict[str, int]:
         """Получить статистику кэша"""
         return {
             "size": len(self._cache),
-            "max_size": self._max_size
+            "max_size": self._max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes or 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
         }
 
+    async def _get_from_disk(self, key: str) -> Any | None:
+        """Дочитывает промах с диска и кладет найденное в память"""
+        if self._backend is None:
+            return None
+        try:
+            row = await asyncio.to_thread(self._backend.get, key)
+        except Exception as e:
+            self._logger.warning("Ошибка чтения кэша с диска: %s", e)
+            return None
+        if row is None:
+            return None
+        value, ttl = row
+        self.disk_hits += 1
+        self.set_local(key, value, ttl)
+        return value
+
+    def _lookup(self, key: str) -> tuple[Any | None, bool]:
+        """Возвращает (значение, свежее ли оно); просроченные записи удаляются"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None, False
+        now = time.monotonic()
+        if now >= entry.stale_until:
+            self._drop(key)
+            self.expirations += 1
+            return None, False
+        self._cache.move_to_end(key)
+        return entry.value, now < entry.expires_at
+
+    def _drop(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _write_behind(self, func: Callable[..., None], *args: Any) -> None:
+        """Выполняет запись на диск вне event loop, не задерживая вызывающего"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+        if self._write_executor is None:
+            self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache")
+        future = loop.run_in_executor(self._write_executor, func, *args)
+        self._pending_writes.add(future)
+        future.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, future: asyncio.Future[None]) -> None:
+        self._pending_writes.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self._logger.warning("Ошибка записи кэша на диск: %s", future.exception())
+
+    def _enforce_budget(self) -> None:
+        while len(self._cache) > self._max_entries or (
+            self._max_bytes is not None and self._bytes > self._max_bytes and len(self._cache) > 1
+        ):
+            _, entry = self._cache.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    async def _refresh(
+        self, key: str, loader: Callable[[], Awaitable[Any]], ttl_sec: float | None
+    ) -> None:
+        try:
+            value = await loader()
+            if value is not None:
+                self.set(key, value, ttl_sec)
+        except Exception as e:
+            self._logger.warning("Не удалось обновить запись кэша %s: %s", key, e)
+        finally:
+            self._refreshing.pop(key, None)
+
+
+# Глобальный экземпляр кэша (ссылки TikWM CDN живут ограниченное время)
+video_cache = TTLCache(max_entries=5000, max_bytes=4 * 1024 * 1024, default_ttl_sec=1800)
 
-# Глобальный экземпляр кэша
-video_cache = SimpleCache(max_size=50)
+# Негативный кэш: id видео, которые недоступны навсегда (удалены, приватные, гео-блок)
+failed_video_cache = TTLCache(max_entries=10000, default_ttl_sec=600)
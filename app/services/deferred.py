@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Message
+
+# Bot API удаляет не больше 100 сообщений одним deleteMessages
+_MAX_BATCH = 100
+
+
+@dataclass(order=True, slots=True)
+class _Deletion:
+    due: float
+    seq: int
+    bot: Bot = field(compare=False)
+    chat_id: int = field(compare=False)
+    message_id: int = field(compare=False)
+
+
+class DeferredDeletionScheduler:
+    """Отложенное удаление сообщений без sleep внутри обработчиков.
+
+    Задания лежат в куче по времени; одна фоновая задача просыпается к
+    ближайшему сроку, группирует созревшие удаления по чатам в ``deleteMessages``
+    и выполняет не больше ``max_calls_per_sec`` вызовов в секунду. На 429
+    удаления откладываются на ``retry_after``. При остановке бота оставшиеся
+    удаления выполняются сразу.
+    """
+
+    def __init__(self, max_calls_per_sec: float = 10.0) -> None:
+        self._min_interval_sec = 1.0 / max(0.1, max_calls_per_sec)
+        self._heap: list[_Deletion] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._last_call_at = 0.0
+        self._logger = logging.getLogger(__name__)
+        # Метрики
+        self._scheduled = 0
+        self._deleted = 0
+        self._calls = 0
+        self._failed = 0
+        self._flood_waits = 0
+
+    def schedule(self, message: Message, delay_sec: float) -> None:
+        """Удаляет сообщение через delay_sec (не блокирует вызывающего)"""
+        if message.bot is None:
+            return
+        entry = _Deletion(
+            due=time.monotonic() + delay_sec,
+            seq=next(self._seq),
+            bot=message.bot,
+            chat_id=message.chat.id,
+            message_id=message.message_id,
+        )
+        heapq.heappush(self._heap, entry)
+        self._scheduled += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif self._heap[0] is entry:
+            # Новый срок раньше того, к которому спит задача
+            self._wakeup.set()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._heap),
+            "scheduled": self._scheduled,
+            "deleted": self._deleted,
+            "api_calls": self._calls,
+            "failed": self._failed,
+            "flood_waits": self._flood_waits,
+        }
+
+    async def aclose(self) -> None:
+        """Останавливает планировщик, выполнив оставшиеся удаления"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        pending, self._heap = self._heap, []
+        try:
+            await self._process(pending)
+        except Exception as e:
+            self._logger.warning("Не удалось удалить сообщения при остановке: %s", e)
+
+    async def _run(self) -> None:
+        while self._heap:
+            delay = self._heap[0].due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+            due: list[_Deletion] = []
+            now = time.monotonic()
+            while self._heap and self._heap[0].due <= now:
+                due.append(heapq.heappop(self._heap))
+            await self._process(due)
+
+    async def _process(self, entries: list[_Deletion]) -> None:
+        # Группируем по боту и чату: один вызов на пачку сообщений
+        batches: dict[tuple[int, int], list[_Deletion]] = {}
+        for entry in entries:
+            batches.setdefault((id(entry.bot), entry.chat_id), []).append(entry)
+        for batch in batches.values():
+            for i in range(0, len(batch), _MAX_BATCH):
+                await self._delete(batch[i:i + _MAX_BATCH])
+
+    async def _delete(self, batch: list[_Deletion]) -> None:
+        wait = self._last_call_at + self._min_interval_sec - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_call_at = time.monotonic()
+        self._calls += 1
+
+        bot, chat_id = batch[0].bot, batch[0].chat_id
+        message_ids = [entry.message_id for entry in batch]
+        try:
+            if len(message_ids) == 1:
+                await bot.delete_message(chat_id, message_ids[0])
+            else:
+                await bot.delete_messages(chat_id, message_ids)
+        except TelegramRetryAfter as e:
+            self._flood_waits += 1
+            due = time.monotonic() + e.retry_after
+            for entry in batch:
+                entry.due = due
+                heapq.heappush(self._heap, entry)
+            return
+        except Exception as e:
+            # Сообщение уже удалено пользователем или слишком старое
+            self._failed += len(message_ids)
+            self._logger.debug("Не удалось удалить сообщения %s: %s", message_ids, e)
+            return
+        self._deleted += len(message_ids)
+
+
+# Глобальный планировщик удалений
+deletion_scheduler = DeferredDeletionScheduler()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+
+from aiogram.types import Message
+
+
+class FileIdCache:
+    """Постоянный индекс видео → Telegram file_id для повторной отправки без скачивания.
+
+    Файл перезаписывается отложенно: по таймеру (``start_flusher``), при
+    накоплении ``flush_batch_size`` изменений и при остановке бота.
+    """
+
+    def __init__(
+        self,
+        storage_file: str = "file_ids.json",
+        max_entries: int = 20000,
+        flush_batch_size: int = 100,
+    ) -> None:
+        self._storage_file = Path(storage_file)
+        self._max_entries = max(1, max_entries)
+        # Порядок вставки = порядок последнего использования (старые удаляются первыми)
+        self._file_ids: dict[str, str] = {}
+        self._changes = 0
+        self._flush_batch_size = max(1, flush_batch_size)
+        self._save_lock = asyncio.Lock()
+        self._flusher: asyncio.Task[None] | None = None
+        self._pending_flush: asyncio.Task[None] | None = None
+        self._logger = logging.getLogger(__name__)
+        self._load()
+
+    def _load(self) -> None:
+        """Загружает индекс из файла"""
+        try:
+            if self._storage_file.exists():
+                with open(self._storage_file, encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._file_ids = {str(k): str(v) for k, v in data.items()}
+                self._logger.info("Загружено %d file_id", len(self._file_ids))
+        except Exception as e:
+            self._logger.error("Ошибка загрузки file_id: %s", e)
+
+    def _write(self, data: dict[str, str]) -> None:
+        """Атомарно записывает индекс (временный файл + rename)"""
+        tmp_file = self._storage_file.with_name(self._storage_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_file, self._storage_file)
+
+    async def flush(self) -> None:
+        """Сохраняет накопленные изменения в файл вне event loop"""
+        async with self._save_lock:
+            if not self._changes:
+                return
+            changes = self._changes
+            self._changes = 0
+            try:
+                await asyncio.to_thread(self._write, dict(self._file_ids))
+            except Exception as e:
+                # Изменения не потеряны - попробуем записать их в следующий раз
+                self._changes += changes
+                self._logger.error("Ошибка сохранения file_id: %s", e)
+
+    def _mark_dirty(self) -> None:
+        self._changes += 1
+        if self._changes < self._flush_batch_size:
+            return
+        if self._pending_flush is not None and not self._pending_flush.done():
+            return
+        try:
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            # Вне event loop (скрипты) - запишется при следующем flush
+            pass
+
+    def start_flusher(self, interval_sec: float = 5.0) -> None:
+        """Запускает периодическую запись изменений"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(interval_sec))
+
+    async def _flush_loop(self, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            await self.flush()
+
+    async def aclose(self) -> None:
+        """Останавливает таймер и записывает оставшиеся изменения"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    def get(self, key: str) -> str | None:
+        """Возвращает file_id и отмечает запись как недавно использованную"""
+        file_id = self._file_ids.pop(key, None)
+        if file_id is not None:
+            self._file_ids[key] = file_id
+        return file_id
+
+    async def set(self, key: str, file_id: str) -> None:
+        """Сохраняет file_id для видео"""
+        if self._file_ids.get(key) == file_id:
+            return
+        self._file_ids.pop(key, None)
+        self._file_ids[key] = file_id
+        while len(self._file_ids) > self._max_entries:
+            del self._file_ids[next(iter(self._file_ids))]
+        self._mark_dirty()
+
+    async def remove(self, key: str) -> None:
+        """Удаляет устаревший file_id"""
+        if self._file_ids.pop(key, None) is not None:
+            self._mark_dirty()
+
+    def get_stats(self) -> dict[str, int]:
+        return {"size": len(self._file_ids), "max_size": self._max_entries}
+
+
+def extract_file_id(message: Message) -> str | None:
+    """Достает file_id из отправленного ботом сообщения с видео"""
+    media = message.video or message.animation or message.document
+    return media.file_id if media else None
+
+
+# Глобальный экземпляр индекса
+file_id_cache = FileIdCache()
@@ -38,6 +38,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Не удалось получить видео. Проверь ссылку или попробуй позже.",
+        "video_too_large": (
+            "❌ Видео слишком большое: "
+            "Telegram не позволяет ботам отправлять файлы больше 50 МБ."
+        ),
         "service_unavailable": "🔧 Сервис временно недоступен. Ищем стабильный API...",
         "invalid_video_url": "❌ Получен некорректный URL видео. Попробуй другую ссылку.",
         
@@ -60,6 +64,53 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Логи включены ✅",
         "logs_disabled": "Логи выключены 🚫",
         "cache_cleared": "🧹 Кэш очищен!\nБыло записей: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Попадания: {hits}, промахи: {misses} ({hit_rate:.0f}%)\n"
+            "Вытеснено: {evictions}, истекло: {expirations}"
+        ),
+        "providers_title": "📡 <b>Провайдеры (в порядке приоритета)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Вызовов: {calls}, ошибок: {failures} (подряд: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} с",
+        "providers_cooldown": "   Охлаждение: {cooldown:.0f} с",
+        "providers_http": (
+            "   🔌 Запросов: {requests}, новых соединений: {new_connections} "
+            "(повторно: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Повторов: {retries}, отказов бюджета: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Процессов: {busy}/{max_workers} заняты, заданий: {jobs}, "
+            "убито: {killed}, перезапущено: {recycled}\n"
+            "   🧊 Холодный старт: {cold:.2f} с ({cold_jobs}), 🔥 теплый: {warm:.2f} с "
+            "({warm_jobs}), инициализация: {init:.2f} с"
+        ),
+        "providers_last_error": "   Последняя ошибка: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Скачивания</b>: {dirs} папок, "
+            "резерв {reserved:.0f}/{quota:.0f} МБ, на диске {used:.0f} МБ{free}\n"
+            "   Ждут места: {waiting} (всего ждали: {waited}), уборщик удалил: {removed}"
+        ),
+        "providers_disk_free": ", свободно {free:.0f} МБ",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} вызовов на апдейт "
+            "(макс. {max_calls}, апдейтов: {updates}, фоновых вызовов: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Объединение запросов</b>: загрузок запущено {started}, "
+            "присоединений {coalesced}, идет сейчас {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} записей",
+        "providers_status_edits": (
+            "✏️ <b>Статусы</b>: правок {edits}, одинаковых пропущено {skipped}, "
+            "схлопнуто {coalesced}, пауз flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Удаление статусов</b>: в очереди {pending}, удалено {deleted} "
+            "за {api_calls} вызовов, ошибок {failed}, пауз flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -128,6 +179,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Failed to get video. Check the link or try later.",
+        "video_too_large": (
+            "❌ The video is too large: "
+            "Telegram doesn't allow bots to send files over 50 MB."
+        ),
         "service_unavailable": "🔧 Service temporarily unavailable. Looking for stable API...",
         "invalid_video_url": "❌ Received invalid video URL. Try another link.",
         
@@ -150,6 +205,54 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Logs enabled ✅",
         "logs_disabled": "Logs disabled 🚫",
         "cache_cleared": "🧹 Cache cleared!\nRecords: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Hits: {hits}, misses: {misses} ({hit_rate:.0f}%)\n"
+            "Evicted: {evictions}, expired: {expirations}"
+        ),
+        "providers_title": "📡 <b>Providers (by priority)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Calls: {calls}, failures: {failures} (in a row: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Cooldown: {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Requests: {requests}, new connections: {new_connections} "
+            "(reused: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Retries: {retries}, budget denials: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Processes: {busy}/{max_workers} busy, jobs: {jobs}, "
+            "killed: {killed}, recycled: {recycled}\n"
+            "   🧊 Cold start: {cold:.2f} s ({cold_jobs}), 🔥 warm: {warm:.2f} s "
+            "({warm_jobs}), init: {init:.2f} s"
+        ),
+        "providers_last_error": "   Last error: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Downloads</b>: {dirs} folders, "
+            "reserved {reserved:.0f}/{quota:.0f} MB, on disk {used:.0f} MB{free}\n"
+            "   Waiting for space: {waiting} (waited in total: {waited}), "
+            "janitor removed: {removed}"
+        ),
+        "providers_disk_free": ", free {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} calls per update "
+            "(max {max_calls}, updates: {updates}, background calls: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Request coalescing</b>: downloads started {started}, "
+            "joined {coalesced}, in flight {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} entries",
+        "providers_status_edits": (
+            "✏️ <b>Status messages</b>: edits {edits}, duplicates skipped {skipped}, "
+            "coalesced {coalesced}, flood control waits {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Status cleanup</b>: queued {pending}, deleted {deleted} "
+            "in {api_calls} calls, failed {failed}, flood control waits {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -218,6 +321,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ فشل في الحصول على الفيديو. تحقق من الرابط أو حاول لاحقاً.",
+        "video_too_large": (
+            "❌ الفيديو كبير جداً: "
+            "لا يسمح تيليجرام للبوتات بإرسال ملفات أكبر من 50 ميجابايت."
+        ),
         "service_unavailable": "🔧 الخدمة غير متاحة مؤقتاً. نبحث عن API مستقر...",
         "invalid_video_url": "❌ تم استلام رابط فيديو غير صحيح. جرب رابط آخر.",
         
@@ -240,6 +347,53 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "تم تفعيل السجلات ✅",
         "logs_disabled": "تم إيقاف السجلات 🚫",
         "cache_cleared": "🧹 تم مسح الذاكرة المؤقتة!\nالسجلات: {size}/{max_size}",
+        "cache_stats": (
+            "📊 الإصابات: {hits}، الإخفاقات: {misses} ({hit_rate:.0f}%)\n"
+            "المُزالة: {evictions}، المنتهية: {expirations}"
+        ),
+        "providers_title": "📡 <b>المزوّدون (حسب الأولوية)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}، ✅ {success:.0f}%\n"
+            "   الاستدعاءات: {calls}، الأخطاء: {failures} (متتالية: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} ث",
+        "providers_cooldown": "   التهدئة: {cooldown:.0f} ث",
+        "providers_http": (
+            "   🔌 الطلبات: {requests}، اتصالات جديدة: {new_connections} "
+            "(إعادة الاستخدام: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 إعادة المحاولات: {retries}، رفض الميزانية: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ العمليات: {busy}/{max_workers} مشغولة، المهام: {jobs}، "
+            "المنهاة: {killed}، المعاد تشغيلها: {recycled}\n"
+            "   🧊 بدء بارد: {cold:.2f} ث ({cold_jobs})، 🔥 دافئ: {warm:.2f} ث "
+            "({warm_jobs})، التهيئة: {init:.2f} ث"
+        ),
+        "providers_last_error": "   آخر خطأ: {error}",
+        "providers_downloads": (
+            "\n💾 <b>التنزيلات</b>: {dirs} مجلدات، "
+            "محجوز {reserved:.0f}/{quota:.0f} ميجابايت، على القرص {used:.0f} ميجابايت{free}\n"
+            "   بانتظار المساحة: {waiting} (إجمالي الانتظار: {waited})، حذف المنظّف: {removed}"
+        ),
+        "providers_disk_free": "، متاح {free:.0f} ميجابايت",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} استدعاء لكل تحديث "
+            "(الأقصى {max_calls}، التحديثات: {updates}، استدعاءات الخلفية: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>دمج الطلبات</b>: تنزيلات بدأت {started}، "
+            "انضمامات {coalesced}، جارية الآن {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} سجل",
+        "providers_status_edits": (
+            "✏️ <b>رسائل الحالة</b>: تعديلات {edits}، مكررة متجاوزة {skipped}، "
+            "مدمجة {coalesced}، انتظار flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>تنظيف الحالة</b>: في الطابور {pending}، محذوفة {deleted} "
+            "في {api_calls} استدعاء، أخطاء {failed}، انتظار flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -308,6 +462,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ No se pudo obtener el video. Verifica el enlace o intenta más tarde.",
+        "video_too_large": (
+            "❌ El video es demasiado grande: "
+            "Telegram no permite a los bots enviar archivos de más de 50 MB."
+        ),
         "service_unavailable": "🔧 Servicio temporalmente no disponible. Buscando API estable...",
         "invalid_video_url": "❌ Se recibió una URL de video inválida. Prueba otro enlace.",
         
@@ -330,6 +488,55 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Registros habilitados ✅",
         "logs_disabled": "Registros deshabilitados 🚫",
         "cache_cleared": "🧹 ¡Caché limpiado!\nRegistros: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Aciertos: {hits}, fallos: {misses} ({hit_rate:.0f}%)\n"
+            "Desalojados: {evictions}, caducados: {expirations}"
+        ),
+        "providers_title": "📡 <b>Proveedores (por prioridad)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Llamadas: {calls}, errores: {failures} (seguidos: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Enfriamiento: {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Solicitudes: {requests}, conexiones nuevas: {new_connections} "
+            "(reutilizadas: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Reintentos: {retries}, rechazos del presupuesto: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Procesos: {busy}/{max_workers} ocupados, tareas: {jobs}, "
+            "terminados: {killed}, reiniciados: {recycled}\n"
+            "   🧊 Arranque en frío: {cold:.2f} s ({cold_jobs}), 🔥 en caliente: {warm:.2f} s "
+            "({warm_jobs}), inicialización: {init:.2f} s"
+        ),
+        "providers_last_error": "   Último error: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Descargas</b>: {dirs} carpetas, "
+            "reservado {reserved:.0f}/{quota:.0f} MB, en disco {used:.0f} MB{free}\n"
+            "   Esperando espacio: {waiting} (esperaron en total: {waited}), "
+            "el limpiador eliminó: {removed}"
+        ),
+        "providers_disk_free": ", libre {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} llamadas por actualización "
+            "(máx. {max_calls}, actualizaciones: {updates}, "
+            "llamadas en segundo plano: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Agrupación de solicitudes</b>: descargas iniciadas {started}, "
+            "unidas {coalesced}, en curso {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} entradas",
+        "providers_status_edits": (
+            "✏️ <b>Mensajes de estado</b>: ediciones {edits}, duplicadas omitidas {skipped}, "
+            "agrupadas {coalesced}, esperas por flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Limpieza de estados</b>: en cola {pending}, eliminados {deleted} "
+            "en {api_calls} llamadas, errores {failed}, esperas por flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -398,6 +605,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Impossible d'obtenir la vidéo. Vérifie le lien ou réessaie plus tard.",
+        "video_too_large": (
+            "❌ La vidéo est trop volumineuse : "
+            "Telegram n'autorise pas les bots à envoyer des fichiers de plus de 50 Mo."
+        ),
         "service_unavailable": "🔧 Service temporairement indisponible. Recherche d'un API stable...",
         "invalid_video_url": "❌ URL de vidéo invalide reçue. Essaie un autre lien.",
         
@@ -420,6 +631,56 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Journaux activés ✅",
         "logs_disabled": "Journaux désactivés 🚫",
         "cache_cleared": "🧹 Cache vidé !\nEnregistrements : {size}/{max_size}",
+        "cache_stats": (
+            "📊 Succès : {hits}, échecs : {misses} ({hit_rate:.0f}%)\n"
+            "Évincés : {evictions}, expirés : {expirations}"
+        ),
+        "providers_title": "📡 <b>Fournisseurs (par priorité)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA : {latency}, ✅ {success:.0f} %\n"
+            "   Appels : {calls}, erreurs : {failures} (d'affilée : {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Refroidissement : {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Requêtes : {requests}, nouvelles connexions : {new_connections} "
+            "(réutilisées : {reuse:.0f} %{http2})"
+        ),
+        "providers_retries": (
+            "   🔁 Nouvelles tentatives : {retries}, refus du budget : {exhausted}"
+        ),
+        "providers_pool": (
+            "   ⚙️ Processus : {busy}/{max_workers} occupés, tâches : {jobs}, "
+            "tués : {killed}, recyclés : {recycled}\n"
+            "   🧊 Démarrage à froid : {cold:.2f} s ({cold_jobs}), 🔥 à chaud : {warm:.2f} s "
+            "({warm_jobs}), initialisation : {init:.2f} s"
+        ),
+        "providers_last_error": "   Dernière erreur : {error}",
+        "providers_downloads": (
+            "\n💾 <b>Téléchargements</b> : {dirs} dossiers, "
+            "réservé {reserved:.0f}/{quota:.0f} Mo, sur disque {used:.0f} Mo{free}\n"
+            "   En attente d'espace : {waiting} (ont attendu : {waited}), "
+            "supprimés par le nettoyeur : {removed}"
+        ),
+        "providers_disk_free": ", libre {free:.0f} Mo",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b> : {avg:.1f} appels par mise à jour "
+            "(max {max_calls}, mises à jour : {updates}, appels en arrière-plan : {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Regroupement des requêtes</b> : téléchargements lancés {started}, "
+            "rejoints {coalesced}, en cours {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b> : {size}/{max_size} entrées",
+        "providers_status_edits": (
+            "✏️ <b>Messages d'état</b> : modifications {edits}, doublons ignorés {skipped}, "
+            "regroupées {coalesced}, attentes flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Nettoyage des états</b> : en file {pending}, supprimés {deleted} "
+            "en {api_calls} appels, échecs {failed}, attentes flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -488,6 +749,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Video konnte nicht abgerufen werden. Überprüfe den Link oder versuche es später erneut.",
+        "video_too_large": (
+            "❌ Das Video ist zu groß: "
+            "Telegram erlaubt Bots keine Dateien über 50 MB."
+        ),
         "service_unavailable": "🔧 Service vorübergehend nicht verfügbar. Suche nach einer stabilen API...",
         "invalid_video_url": "❌ Ungültige Video-URL erhalten. Versuche einen anderen Link.",
         
@@ -510,6 +775,55 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Logs aktiviert ✅",
         "logs_disabled": "Logs deaktiviert 🚫",
         "cache_cleared": "🧹 Cache geleert!\nEinträge: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Treffer: {hits}, Fehlschläge: {misses} ({hit_rate:.0f}%)\n"
+            "Verdrängt: {evictions}, abgelaufen: {expirations}"
+        ),
+        "providers_title": "📡 <b>Anbieter (nach Priorität)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Aufrufe: {calls}, Fehler: {failures} (in Folge: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Abkühlung: {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Anfragen: {requests}, neue Verbindungen: {new_connections} "
+            "(wiederverwendet: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Wiederholungen: {retries}, Budget-Ablehnungen: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Prozesse: {busy}/{max_workers} belegt, Aufträge: {jobs}, "
+            "beendet: {killed}, neu gestartet: {recycled}\n"
+            "   🧊 Kaltstart: {cold:.2f} s ({cold_jobs}), 🔥 warm: {warm:.2f} s "
+            "({warm_jobs}), Initialisierung: {init:.2f} s"
+        ),
+        "providers_last_error": "   Letzter Fehler: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Downloads</b>: {dirs} Ordner, "
+            "reserviert {reserved:.0f}/{quota:.0f} MB, auf der Festplatte {used:.0f} MB{free}\n"
+            "   Warten auf Platz: {waiting} (insgesamt gewartet: {waited}), "
+            "vom Aufräumer entfernt: {removed}"
+        ),
+        "providers_disk_free": ", frei {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} Aufrufe pro Update "
+            "(max. {max_calls}, Updates: {updates}, Hintergrundaufrufe: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Anfragebündelung</b>: Downloads gestartet {started}, "
+            "angeschlossen {coalesced}, laufend {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} Einträge",
+        "providers_status_edits": (
+            "✏️ <b>Statusnachrichten</b>: Bearbeitungen {edits}, "
+            "Duplikate übersprungen {skipped}, zusammengefasst {coalesced}, "
+            "Flood-Control-Pausen {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Status-Bereinigung</b>: in der Warteschlange {pending}, gelöscht {deleted} "
+            "in {api_calls} Aufrufen, Fehler {failed}, Flood-Control-Pausen {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -578,6 +892,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Falha ao obter o vídeo. Verifique o link ou tente novamente mais tarde.",
+        "video_too_large": (
+            "❌ O vídeo é grande demais: "
+            "o Telegram não permite que bots enviem arquivos acima de 50 MB."
+        ),
         "service_unavailable": "🔧 Serviço temporariamente indisponível. Procurando por uma API estável...",
         "invalid_video_url": "❌ URL de vídeo inválida recebida. Tente outro link.",
         
@@ -600,6 +918,55 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Logs ativados ✅",
         "logs_disabled": "Logs desativados 🚫",
         "cache_cleared": "🧹 Cache limpo!\nEntradas: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Acertos: {hits}, falhas: {misses} ({hit_rate:.0f}%)\n"
+            "Removidas: {evictions}, expiradas: {expirations}"
+        ),
+        "providers_title": "📡 <b>Provedores (por prioridade)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Chamadas: {calls}, erros: {failures} (seguidos: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Resfriamento: {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Requisições: {requests}, novas conexões: {new_connections} "
+            "(reutilizadas: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Repetições: {retries}, recusas do orçamento: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Processos: {busy}/{max_workers} ocupados, tarefas: {jobs}, "
+            "encerrados: {killed}, reiniciados: {recycled}\n"
+            "   🧊 Início a frio: {cold:.2f} s ({cold_jobs}), 🔥 a quente: {warm:.2f} s "
+            "({warm_jobs}), inicialização: {init:.2f} s"
+        ),
+        "providers_last_error": "   Último erro: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Downloads</b>: {dirs} pastas, "
+            "reservado {reserved:.0f}/{quota:.0f} MB, em disco {used:.0f} MB{free}\n"
+            "   Aguardando espaço: {waiting} (aguardaram no total: {waited}), "
+            "removidos pela limpeza: {removed}"
+        ),
+        "providers_disk_free": ", livre {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} chamadas por atualização "
+            "(máx. {max_calls}, atualizações: {updates}, "
+            "chamadas em segundo plano: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Agrupamento de pedidos</b>: downloads iniciados {started}, "
+            "agregados {coalesced}, em andamento {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} registros",
+        "providers_status_edits": (
+            "✏️ <b>Mensagens de status</b>: edições {edits}, duplicadas ignoradas {skipped}, "
+            "agrupadas {coalesced}, pausas de flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Limpeza de status</b>: na fila {pending}, apagadas {deleted} "
+            "em {api_calls} chamadas, erros {failed}, pausas de flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -668,6 +1035,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ 動画を取得できませんでした。リンクを確認するか、後でもう一度お試しください。",
+        "video_too_large": (
+            "❌ 動画が大きすぎます。"
+            "Telegramではボットが50MBを超えるファイルを送信できません。"
+        ),
         "service_unavailable": "🔧 サービスが一時的に利用できません。安定したAPIを検索中...",
         "invalid_video_url": "❌ 無効な動画URLが受信されました。別のリンクをお試しください。",
         
@@ -690,6 +1061,53 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "ログが有効になりました ✅",
         "logs_disabled": "ログが無効になりました 🚫",
         "cache_cleared": "🧹 キャッシュがクリアされました！\nエントリ：{size}/{max_size}",
+        "cache_stats": (
+            "📊 ヒット：{hits}、ミス：{misses}（{hit_rate:.0f}%）\n"
+            "追い出し：{evictions}、期限切れ：{expirations}"
+        ),
+        "providers_title": "📡 <b>プロバイダー（優先順）</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA：{latency}、✅ {success:.0f}%\n"
+            "   呼び出し：{calls}、エラー：{failures}（連続：{consecutive}）"
+        ),
+        "providers_seconds": "{value:.2f} 秒",
+        "providers_cooldown": "   クールダウン：{cooldown:.0f} 秒",
+        "providers_http": (
+            "   🔌 リクエスト：{requests}、新規接続：{new_connections}"
+            "（再利用：{reuse:.0f}%{http2}）"
+        ),
+        "providers_retries": "   🔁 リトライ：{retries}、予算による拒否：{exhausted}",
+        "providers_pool": (
+            "   ⚙️ プロセス：{busy}/{max_workers} 使用中、ジョブ：{jobs}、"
+            "強制終了：{killed}、再起動：{recycled}\n"
+            "   🧊 コールドスタート：{cold:.2f} 秒（{cold_jobs}）、🔥 ウォーム：{warm:.2f} 秒"
+            "（{warm_jobs}）、初期化：{init:.2f} 秒"
+        ),
+        "providers_last_error": "   最後のエラー：{error}",
+        "providers_downloads": (
+            "\n💾 <b>ダウンロード</b>：{dirs} フォルダー、"
+            "予約 {reserved:.0f}/{quota:.0f} MB、ディスク上 {used:.0f} MB{free}\n"
+            "   空き待ち：{waiting}（累計：{waited}）、クリーナー削除：{removed}"
+        ),
+        "providers_disk_free": "、空き {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>：更新あたり {avg:.1f} 回の呼び出し"
+            "（最大 {max_calls}、更新：{updates}、バックグラウンド呼び出し：{background}）"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>リクエスト統合</b>：開始したダウンロード {started}、"
+            "合流 {coalesced}、実行中 {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>：{size}/{max_size} 件",
+        "providers_status_edits": (
+            "✏️ <b>ステータスメッセージ</b>：編集 {edits}、重複スキップ {skipped}、"
+            "統合 {coalesced}、flood control 待機 {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>ステータス削除</b>：待機中 {pending}、削除済み {deleted}"
+            "（{api_calls} 回の呼び出し）、失敗 {failed}、flood control 待機 {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -758,6 +1176,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Nie udało się pobrać filmu. Sprawdź link lub spróbuj ponownie później.",
+        "video_too_large": (
+            "❌ Film jest za duży: "
+            "Telegram nie pozwala botom wysyłać plików większych niż 50 MB."
+        ),
         "service_unavailable": "🔧 Usługa tymczasowo niedostępna. Szukam stabilnego API...",
         "invalid_video_url": "❌ Otrzymano nieprawidłowy URL filmu. Spróbuj innego linku.",
         
@@ -780,6 +1202,54 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Logi włączone ✅",
         "logs_disabled": "Logi wyłączone 🚫",
         "cache_cleared": "🧹 Cache wyczyszczony!\nWpisy: {size}/{max_size}",
+        "cache_stats": (
+            "📊 Trafienia: {hits}, chybienia: {misses} ({hit_rate:.0f}%)\n"
+            "Usunięte: {evictions}, wygasłe: {expirations}"
+        ),
+        "providers_title": "📡 <b>Dostawcy (według priorytetu)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ {success:.0f}%\n"
+            "   Wywołania: {calls}, błędy: {failures} (z rzędu: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} s",
+        "providers_cooldown": "   Wychładzanie: {cooldown:.0f} s",
+        "providers_http": (
+            "   🔌 Żądania: {requests}, nowe połączenia: {new_connections} "
+            "(ponownie użyte: {reuse:.0f}%{http2})"
+        ),
+        "providers_retries": "   🔁 Ponowienia: {retries}, odmowy budżetu: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Procesy: {busy}/{max_workers} zajęte, zadania: {jobs}, "
+            "zabite: {killed}, zrestartowane: {recycled}\n"
+            "   🧊 Zimny start: {cold:.2f} s ({cold_jobs}), 🔥 ciepły: {warm:.2f} s "
+            "({warm_jobs}), inicjalizacja: {init:.2f} s"
+        ),
+        "providers_last_error": "   Ostatni błąd: {error}",
+        "providers_downloads": (
+            "\n💾 <b>Pobieranie</b>: {dirs} folderów, "
+            "rezerwa {reserved:.0f}/{quota:.0f} MB, na dysku {used:.0f} MB{free}\n"
+            "   Czeka na miejsce: {waiting} (łącznie czekało: {waited}), "
+            "sprzątacz usunął: {removed}"
+        ),
+        "providers_disk_free": ", wolne {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: {avg:.1f} wywołań na aktualizację "
+            "(maks. {max_calls}, aktualizacji: {updates}, wywołań w tle: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>Łączenie żądań</b>: uruchomione pobierania {started}, "
+            "dołączenia {coalesced}, trwające {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} wpisów",
+        "providers_status_edits": (
+            "✏️ <b>Wiadomości o stanie</b>: edycje {edits}, pominięte duplikaty {skipped}, "
+            "połączone {coalesced}, pauzy flood control {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Sprzątanie stanów</b>: w kolejce {pending}, usunięte {deleted} "
+            "w {api_calls} wywołaniach, błędy {failed}, pauzy flood control {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -848,6 +1318,10 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
             "https://vm.tiktok.com/XXXXXXX/"
         ),
         "download_error": "❌ Video alınamadı. Bağlantıyı kontrol edin veya daha sonra tekrar deneyin.",
+        "video_too_large": (
+            "❌ Video çok büyük: "
+            "Telegram botların 50 MB'tan büyük dosya göndermesine izin vermiyor."
+        ),
         "service_unavailable": "🔧 Hizmet geçici olarak kullanılamıyor. Kararlı bir API arıyorum...",
         "invalid_video_url": "❌ Geçersiz video URL'si alındı. Başka bir bağlantı deneyin.",
         
@@ -870,6 +1344,54 @@ TRANSLATIONS: Dict[Language, Dict[str, str]] = {
         "logs_enabled": "Loglar etkinleştirildi ✅",
         "logs_disabled": "Loglar devre dışı bırakıldı 🚫",
         "cache_cleared": "🧹 Önbellek temizlendi!\nGirişler: {size}/{max_size}",
+        "cache_stats": (
+            "📊 İsabet: {hits}, ıska: {misses} (%{hit_rate:.0f})\n"
+            "Çıkarılan: {evictions}, süresi dolan: {expirations}"
+        ),
+        "providers_title": "📡 <b>Sağlayıcılar (öncelik sırasına göre)</b>\n",
+        "providers_item": (
+            "{index}. {icon} <b>{name}</b>\n"
+            "   ⏱ EWMA: {latency}, ✅ %{success:.0f}\n"
+            "   Çağrı: {calls}, hata: {failures} (art arda: {consecutive})"
+        ),
+        "providers_seconds": "{value:.2f} sn",
+        "providers_cooldown": "   Soğuma: {cooldown:.0f} sn",
+        "providers_http": (
+            "   🔌 İstek: {requests}, yeni bağlantı: {new_connections} "
+            "(yeniden kullanım: %{reuse:.0f}{http2})"
+        ),
+        "providers_retries": "   🔁 Yeniden deneme: {retries}, bütçe reddi: {exhausted}",
+        "providers_pool": (
+            "   ⚙️ Süreç: {busy}/{max_workers} meşgul, iş: {jobs}, "
+            "sonlandırılan: {killed}, yeniden başlatılan: {recycled}\n"
+            "   🧊 Soğuk başlangıç: {cold:.2f} sn ({cold_jobs}), 🔥 sıcak: {warm:.2f} sn "
+            "({warm_jobs}), başlatma: {init:.2f} sn"
+        ),
+        "providers_last_error": "   Son hata: {error}",
+        "providers_downloads": (
+            "\n💾 <b>İndirmeler</b>: {dirs} klasör, "
+            "ayrılan {reserved:.0f}/{quota:.0f} MB, diskte {used:.0f} MB{free}\n"
+            "   Yer bekleyen: {waiting} (toplam bekleyen: {waited}), "
+            "temizleyicinin sildiği: {removed}"
+        ),
+        "providers_disk_free": ", boş {free:.0f} MB",
+        "providers_bot_api": (
+            "\n🤖 <b>Bot API</b>: güncelleme başına {avg:.1f} çağrı "
+            "(en fazla {max_calls}, güncelleme: {updates}, arka plan çağrısı: {background})"
+        ),
+        "providers_flights": (
+            "\n🔗 <b>İstek birleştirme</b>: başlatılan indirme {started}, "
+            "katılan {coalesced}, süren {in_flight}"
+        ),
+        "providers_file_ids": "📎 <b>file_id</b>: {size}/{max_size} kayıt",
+        "providers_status_edits": (
+            "✏️ <b>Durum mesajları</b>: düzenleme {edits}, atlanan tekrar {skipped}, "
+            "birleştirilen {coalesced}, flood control beklemesi {flood_waits}"
+        ),
+        "providers_deletions": (
+            "🗑 <b>Durum temizliği</b>: kuyrukta {pending}, silinen {deleted} "
+            "({api_calls} çağrıda), hata {failed}, flood control beklemesi {flood_waits}"
+        ),
         
         # Рассылка
         "broadcast_start": (
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+
+@dataclass(slots=True)
+class StatusEditStats:
+    """Суммарные метрики правок статусных сообщений за время работы бота"""
+
+    edits: int = 0
+    skipped: int = 0
+    coalesced: int = 0
+    flood_waits: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "edits": self.edits,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "flood_waits": self.flood_waits,
+        }
+
+
+class ThrottledMessageEditor:
+    """Статусное сообщение с ограничением частоты правок.
+
+    ``submit`` не ждет Telegram: последний текст отрисовывает фоновая задача,
+    не чаще одного раза в ``min_interval_sec``; промежуточные тексты
+    схлопываются, одинаковые правки пропускаются. На 429 задача ждет
+    ``retry_after`` и отправляет самый свежий текст.
+
+    ``show`` отправляет текст сразу, без ``min_interval_sec``, - так работает
+    классический режим прогресса. Во время flood control ``show`` не ждет,
+    а передает текст фоновой задаче.
+    """
+
+    def __init__(
+        self, message: Message, min_interval_sec: float = 1.0, parse_mode: str | None = "HTML"
+    ) -> None:
+        self._message = message
+        self._min_interval_sec = min_interval_sec
+        self._parse_mode = parse_mode
+        self._status_message: Message | None = None
+        self._last_text: str | None = None
+        self._last_sent_at = 0.0
+        self._flood_until = 0.0
+        self._pending_text: str | None = None
+        self._pending_kwargs: dict[str, Any] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._sending = False
+        self._logger = logging.getLogger(__name__)
+
+    @property
+    def status_message(self) -> Message | None:
+        return self._status_message
+
+    @property
+    def flood_wait_sec(self) -> float:
+        """Сколько еще действует flood control Telegram"""
+        return max(0.0, self._flood_until - time.monotonic())
+
+    def submit(self, text: str, **kwargs: Any) -> None:
+        """Ставит текст в очередь на отрисовку (без ожидания)"""
+        if self._pending_text is not None:
+            status_edit_stats.coalesced += 1
+        self._pending_text = text
+        self._pending_kwargs = kwargs
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def show(self, text: str, **kwargs: Any) -> None:
+        """Отрисовывает текст сразу, дождавшись фоновой отправки"""
+        await self.settle()
+        if self.flood_wait_sec > 0:
+            # Telegram все равно отклонит правку - отправит фоновая задача
+            self.submit(text, **kwargs)
+            return
+        try:
+            await self._send(text, **kwargs)
+        except TelegramRetryAfter as e:
+            self._start_flood_wait(e.retry_after)
+            self.submit(text, **kwargs)
+
+    async def settle(self) -> None:
+        """Отбрасывает неотрисованный текст и дожидается текущей отправки"""
+        self._pending_text = None
+        self._pending_kwargs = {}
+        if self._task is not None:
+            if not self._sending:
+                # Задача только ждет конца интервала - ждать ее незачем
+                self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while self._pending_text is not None:
+            ready_at = self._flood_until
+            if self._status_message is not None:
+                ready_at = max(ready_at, self._last_sent_at + self._min_interval_sec)
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                # Копим изменения до конца интервала - отправится последнее
+                await asyncio.sleep(wait)
+                continue
+            text, self._pending_text = self._pending_text, None
+            kwargs, self._pending_kwargs = self._pending_kwargs, {}
+            self._sending = True
+            try:
+                await self._send(text, **kwargs)
+            except TelegramRetryAfter as e:
+                self._start_flood_wait(e.retry_after)
+                if self._pending_text is None:
+                    self._pending_text = text
+                    self._pending_kwargs = kwargs
+            except Exception as e:
+                self._logger.warning("Ошибка обновления статуса: %s", e)
+            finally:
+                self._sending = False
+
+    def _start_flood_wait(self, retry_after: float) -> None:
+        status_edit_stats.flood_waits += 1
+        self._logger.info("Flood control на статусе: ждем %s с", retry_after)
+        self._flood_until = time.monotonic() + retry_after
+
+    async def _send(self, text: str, **kwargs: Any) -> None:
+        kwargs.setdefault("parse_mode", self._parse_mode)
+        if self._status_message is None:
+            self._status_message = await self._message.reply(text, **kwargs)
+        elif text == self._last_text:
+            status_edit_stats.skipped += 1
+            return
+        else:
+            try:
+                await self._status_message.edit_text(text, **kwargs)
+            except TelegramBadRequest as e:
+                # Telegram отвергает правку без изменений - это не ошибка
+                if "message is not modified" not in str(e):
+                    raise
+            status_edit_stats.edits += 1
+        self._last_text = text
+        self._last_sent_at = time.monotonic()
+
+
+# Глобальные метрики всех статусных сообщений
+status_edit_stats = StatusEditStats()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+class PersistentCache:
+    """Дисковый уровень кэша результатов (SQLite), переживающий перезапуски.
+
+    Все методы синхронные и потокобезопасные; из event loop их вызывают через
+    ``asyncio.to_thread``.
+    """
+
+    def __init__(self, storage_file: str = "video_cache.sqlite3") -> None:
+        self._storage_file = Path(storage_file)
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+        self._conn = sqlite3.connect(self._storage_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at)")
+        self._conn.commit()
+        self._compactor: asyncio.Task[None] | None = None
+
+    def get(self, key: str) -> tuple[Any, float] | None:
+        """Возвращает (значение, оставшийся TTL) или None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET hits = hits + 1, accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, key: str, value: Any, ttl_sec: float | None) -> None:
+        now = time.time()
+        expires_at = now + ttl_sec if ttl_sec is not None else now + 365 * 24 * 3600
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def hot_entries(self, limit: int) -> list[tuple[str, Any, float]]:
+        """Самые востребованные живые записи: (ключ, значение, оставшийся TTL)"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, expires_at FROM cache WHERE expires_at > ? "
+                "ORDER BY hits DESC, accessed_at DESC LIMIT ?",
+                (now, limit),
+            ).fetchall()
+        return [(key, json.loads(value), expires_at - now) for key, value, expires_at in rows]
+
+    def compact(self) -> int:
+        """Удаляет просроченные записи, возвращает их количество"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    async def warm(self, cache: Any, limit: int = 1000) -> None:
+        """Загружает горячие записи в кэш в памяти (в фоне, не блокируя запуск)"""
+        try:
+            entries = await asyncio.to_thread(self.hot_entries, limit)
+            for key, value, ttl in entries:
+                cache.set_local(key, value, ttl)
+            self._logger.info("Прогрето %d записей кэша с диска", len(entries))
+        except Exception as e:
+            self._logger.warning("Ошибка прогрева кэша: %s", e)
+
+    def start_compaction(self, interval_sec: float = 600.0) -> None:
+        """Запускает фоновое удаление просроченных записей"""
+        if self._compactor is None:
+            self._compactor = asyncio.create_task(self._compact_loop(interval_sec))
+
+    async def _compact_loop(self, interval_sec: float) -> None:
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.compact)
+                if deleted:
+                    self._logger.info("Удалено %d просроченных записей кэша", deleted)
+            except Exception as e:
+                self._logger.warning("Ошибка очистки кэша на диске: %s", e)
+            await asyncio.sleep(interval_sec)
+
+    async def aclose(self) -> None:
+        if self._compactor is not None:
+            self._compactor.cancel()
+            await asyncio.gather(self._compactor, return_exceptions=True)
+            self._compactor = None
+        with self._lock:
+            self._conn.close()
@@ -1,24 +1,38 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from typing import Any
 
 from aiogram.types import Message
 
+from app.services.deferred import deletion_scheduler
 from app.services.localization import Localization
+from app.services.message_editor import ThrottledMessageEditor
 
 
 class ProgressBar:
-    """Система прогресс-бара для отображения этапов обработки"""
+    """Система прогресс-бара для отображения этапов обработки.
+
+    В фоновом режиме (``background=True``) обновления не ждут Telegram: их
+    отрисовывает ``ThrottledMessageEditor`` не чаще раза в ``min_interval_sec``,
+    а промежуточные этапы схлопываются в последний. В классическом режиме
+    каждый этап отправляется сразу, без ограничения частоты правок.
+    """
     
-    def __init__(self, message: Message) -> None:
+    def __init__(
+        self, message: Message, background: bool = False, min_interval_sec: float = 1.0
+    ) -> None:
         self._message = message
         self._logger = logging.getLogger(__name__)
         self._current_step = 0
         self._total_steps = 0
-        self._status_message: Message | None = None
+        self._editor = ThrottledMessageEditor(message, min_interval_sec=min_interval_sec)
         self._steps: list[str] = []
+        self._background = background
+
+    @property
+    def _status_message(self) -> Message | None:
+        return self._editor.status_message
     
     async def start(self, steps: list[str]) -> None:
         """Начинает отображение прогресс-бара"""
@@ -27,8 +41,7 @@ class ProgressBar:
         self._current_step = 0
         
         # Отправляем начальное сообщение
-        progress_text = self._get_progress_text()
-        self._status_message = await self._message.reply(progress_text)
+        await self._show(self._get_progress_text())
     
     async def update(self, step_index: int, custom_text: str | None = None) -> None:
         """Обновляет прогресс-бар"""
@@ -38,31 +51,38 @@ class ProgressBar:
         self._current_step = step_index
         progress_text = self._get_progress_text(custom_text)
         
-        if self._status_message:
+        if self._status_message or self._background:
             try:
-                await self._status_message.edit_text(progress_text)
+                await self._show(progress_text)
             except Exception as e:
                 self._logger.warning("Ошибка обновления прогресс-бара: %s", e)
     
+    async def _show(self, text: str) -> None:
+        """Показывает текст: сразу или через фоновую задачу"""
+        if self._background:
+            self._editor.submit(text)
+        else:
+            await self._editor.show(text)
+
     async def complete(self, success_text: str = "✅ Готово!") -> None:
         """Завершает прогресс-бар"""
+        await self._editor.settle()
         if self._status_message:
             try:
-                await self._status_message.edit_text(success_text)
-                # Удаляем сообщение через 3 секунды
-                await asyncio.sleep(3)
-                await self._status_message.delete()
+                await self._editor.show(success_text, parse_mode=None)
+                # Удаляем сообщение через 3 секунды после отрисовки, не задерживая обработчик
+                deletion_scheduler.schedule(self._status_message, 3 + self._editor.flood_wait_sec)
             except Exception as e:
                 self._logger.warning("Ошибка завершения прогресс-бара: %s", e)
     
     async def error(self, error_text: str) -> None:
         """Показывает ошибку в прогресс-баре"""
+        await self._editor.settle()
         if self._status_message:
             try:
-                await self._status_message.edit_text(f"❌ {error_text}")
-                # Удаляем сообщение через 5 секунд
-                await asyncio.sleep(5)
-                await self._status_message.delete()
+                await self._editor.show(f"❌ {error_text}", parse_mode=None)
+                # Удаляем сообщение через 5 секунд после отрисовки, не задерживая обработчик
+                deletion_scheduler.schedule(self._status_message, 5 + self._editor.flood_wait_sec)
             except Exception as e:
                 self._logger.warning("Ошибка отображения ошибки: %s", e)
     
@@ -91,8 +111,8 @@ class ProgressBar:
 class TikTokProgressBar(ProgressBar):
     """Специализированный прогресс-бар для TikTok"""
     
-    def __init__(self, message: Message, loc: Localization) -> None:
-        super().__init__(message)
+    def __init__(self, message: Message, loc: Localization, background: bool = False) -> None:
+        super().__init__(message, background=background)
         self._loc = loc
         self._steps = [
             loc.get("progress_analyzing"),
@@ -100,13 +120,11 @@ class TikTokProgressBar(ProgressBar):
             loc.get("progress_downloading"),
             loc.get("progress_sending")
         ]
+        self._total_steps = len(self._steps)
     
     async def _update_status(self, text: str) -> None:
         """Обновляет статусное сообщение"""
-        if self._status_message:
-            await self._status_message.edit_text(text)
-        else:
-            self._status_message = await self._message.reply(text)
+        await self._show(text)
     
     async def start_download(self) -> None:
         """Начинает процесс скачивания"""
@@ -124,6 +142,19 @@ class TikTokProgressBar(ProgressBar):
         """Этап скачивания файла"""
         await self.update(2)
     
+    def download_progress(self, downloaded: int, total: int | None) -> None:
+        """Байтовый прогресс скачивания (только в фоновом режиме)"""
+        if not self._background or self._current_step > 2:
+            return
+        mb = 1024 * 1024
+        amount = f"{downloaded / mb:.1f} MB"
+        if total:
+            amount = f"{downloaded / mb:.1f}/{total / mb:.1f} MB"
+        self._current_step = 2
+        self._editor.submit(
+            self._get_progress_text(f"{self._loc.get('progress_downloading')} {amount}")
+        )
+
     async def sending_video(self) -> None:
         """Этап отправки видео"""
         await self.update(3)
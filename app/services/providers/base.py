@@ -1,12 +1,69 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Literal
+
+# Откуда берется видео: локальный файл, байты в памяти (небольшие файлы)
+# или прямая ссылка, которую Telegram скачает сам
+VideoSource = Literal["file", "memory", "url"]
+
+# Колбэк байтового прогресса скачивания: (скачано, всего или None)
+ProgressCallback = Callable[[int, int | None], None]
+
+# Обработчик выставляет колбэк перед запросом, провайдеры читают его при скачивании
+download_progress: ContextVar[ProgressCallback | None] = ContextVar(
+    "download_progress", default=None
+)
+
+
+@dataclass(slots=True)
+class VideoResult:
+    """Результат провайдера: где лежит видео и что о нем уже известно"""
+
+    source: VideoSource
+    location: str  # путь к файлу, имя файла в памяти или URL
+    provider: str
+    size: int | None = None
+    duration: float | None = None
+    width: int | None = None
+    height: int | None = None
+    video_id: str | None = None
+    thumbnail: str | None = None
+    data: bytes | None = field(default=None, repr=False)
+
+    @property
+    def is_file(self) -> bool:
+        return self.source == "file"
+
+    def to_dict(self) -> dict[str, Any]:
+        result = asdict(self)
+        result.pop("data")
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> VideoResult:
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
 
 
 class VideoProvider(ABC):
     @abstractmethod
-    async def get_download_url(self, tiktok_url: str) -> str:
+    async def get_video(self, tiktok_url: str) -> VideoResult:
         raise NotImplementedError
 
+    async def discard(self, result: VideoResult) -> None:
+        """Освобождает результат, который оказался не нужен (например, проигравший в гонке)"""
+        # spool импортирует этот модуль - импорт здесь, чтобы не было цикла
+        from app.services.spool import release_video
+
+        await release_video(result)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Внутренние метрики провайдера для админской статистики"""
+        return {}
+
     async def aclose(self) -> None:
         pass
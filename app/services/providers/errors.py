@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+from typing import Final
+
+# Сбои сервиса, а не видео: 5xx, 429, таймауты - проверяются первыми
+_TRANSIENT_RE: Final = re.compile(
+    r"\bhttp(?: error)?:? ?(?:5\d\d|429)\b|too many requests|rate.?limit|"
+    r"timed? ?out|temporar|try again|service unavailable|bad gateway",
+    flags=re.IGNORECASE,
+)
+
+# Признаки того, что недоступно само видео (удалено, приватное, гео-блок)
+_PERMANENT_RE: Final = re.compile(
+    r"video (?:is )?unavailable|video (?:is )?not available|private video|"
+    r"(?:video|account|post) is private|has been (?:removed|deleted)|"
+    r"video (?:not found|does not exist)|not available in your (?:country|region)|"
+    r"geo.?restrict|copyright|http error (?:404|410)|unsupported url|"
+    r"url parsing is failed|status code 102(?:04|16|22)",
+    flags=re.IGNORECASE,
+)
+
+
+class ProviderError(ValueError):
+    """Ошибка провайдера; наследуется от ValueError для совместимости"""
+
+    permanent: bool = False
+
+
+class PermanentProviderError(ProviderError):
+    """Видео нельзя получить ни сейчас, ни при повторе"""
+
+    permanent = True
+
+
+class VideoTooLargeError(PermanentProviderError):
+    """Видео больше лимита загрузки Telegram"""
+
+
+class TransientProviderError(ProviderError):
+    """Временная ошибка: повтор может помочь"""
+
+
+def looks_permanent(message: str) -> bool:
+    """Определяет по тексту ошибки, что видео недоступно навсегда"""
+    if _TRANSIENT_RE.search(message):
+        return False
+    return bool(_PERMANENT_RE.search(message))
+
+
+def is_permanent(error: BaseException) -> bool:
+    return isinstance(error, ProviderError) and error.permanent
@@ -2,44 +2,260 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, Literal, NoReturn
 
-from app.services.providers.base import VideoProvider
+from app.services.providers.base import VideoProvider, VideoResult
+from app.services.providers.errors import (
+    TransientProviderError,
+    VideoTooLargeError,
+    is_permanent,
+)
+from app.services.providers.stats import ProviderStats
+
+ResolverMode = Literal["sequential", "hedged", "race"]
 
 
 class MultiProviderResolver:
-    """Резолвер с приоритетом провайдеров - пробует по порядку"""
-    
-    def __init__(self, providers: list[VideoProvider]) -> None:
+    """Резолвер с адаптивным приоритетом провайдеров.
+
+    Режимы:
+    - ``sequential`` - пробует провайдеров строго по порядку;
+    - ``hedged`` - запускает основной, а следующий - через ``hedge_delay_sec``
+      (или сразу после ошибки предыдущего);
+    - ``race`` - запускает всех сразу и берет первый успешный результат.
+
+    Порядок пересчитывается на каждый вызов по EWMA задержки и доле успехов.
+    После ``failure_threshold`` ошибок подряд предохранитель провайдера
+    размыкается, а по истечении охлаждения провайдер проверяется фоновой пробой.
+    """
+
+    def __init__(
+        self,
+        providers: list[VideoProvider],
+        mode: ResolverMode = "hedged",
+        hedge_delay_sec: float = 3.0,
+        failure_threshold: int = 3,
+        open_cooldown_sec: float = 30.0,
+    ) -> None:
         self._providers = providers
+        self._mode: ResolverMode = mode
+        self._hedge_delay_sec = max(0.0, hedge_delay_sec)
+        self._stats: dict[int, ProviderStats] = {
+            id(provider): ProviderStats(
+                name=type(provider).__name__,
+                failure_threshold=max(1, failure_threshold),
+                base_cooldown_sec=open_cooldown_sec,
+            )
+            for provider in providers
+        }
+        # Проба повторяет последнюю ссылку, которую провайдеры смогли обработать
+        self._last_good_url: str | None = None
+        self._last_url: str | None = None
+        self._probes: dict[int, asyncio.Task[None]] = {}
         self._logger = logging.getLogger(__name__)
 
-    async def get_fastest_url(self, tiktok_url: str) -> str:
-        """Пробует провайдеров по порядку, возвращает первый успешный"""
+    async def get_video(self, tiktok_url: str) -> VideoResult:
+        """Возвращает первый успешный результат согласно режиму резолвера"""
         if not self._providers:
             raise ValueError("Нет доступных провайдеров")
-        
-        last_error = None
-        
-        for i, provider in enumerate(self._providers):
+
+        self._last_url = tiktok_url
+        self._schedule_probes()
+        providers = self._ranked_providers()
+
+        if self._mode == "sequential" or len(providers) == 1:
+            return await self._resolve_sequential(providers, tiktok_url)
+
+        hedge_delay = 0.0 if self._mode == "race" else self._hedge_delay_sec
+        return await self._resolve_hedged(providers, tiktok_url, hedge_delay)
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        """Статистика провайдеров в текущем порядке приоритета (отключенные - в конце)"""
+        ranked = self._ranked_providers()
+        ranked += [p for p in self._providers if p not in ranked]
+        return [
+            {**self._stats[id(provider)].as_dict(), "metrics": provider.get_metrics()}
+            for provider in ranked
+        ]
+
+    def _ranked_providers(self) -> list[VideoProvider]:
+        """Доступные провайдеры, отсортированные по ожидаемой стоимости запроса"""
+        order = {id(provider): i for i, provider in enumerate(self._providers)}
+        available = [p for p in self._providers if self._stats[id(p)].is_available()]
+        if not available:
+            # Все предохранители разомкнуты - лучше попробовать всех, чем отказать сразу
+            available = list(self._providers)
+        return sorted(available, key=lambda p: (self._stats[id(p)].score(), order[id(p)]))
+
+    async def _call(self, provider: VideoProvider, tiktok_url: str) -> VideoResult:
+        """Вызывает провайдера и учитывает результат в его статистике"""
+        stats = self._stats[id(provider)]
+        started = time.monotonic()
+        try:
+            result = await provider.get_video(tiktok_url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_permanent(e):
+                # Видео недоступно или слишком большое - это не сбой провайдера
+                stats.record_content_error(e)
+                raise
+            was_closed = stats.state == "closed"
+            stats.record_failure(time.monotonic() - started, e)
+            if was_closed and stats.state == "open":
+                self._logger.warning(
+                    "Предохранитель %s разомкнут на %.0f с", stats.name, stats.cooldown_sec
+                )
+            raise
+        stats.record_success(time.monotonic() - started)
+        self._last_good_url = tiktok_url
+        return result
+
+    async def _resolve_sequential(
+        self, providers: list[VideoProvider], tiktok_url: str
+    ) -> VideoResult:
+        """Пробует провайдеров по порядку, возвращает первый успешный"""
+        errors: list[Exception] = []
+
+        for i, provider in enumerate(providers):
             try:
-                self._logger.info("Пробуем провайдер %d/%d", i + 1, len(self._providers))
-                result = await provider.get_download_url(tiktok_url)
-                self._logger.info("Провайдер %d успешно вернул URL", i + 1)
+                self._logger.info("Пробуем провайдер %d/%d", i + 1, len(providers))
+                result = await self._call(provider, tiktok_url)
+                self._logger.info("Провайдер %d успешно вернул видео", i + 1)
                 return result
             except Exception as e:
                 self._logger.warning("Провайдер %d не сработал: %s", i + 1, str(e))
-                last_error = e
+                errors.append(e)
                 continue
-        
+
         # Если все провайдеры не сработали
-        if last_error:
-            raise last_error
-        else:
+        self._raise_combined(errors)
+
+    async def _resolve_hedged(
+        self, providers: list[VideoProvider], tiktok_url: str, hedge_delay: float
+    ) -> VideoResult:
+        """Запускает провайдеров с задержкой хеджирования и берет первый успешный"""
+        pending: dict[asyncio.Task[VideoResult], VideoProvider] = {}
+        next_index = 0
+        errors: list[Exception] = []
+
+        def launch_next() -> None:
+            nonlocal next_index
+            provider = providers[next_index]
+            self._logger.info("Запускаем провайдер %d/%d", next_index + 1, len(providers))
+            task = asyncio.create_task(self._call(provider, tiktok_url))
+            pending[task] = provider
+            next_index += 1
+
+        launch_next()
+        try:
+            while pending:
+                if hedge_delay == 0.0:
+                    while next_index < len(providers):
+                        launch_next()
+
+                has_reserve = next_index < len(providers)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if has_reserve else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    # Основной провайдер завис - подключаем следующий
+                    self._logger.info("Провайдер не ответил за %.1f с, хеджируем", hedge_delay)
+                    launch_next()
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    name = self._stats[id(provider)].name
+                    error = task.exception()
+                    if error is None:
+                        self._logger.info("Провайдер %s успешно вернул видео", name)
+                        return task.result()
+                    self._logger.warning("Провайдер %s не сработал: %s", name, error)
+                    errors.append(error)  # type: ignore[arg-type]
+                    # Ошибка - не ждем задержки, сразу подключаем следующего
+                    if next_index < len(providers):
+                        launch_next()
+        finally:
+            if pending:
+                await self._cancel_losers(pending)
+
+        self._raise_combined(errors)
+
+    def _raise_combined(self, errors: list[Exception]) -> NoReturn:
+        """Ошибка постоянная, только если все опрошенные провайдеры сочли ее постоянной"""
+        if not errors:
             raise ValueError("Все провайдеры не сработали")
+        last_error = errors[-1]
+        if is_permanent(last_error) and not all(is_permanent(e) for e in errors):
+            raise TransientProviderError(str(last_error)) from last_error
+        # Превышение лимита важнее прочих причин - о нем стоит сказать пользователю
+        too_large = [e for e in errors if isinstance(e, VideoTooLargeError)]
+        if too_large and all(is_permanent(e) for e in errors):
+            raise too_large[-1]
+        raise last_error
+
+    async def _cancel_losers(
+        self, pending: dict[asyncio.Task[VideoResult], VideoProvider]
+    ) -> None:
+        """Отменяет проигравших провайдеров и освобождает их результаты"""
+        for task in pending:
+            task.cancel()
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        for (task, provider), result in zip(pending.items(), results, strict=True):
+            if isinstance(result, VideoResult):
+                # Провайдер успел завершиться до отмены - убираем за ним
+                await self._discard(provider, result)
+            elif not task.cancelled() and isinstance(result, Exception):
+                self._logger.debug("Провайдер завершился с ошибкой: %s", result)
+
+    def _schedule_probes(self) -> None:
+        """Запускает фоновую пробу для провайдеров с истекшим охлаждением"""
+        for provider in self._providers:
+            stats = self._stats[id(provider)]
+            key = id(provider)
+            if key in self._probes or not stats.probe_due():
+                continue
+            stats.state = "half_open"
+            self._probes[key] = asyncio.create_task(self._probe(provider))
+
+    async def _probe(self, provider: VideoProvider) -> None:
+        """Полуоткрытая проба: успех замыкает предохранитель, ошибка - размыкает снова"""
+        stats = self._stats[id(provider)]
+        try:
+            # Пока ни одна ссылка не удалась, пробуем последнюю запрошенную
+            probe_url = self._last_good_url or self._last_url
+            if probe_url is None:
+                stats.state = "open"
+                return
+            self._logger.info("Проба провайдера %s", stats.name)
+            result = await self._call(provider, probe_url)
+            self._logger.info("Провайдер %s восстановлен", stats.name)
+            await self._discard(provider, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._logger.info("Проба провайдера %s не удалась: %s", stats.name, e)
+        finally:
+            self._probes.pop(id(provider), None)
+
+    async def _discard(self, provider: VideoProvider, result: VideoResult) -> None:
+        try:
+            await provider.discard(result)
+        except Exception as e:
+            self._logger.warning("Ошибка освобождения результата провайдера: %s", e)
 
     async def aclose(self) -> None:
         """Закрытие всех провайдеров"""
+        for task in list(self._probes.values()):
+            task.cancel()
+        if self._probes:
+            await asyncio.gather(*self._probes.values(), return_exceptions=True)
+
         for provider in self._providers:
             try:
                 await provider.aclose()
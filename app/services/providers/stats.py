@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Literal
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+@dataclass(slots=True)
+class ProviderStats:
+    """Скользящая статистика провайдера и состояние его предохранителя"""
+
+    name: str
+    ewma_alpha: float = 0.3
+    failure_threshold: int = 3
+    base_cooldown_sec: float = 30.0
+    max_cooldown_sec: float = 600.0
+
+    ewma_latency_sec: float | None = None
+    ewma_success: float = 1.0
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: CircuitState = "closed"
+    opened_at: float = 0.0
+    cooldown_sec: float = 0.0
+    last_error: str | None = None
+
+    def record_success(self, latency_sec: float) -> None:
+        self.calls += 1
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._update(latency_sec, 1.0)
+        self.state = "closed"
+        self.cooldown_sec = 0.0
+
+    def record_failure(self, latency_sec: float, error: BaseException) -> None:
+        self.calls += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)[:200]
+        self._update(latency_sec, 0.0)
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_content_error(self, error: BaseException) -> None:
+        """Видео недоступно (удалено, приватное, слишком большое) - провайдер при этом исправен"""
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.last_error = str(error)[:200]
+        if self.state == "half_open":
+            # Провайдер ответил осмысленно - проба удалась
+            self.state = "closed"
+            self.cooldown_sec = 0.0
+
+    def is_available(self) -> bool:
+        """Можно ли отдавать провайдеру живой трафик"""
+        return self.state == "closed"
+
+    def probe_due(self, now: float | None = None) -> bool:
+        """Истекло ли время охлаждения открытого предохранителя"""
+        now = time.monotonic() if now is None else now
+        return self.state == "open" and now - self.opened_at >= self.cooldown_sec
+
+    def score(self) -> float:
+        """Ожидаемая «стоимость» запроса: меньше - лучше"""
+        if self.ewma_latency_sec is None:
+            return float("inf")
+        return self.ewma_latency_sec / max(self.ewma_success, 0.05)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "ewma_latency_sec": self.ewma_latency_sec,
+            "ewma_success": self.ewma_success,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "cooldown_sec": self.cooldown_sec,
+            "last_error": self.last_error,
+        }
+
+    def _update(self, latency_sec: float, success: float) -> None:
+        a = self.ewma_alpha
+        if self.ewma_latency_sec is None:
+            self.ewma_latency_sec = latency_sec
+        else:
+            self.ewma_latency_sec = a * latency_sec + (1 - a) * self.ewma_latency_sec
+        self.ewma_success = a * success + (1 - a) * self.ewma_success
+
+    def _open(self) -> None:
+        if self.state == "closed":
+            self.cooldown_sec = self.base_cooldown_sec
+        else:
+            # Повторное открытие после неудачной пробы - увеличиваем охлаждение
+            self.cooldown_sec = min(self.max_cooldown_sec, max(self.cooldown_sec, 1.0) * 2)
+        self.state = "open"
+        self.opened_at = time.monotonic()
@@ -4,7 +4,7 @@ import asyncio
 import logging
 from typing import Any
 
-from app.services.providers.base import VideoProvider
+from app.services.providers.base import VideoProvider, VideoResult
 
 
 class StubProvider(VideoProvider):
@@ -14,7 +14,7 @@ class StubProvider(VideoProvider):
         self._timeout_sec = timeout_sec
         self._logger = logging.getLogger(__name__)
 
-    async def get_download_url(self, tiktok_url: str) -> str:
+    async def get_video(self, tiktok_url: str) -> VideoResult:
         """Заглушка - всегда возвращает ошибку"""
         self._logger.info("StubProvider: попытка скачать %s", tiktok_url)
         
@@ -2,89 +2,136 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
 from typing import Any
 
 import httpx
 
-from app.services.providers.base import VideoProvider
-from app.services.cache import video_cache
+from app.config.settings import TELEGRAM_UPLOAD_LIMIT_BYTES, TELEGRAM_URL_SEND_LIMIT_BYTES
+from app.services.providers.base import (
+    VideoProvider,
+    VideoResult,
+    VideoSource,
+    download_progress,
+)
+from app.services.providers.errors import (
+    PermanentProviderError,
+    TransientProviderError,
+    VideoTooLargeError,
+    looks_permanent,
+)
+from app.services.tikwm_client import (
+    TikwmClient,
+    TikwmRetryableError,
+    TikwmVariant,
+    TikwmVideo,
+)
+from app.services.workspace import download_workspace
+from app.utils.net import download_to_file, probe_content_length
 
 
 class TikwmProvider(VideoProvider):
-    """Провайдер для TikWM API - резервный"""
+    """Провайдер для TikWM API - резервный (повторы, бюджет ретраев, hdplay)"""
     
-    def __init__(self, timeout_sec: float = 15.0) -> None:
-        self._timeout_sec = timeout_sec
+    def __init__(
+        self,
+        base_url: str = "https://www.tikwm.com/api/",
+        api_key: str | None = None,
+        timeout_sec: float = 15.0,
+        max_retries: int = 3,
+        max_bytes: int = TELEGRAM_UPLOAD_LIMIT_BYTES,
+        url_send_max_bytes: int = TELEGRAM_URL_SEND_LIMIT_BYTES,
+    ) -> None:
         self._logger = logging.getLogger(__name__)
-        self._base_url = "https://www.tikwm.com/api"
+        self._timeout_sec = timeout_sec
+        self._max_bytes = max_bytes
+        self._url_send_max_bytes = url_send_max_bytes
+        self._client = TikwmClient(
+            base_url=base_url,
+            api_key=api_key,
+            timeout_sec=timeout_sec,
+            max_retries=max_retries,
+        )
 
-    async def get_download_url(self, tiktok_url: str) -> str:
-        """Получает URL видео через TikWM API"""
+    async def get_video(self, tiktok_url: str) -> VideoResult:
+        """Получает видео через TikWM API"""
         self._logger.info("TikwmProvider: попытка скачать %s", tiktok_url)
-        
-        # Проверяем кэш
-        cached_url = video_cache.get(tiktok_url)
-        if cached_url:
-            self._logger.info("TikwmProvider: найден в кэше")
-            return cached_url
-        
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0 Safari/537.36"
-            ),
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Referer": "https://www.tikwm.com/",
-        }
-        
-        params = {
-            "url": tiktok_url,
-            "hd": "1",  # Запрашиваем HD качество
-        }
-        
+
         try:
-            async with httpx.AsyncClient(
-                timeout=httpx.Timeout(self._timeout_sec),
-                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
-            ) as client:
-                response = await client.get(
-                    self._base_url,
-                    headers=headers,
-                    params=params,
-                    follow_redirects=True
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Ищем видео без водяного знака
-                if isinstance(data, dict):
-                    # Проверяем разные возможные ключи
-                    video_url = (
-                        data.get("data", {}).get("play") or
-                        data.get("play") or
-                        data.get("data", {}).get("video") or
-                        data.get("video") or
-                        data.get("data", {}).get("url") or
-                        data.get("url")
-                    )
-                    
-                    if isinstance(video_url, str) and video_url.startswith("http"):
-                        self._logger.info("TikwmProvider: успешно получен URL")
-                        # Сохраняем в кэш
-                        video_cache.set(tiktok_url, video_url)
-                        return video_url
-                
-                raise ValueError("TikWM API не вернул валидный URL видео")
-                
-        except httpx.TimeoutException:
-            raise ValueError("TikWM API: превышено время ожидания")
+            video = await self._client.get_video(tiktok_url)
+        except httpx.TimeoutException as e:
+            raise TransientProviderError("TikWM API: превышено время ожидания") from e
         except httpx.HTTPStatusError as e:
-            raise ValueError(f"TikWM API: HTTP ошибка {e.response.status_code}")
+            raise TransientProviderError(
+                f"TikWM API: HTTP ошибка {e.response.status_code}"
+            ) from e
+        except TikwmRetryableError as e:
+            raise TransientProviderError(f"TikWM API: временная ошибка ({e})") from e
         except Exception as e:
-            raise ValueError(f"TikWM API: {str(e)}")
+            if looks_permanent(str(e)):
+                raise PermanentProviderError(f"TikWM API: {e!s}") from e
+            raise TransientProviderError(f"TikWM API: {e!s}") from e
+
+        variant, size = await self._pick_variant(video.variants)
+        if size is not None and size > self._url_send_max_bytes:
+            # Telegram не скачает по ссылке файл больше 20 МБ - загружаем сами
+            file_path = await self._download(variant.url)
+            return self._result(video, "file", file_path, size)
+
+        self._logger.info("TikwmProvider: успешно получен URL")
+        return self._result(video, "url", variant.url, size)
+
+    @staticmethod
+    def _result(
+        video: TikwmVideo, source: VideoSource, location: str, size: int | None
+    ) -> VideoResult:
+        return VideoResult(
+            source=source,
+            location=location,
+            provider="tikwm",
+            size=size,
+            duration=video.duration,
+            video_id=video.video_id,
+            thumbnail=video.thumbnail,
+        )
+
+    async def _pick_variant(self, variants: list[TikwmVariant]) -> tuple[TikwmVariant, int | None]:
+        """Лучшее качество, которое влезает в лимит загрузки Telegram"""
+        sizes: list[int | None] = []
+        for variant in variants:
+            size = variant.size
+            if size is None:
+                # API не сообщил размер - спрашиваем CDN
+                size = await probe_content_length(variant.url)
+            if size is None or size <= self._max_bytes:
+                return variant, size
+            sizes.append(size)
+        raise VideoTooLargeError(f"TikWM API: видео больше лимита ({min(sizes)} байт)")
+
+    async def _download(self, video_url: str) -> str:
+        try:
+            temp_dir = await asyncio.wait_for(download_workspace.create_dir(), self._timeout_sec)
+        except TimeoutError as e:
+            raise TransientProviderError("TikWM: нет места для скачивания (квота диска)") from e
+        file_path = os.path.join(temp_dir, "video.mp4")
+        try:
+            await download_to_file(
+                video_url, file_path, self._max_bytes, on_progress=download_progress.get()
+            )
+            await download_workspace.settle(temp_dir)
+        except BaseException as e:
+            await asyncio.shield(download_workspace.release(temp_dir))
+            if isinstance(e, httpx.HTTPError):
+                raise TransientProviderError(f"TikWM: ошибка скачивания ({e})") from e
+            if isinstance(e, ValueError):
+                raise VideoTooLargeError(f"TikWM: {e}") from e
+            raise
+        self._logger.info("TikwmProvider: большой файл скачан: %s", file_path)
+        return file_path
+
+    def get_metrics(self) -> dict[str, Any]:
+        return self._client.get_metrics()
 
     async def aclose(self) -> None:
-        """Закрытие ресурсов"""
-        pass
+        """Закрытие пула соединений"""
+        await self._client.aclose()
@@ -2,93 +2,114 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
-import tempfile
 from typing import Any
 
-from app.services.providers.base import VideoProvider
+from app.config.settings import TELEGRAM_UPLOAD_LIMIT_BYTES
+from app.services.providers.base import VideoProvider, VideoResult, download_progress
+from app.services.providers.errors import (
+    PermanentProviderError,
+    TransientProviderError,
+    VideoTooLargeError,
+    looks_permanent,
+)
+from app.services.spool import release_video, spool_to_memory
+from app.services.workspace import download_workspace
+from app.services.ytdlp_pool import WorkerJobError, YtDlpWorkerPool
 
 
 class YtDlpLocalProvider(VideoProvider):
-    """Локальный провайдер через yt-dlp - независимый от API"""
+    """Локальный провайдер через yt-dlp - независимый от API.
+
+    Скачивание выполняется в пуле рабочих процессов, поэтому по таймауту
+    оно действительно прерывается, а временная папка гарантированно удаляется.
+    """
     
-    def __init__(self, timeout_sec: float = 30.0) -> None:
+    def __init__(
+        self,
+        timeout_sec: float = 30.0,
+        pool: YtDlpWorkerPool | None = None,
+        max_bytes: int = TELEGRAM_UPLOAD_LIMIT_BYTES,
+        url_send_max_bytes: int = 0,
+        spool_max_bytes: int = 0,
+    ) -> None:
         self._timeout_sec = timeout_sec
+        self._pool = pool or YtDlpWorkerPool()
+        self._max_bytes = max_bytes
+        # Прямые ссылки TikTok CDN из yt-dlp требуют cookies, поэтому отправка
+        # по ссылке по умолчанию выключена
+        self._url_send_max_bytes = url_send_max_bytes
+        # Файлы не больше этого размера отдаются из памяти, временная папка удаляется сразу
+        self._spool_max_bytes = spool_max_bytes
         self._logger = logging.getLogger(__name__)
 
-    async def get_download_url(self, tiktok_url: str) -> str:
+    async def get_video(self, tiktok_url: str) -> VideoResult:
         """Скачивает видео локально через yt-dlp"""
         self._logger.info("YtDlpLocalProvider: скачиваем %s", tiktok_url)
         
-        def _download() -> str:
-            import yt_dlp  # type: ignore
-
-            # Создаем временную папку
-            temp_dir = tempfile.mkdtemp(prefix="tiktok_")
-            output_path = os.path.join(temp_dir, "%(title)s.%(ext)s")
-            
-            ydl_opts = {
-                "outtmpl": output_path,
-                "format": "best[ext=mp4]/best",
-                "quiet": True,
-                "no_warnings": True,
-                "extract_flat": False,
-                "http_headers": {
-                    "User-Agent": (
-                        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0 Safari/537.36"
-                    ),
-                    "Referer": "https://www.tiktok.com/",
-                },
-                "extractor_args": {
-                    "tiktok": {
-                        "download_api": True,
-                    }
+        # Создаем временную папку (ждем, если квота диска исчерпана)
+        try:
+            temp_dir = await asyncio.wait_for(download_workspace.create_dir(), self._timeout_sec)
+        except TimeoutError as e:
+            raise TransientProviderError("yt-dlp: нет места для скачивания (квота диска)") from e
+        try:
+            result = await self._pool.run(
+                {
+                    "url": tiktok_url,
+                    "temp_dir": temp_dir,
+                    "max_bytes": self._max_bytes,
+                    "url_max_bytes": self._url_send_max_bytes,
                 },
-                "merge_output_format": "mp4",
-                "nocheckcertificate": True,
-                # Оптимизации для скорости
-                "socket_timeout": 10,
-                "retries": 2,
-                "fragment_retries": 2,
-                "concurrent_fragment_downloads": 4,
-                "http_chunk_size": 1048576,  # 1MB chunks
-            }
+                timeout_sec=self._timeout_sec,
+                on_progress=download_progress.get(),
+            )
+        except TimeoutError as e:
+            await self._remove_dir(temp_dir)
+            raise TransientProviderError("yt-dlp: превышено время ожидания") from e
+        except WorkerJobError as e:
+            await self._remove_dir(temp_dir)
+            if e.kind == "too_large":
+                raise VideoTooLargeError(f"yt-dlp: видео больше лимита ({e})") from e
+            if looks_permanent(str(e)):
+                raise PermanentProviderError(f"yt-dlp: {e}") from e
+            raise TransientProviderError(f"yt-dlp: {e}") from e
+        except BaseException:
+            # Отмена (проиграли гонку провайдеров) - процесс уже убит, убираем папку
+            await asyncio.shield(self._remove_dir(temp_dir))
+            raise
 
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(tiktok_url, download=True)
-                    
-                    # Ищем скачанный файл
-                    if isinstance(info, dict):
-                        filename = ydl.prepare_filename(info)
-                        if isinstance(filename, str) and os.path.exists(filename):
-                            self._logger.info("YtDlpLocalProvider: файл скачан: %s", filename)
-                            return filename
-                    
-                    # Если не нашли по prepare_filename, ищем в папке
-                    for file in os.listdir(temp_dir):
-                        if file.endswith('.mp4'):
-                            file_path = os.path.join(temp_dir, file)
-                            self._logger.info("YtDlpLocalProvider: найден файл: %s", file_path)
-                            return file_path
-                    
-                    raise ValueError("yt-dlp не смог скачать файл")
-                    
-            except Exception as e:
-                # Очищаем папку при ошибке
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                raise e
+        meta = {
+            "provider": "yt-dlp",
+            "size": result.get("size"),
+            "duration": result.get("duration"),
+            "width": result.get("width"),
+            "height": result.get("height"),
+            "video_id": result.get("video_id"),
+            "thumbnail": result.get("thumbnail"),
+        }
+        if "url" in result:
+            # Проба показала небольшой файл - Telegram скачает его по ссылке сам
+            await self._remove_dir(temp_dir)
+            self._logger.info("YtDlpLocalProvider: отправка по ссылке (%s байт)", result["size"])
+            return VideoResult(source="url", location=result["url"], **meta)
 
+        file_path = result["path"]
+        self._logger.info("YtDlpLocalProvider: файл скачан: %s", file_path)
+        video = VideoResult(source="file", location=file_path, **meta)
         try:
-            return await asyncio.wait_for(
-                asyncio.to_thread(_download), 
-                timeout=self._timeout_sec
-            )
-        except asyncio.TimeoutError:
-            raise ValueError("yt-dlp: превышено время ожидания")
+            video = await spool_to_memory(video, self._spool_max_bytes)
+            if video.is_file:
+                await download_workspace.settle(temp_dir)
+        except BaseException:
+            await asyncio.shield(release_video(video))
+            raise
+        return video
+
+    async def _remove_dir(self, temp_dir: str) -> None:
+        await download_workspace.release(temp_dir)
+
+    def get_metrics(self) -> dict[str, Any]:
+        return self._pool.get_stats()
 
     async def aclose(self) -> None:
-        """Закрытие ресурсов"""
-        pass
+        """Остановка рабочих процессов"""
+        await self._pool.aclose()
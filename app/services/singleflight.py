@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class _Flight[T]:
+    future: asyncio.Future[T]
+    waiters: int = 0
+
+
+class SingleFlight[T]:
+    """Объединяет одновременные запросы с одинаковым ключом в один вызов.
+
+    Каждый ``acquire`` должен завершаться парным ``release``: результат
+    освобождается через ``on_release`` только после ухода последнего ожидающего.
+    """
+
+    def __init__(self, on_release: Callable[[T], Awaitable[None]] | None = None) -> None:
+        self._flights: dict[Hashable, _Flight[T]] = {}
+        self._on_release = on_release
+        self._logger = logging.getLogger(__name__)
+        self._started = 0
+        self._coalesced = 0
+
+    async def acquire(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Возвращает результат общего вызова, запуская его при необходимости"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            flight.future.add_done_callback(lambda f, k=key: self._forget_failed(k, f))
+            self._flights[key] = flight
+            self._started += 1
+        else:
+            self._coalesced += 1
+            self._logger.info("Присоединяемся к уже идущей загрузке %s", key)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.future)
+        except BaseException:
+            await self._leave(key, flight)
+            raise
+
+    async def release(self, key: Hashable) -> None:
+        """Сообщает, что ожидающий закончил работу с результатом"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            await self._leave(key, flight)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "started": self._started,
+            "coalesced": self._coalesced,
+        }
+
+    async def _leave(self, key: Hashable, flight: _Flight[T]) -> None:
+        flight.waiters -= 1
+        if flight.waiters > 0:
+            return
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+        future = flight.future
+        if not future.done():
+            # Ждать больше некому - отменяем общий вызов
+            future.cancel()
+            return
+        if future.cancelled() or future.exception() is not None:
+            return
+        if self._on_release is not None:
+            try:
+                await self._on_release(future.result())
+            except Exception as e:
+                self._logger.warning("Ошибка освобождения результата %s: %s", key, e)
+
+    def _forget_failed(self, key: Hashable, future: asyncio.Future[T]) -> None:
+        """Ошибочный результат не раздаем новым запросам"""
+        if future.cancelled() or future.exception() is not None:
+            flight = self._flights.get(key)
+            if flight is not None and flight.future is future:
+                del self._flights[key]
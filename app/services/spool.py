@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import replace
+
+from app.services.providers.base import VideoResult
+from app.services.workspace import download_workspace
+
+
+async def release_video(video: VideoResult) -> None:
+    """Освобождает диск из-под результата провайдера (вне цикла событий)"""
+    if video.is_file:
+        await download_workspace.release(video.location)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def spool_to_memory(video: VideoResult, spool_max_bytes: int) -> VideoResult:
+    """Небольшой скачанный файл переносит в память и сразу освобождает диск.
+
+    Большие файлы (или неизвестного размера) остаются на диске как есть.
+    """
+    if not video.is_file or spool_max_bytes <= 0:
+        return video
+    try:
+        size = await asyncio.to_thread(os.path.getsize, video.location)
+    except OSError:
+        return video
+    if size > spool_max_bytes:
+        return video
+    data = await asyncio.to_thread(_read_file, video.location)
+    await release_video(video)
+    return replace(
+        video,
+        source="memory",
+        location=os.path.basename(video.location),
+        size=len(data),
+        data=data,
+    )
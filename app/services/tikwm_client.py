@@ -1,11 +1,52 @@
 from __future__ import annotations
 
 import asyncio
-import time
-from typing import Any
+import logging
+from typing import Any, NamedTuple
+from urllib.parse import urljoin
 
 import httpx
 
+from app.utils.retry import RetryBudget, backoff_delay, parse_retry_after
+
+# Статусы, после которых имеет смысл повторить запрос
+_RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Общий на процесс бюджет повторов к TikWM
+_retry_budget = RetryBudget(ratio=0.2, min_per_sec=1.0)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TikwmRetryableError(Exception):
+    """Временная ошибка TikWM, после которой можно повторить запрос"""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TikwmVariant(NamedTuple):
+    """Вариант видео без водяного знака; size - размер в байтах из ответа API"""
+
+    url: str
+    size: int | None
+
+
+class TikwmVideo(NamedTuple):
+    """Метаданные видео из ответа TikWM; варианты - сначала HD, затем обычное качество"""
+
+    video_id: str | None
+    duration: float | None
+    thumbnail: str | None
+    variants: list[TikwmVariant]
+
 
 class TikwmClient:
     def __init__(
@@ -15,7 +56,13 @@ class TikwmClient:
         timeout_sec: float = 20.0,
         max_retries: int = 3,
         backoff_base_sec: float = 0.5,
-        cache_ttl_sec: int = 600,
+        backoff_cap_sec: float = 8.0,
+        max_retry_after_sec: float = 10.0,
+        max_keepalive_connections: int = 20,
+        max_connections: int = 100,
+        keepalive_expiry_sec: float = 60.0,
+        http2: bool = True,
+        retry_budget: RetryBudget | None = None,
     ) -> None:
         self._base_url = base_url
         self._api_key = api_key
@@ -28,73 +75,145 @@ class TikwmClient:
             "Referer": "https://www.tikwm.com/",
             "Accept": "application/json, text/plain, */*",
         }
+        # HTTP/2 включаем только если установлен пакет h2 (httpx[http2])
+        self._http2 = http2 and _http2_available()
         self._client = httpx.AsyncClient(
             timeout=self._timeout,
             headers=self._default_headers,
+            limits=httpx.Limits(
+                max_keepalive_connections=max_keepalive_connections,
+                max_connections=max_connections,
+                keepalive_expiry=keepalive_expiry_sec,
+            ),
+            http2=self._http2,
         )
         self._max_retries = max(1, max_retries)
         self._backoff_base_sec = max(0.1, backoff_base_sec)
-        self._cache_ttl_sec = max(0, cache_ttl_sec)
-        self._cache: dict[str, tuple[float, str]] = {}
+        self._backoff_cap_sec = max(self._backoff_base_sec, backoff_cap_sec)
+        self._max_retry_after_sec = max_retry_after_sec
+        self._retry_budget = retry_budget or _retry_budget
+        self._logger = logging.getLogger(__name__)
+        # Метрики переиспользования соединений и повторов
+        self._requests = 0
+        self._new_connections = 0
+        self._retries = 0
 
     async def aclose(self) -> None:
         await self._client.aclose()
 
+    def get_metrics(self) -> dict[str, Any]:
+        reused = max(0, self._requests - self._new_connections)
+        return {
+            "requests": self._requests,
+            "new_connections": self._new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": reused / self._requests if self._requests else 0.0,
+            "http2": self._http2,
+            "retries": self._retries,
+            "retry_budget_exhausted": self._retry_budget.exhausted,
+        }
+
+    async def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        """Считает новые TCP-соединения (остальные запросы идут по уже открытым)"""
+        if event_name == "connection.connect_tcp.complete":
+            self._new_connections += 1
+
     async def get_no_wm_video_url(self, tiktok_url: str) -> str:
-        now = time.monotonic()
-        cached = self._cache.get(tiktok_url)
-        if cached and cached[0] > now:
-            return cached[1]
+        video = await self.get_video(tiktok_url)
+        return video.variants[0].url
 
+    async def get_video(self, tiktok_url: str) -> TikwmVideo:
         params: dict[str, Any] = {"url": tiktok_url, "hd": 1}
         req_headers: dict[str, str] = {}
         if self._api_key:
             req_headers["X-API-KEY"] = self._api_key
 
-        delay = self._backoff_base_sec
-        last_err: Exception | None = None
+        self._retry_budget.record_request()
         for attempt in range(1, self._max_retries + 1):
             try:
-                resp = await self._client.post(self._base_url, data=params, headers=req_headers)
-
-                # Явно обрабатываем перегрузку/временные ошибки
-                if resp.status_code in (429, 500, 502, 503, 504):
-                    raise httpx.HTTPStatusError(
-                        "server backoff",
-                        request=resp.request,
-                        response=resp,
-                    )
-
-                resp.raise_for_status()
-                data = resp.json()
-
-                if not isinstance(data, dict) or data.get("code") not in (0, "0"):
-                    raise ValueError("TikWM API returned error or unexpected payload")
-
-                payload = data.get("data") or {}
-                if not isinstance(payload, dict):
-                    raise ValueError("TikWM API 'data' is not an object")
-
-                hd_url = payload.get("hdplay")
-                no_wm_url = payload.get("play")
-                for candidate in (hd_url, no_wm_url):
-                    if isinstance(candidate, str) and candidate.startswith("http"):
-                        if self._cache_ttl_sec:
-                            self._cache[tiktok_url] = (
-                                time.monotonic() + self._cache_ttl_sec,
-                                candidate,
-                            )
-                        return candidate
-
-                raise ValueError("TikWM API did not provide a playable URL without watermark")
-            except (httpx.RequestError, httpx.HTTPStatusError, ValueError) as err:
-                last_err = err
-                if attempt >= self._max_retries:
-                    break
+                return await self._request(params, req_headers)
+            except (httpx.RequestError, TikwmRetryableError) as err:
+                if attempt >= self._max_retries or not self._retry_budget.try_spend():
+                    raise
+                delay = backoff_delay(attempt, self._backoff_base_sec, self._backoff_cap_sec)
+                retry_after = getattr(err, "retry_after", None)
+                if retry_after is not None:
+                    if retry_after > self._max_retry_after_sec:
+                        # Ждать дольше, чем пользователь готов, нет смысла
+                        raise
+                    delay = max(delay, retry_after)
+                self._retries += 1
+                self._logger.info(
+                    "TikWM: повтор %d/%d через %.2f с (%s)",
+                    attempt + 1, self._max_retries, delay, err,
+                )
                 await asyncio.sleep(delay)
-                delay *= 2
 
-        assert last_err is not None
-        raise last_err
+        raise AssertionError("unreachable")
 
+    async def _request(
+        self, params: dict[str, Any], req_headers: dict[str, str]
+    ) -> TikwmVideo:
+        resp = await self._client.post(
+            self._base_url,
+            data=params,
+            headers=req_headers,
+            extensions={"trace": self._trace},
+        )
+        self._requests += 1
+
+        # Явно обрабатываем перегрузку/временные ошибки
+        if resp.status_code in _RETRYABLE_STATUSES:
+            raise TikwmRetryableError(
+                f"HTTP {resp.status_code}",
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+
+        resp.raise_for_status()
+        data = resp.json()
+
+        if not isinstance(data, dict):
+            raise ValueError("TikWM API returned unexpected payload")
+        if data.get("code") not in (0, "0"):
+            msg = str(data.get("msg") or "TikWM API returned error")
+            # Бесплатный лимит TikWM отдается кодом ошибки в теле, а не 429
+            if "limit" in msg.lower():
+                raise TikwmRetryableError(msg, retry_after=1.0)
+            raise ValueError(msg)
+
+        payload = data.get("data") or {}
+        if not isinstance(payload, dict):
+            raise ValueError("TikWM API 'data' is not an object")
+
+        variants: list[TikwmVariant] = []
+        for url_key, size_key in (("hdplay", "hd_size"), ("play", "size")):
+            candidate = self._absolute_url(payload.get(url_key))
+            if candidate:
+                size = _positive_number(payload.get(size_key))
+                variants.append(TikwmVariant(candidate, int(size) if size else None))
+
+        if not variants:
+            raise ValueError("TikWM API did not provide a playable URL without watermark")
+        video_id = payload.get("id")
+        return TikwmVideo(
+            video_id=str(video_id) if video_id else None,
+            duration=_positive_number(payload.get("duration")),
+            thumbnail=self._absolute_url(payload.get("cover")),
+            variants=variants,
+        )
 
+    def _absolute_url(self, value: Any) -> str | None:
+        if isinstance(value, str) and value.startswith("/"):
+            # Иногда TikWM отдает путь относительно своего домена
+            value = urljoin(self._base_url, value)
+        if isinstance(value, str) and value.startswith("http"):
+            return value
+        return None
+
+
+def _positive_number(value: Any) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import logging
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Sequence
+
+# Код 0 - язык не указан, 255 - удаленная запись (до следующего слияния)
+_NO_LANGUAGE = 0
+_DELETED = 255
+_MAX_LANGUAGES = 254
+
+
+class CompactUserIndex:
+    """Компактный индекс пользователей для миллионов записей.
+
+    Id хранятся в отсортированном ``array('q')`` (8 байт на пользователя),
+    язык - кодом в параллельном ``bytearray`` (1 байт), профиль - необязательным
+    списком ``bytes``, которые вызывающий разбирает лениво. Поиск - бинарный,
+    O(log n); изменение существующей записи выполняется на месте. Новые id
+    копятся в небольшом буфере и вливаются в массивы пачкой, удаления помечаются
+    и вычищаются при том же слиянии. Счетчики по языкам ведутся на лету.
+    """
+
+    def __init__(
+        self,
+        languages: Sequence[str] = (),
+        with_profiles: bool = False,
+        merge_threshold: int = 4096,
+    ) -> None:
+        self._codes: list[str | None] = [None]
+        self._code_of: dict[str, int] = {}
+        self._ids = array("q")
+        self._langs = bytearray()
+        self._profiles: list[bytes | None] | None = [] if with_profiles else None
+        self._pending: dict[int, tuple[int, bytes | None]] = {}
+        self._deleted = 0
+        self._counts = [0] * 256
+        self._merge_threshold = max(1, merge_threshold)
+        self._logger = logging.getLogger(__name__)
+        for language in languages:
+            self._code(language)
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._deleted + len(self._pending)
+
+    def __contains__(self, user_id: object) -> bool:
+        return isinstance(user_id, int) and self.get(user_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        for user_id, _, _ in self.items():
+            yield user_id
+
+    def get(self, user_id: int) -> tuple[str | None, bytes | None] | None:
+        """Язык и профиль пользователя или None, если его нет"""
+        pos = self._position(user_id)
+        if pos >= 0:
+            code = self._langs[pos]
+            if code == _DELETED:
+                return None
+            return self._codes[code], self._profiles[pos] if self._profiles is not None else None
+        entry = self._pending.get(user_id)
+        if entry is None:
+            return None
+        return self._codes[entry[0]], entry[1]
+
+    def get_language(self, user_id: int, default: str | None = None) -> str | None:
+        entry = self.get(user_id)
+        if entry is None or entry[0] is None:
+            return default
+        return entry[0]
+
+    def set(self, user_id: int, language: str | None = None, profile: bytes | None = None) -> None:
+        """Добавляет или обновляет пользователя"""
+        self._set(user_id, language, profile)
+        if len(self._pending) >= self._merge_limit():
+            self.merge()
+
+    def update(self, items: Iterable[tuple[int, str | None, bytes | None]]) -> None:
+        """Массовая загрузка: одно слияние на все записи"""
+        for user_id, language, profile in items:
+            self._set(user_id, language, profile)
+        self.merge()
+
+    def remove(self, user_id: int) -> bool:
+        """Удаляет пользователя, возвращает True, если он был"""
+        pos = self._position(user_id)
+        if pos >= 0:
+            code = self._langs[pos]
+            if code == _DELETED:
+                return False
+            self._counts[code] -= 1
+            self._langs[pos] = _DELETED
+            if self._profiles is not None:
+                self._profiles[pos] = None
+            self._deleted += 1
+            if self._deleted >= self._merge_limit():
+                self.merge()
+            return True
+        entry = self._pending.pop(user_id, None)
+        if entry is None:
+            return False
+        self._counts[entry[0]] -= 1
+        return True
+
+    def clear(self) -> None:
+        self._ids = array("q")
+        self._langs = bytearray()
+        if self._profiles is not None:
+            self._profiles = []
+        self._pending = {}
+        self._deleted = 0
+        self._counts = [0] * 256
+
+    def count_by_language(self) -> dict[str | None, int]:
+        """Количество пользователей по языкам (None - язык не указан), O(число языков)"""
+        return {language: self._counts[code] for code, language in enumerate(self._codes)}
+
+    def items(self) -> Iterator[tuple[int, str | None, bytes | None]]:
+        """Перебирает (id, язык, профиль) по возрастанию id"""
+        self.merge()
+        # Слияние во время перебора подменит массивы - перебираем те, что были
+        ids, langs, profiles, codes = self._ids, self._langs, self._profiles, self._codes
+        for pos in range(len(ids)):
+            code = langs[pos]
+            if code == _DELETED:
+                continue
+            yield ids[pos], codes[code], profiles[pos] if profiles is not None else None
+
+    def copy(self) -> CompactUserIndex:
+        """Независимая копия (снимок для записи на диск в другом потоке)"""
+        self.merge()
+        clone = CompactUserIndex(with_profiles=self._profiles is not None)
+        clone._codes = list(self._codes)
+        clone._code_of = dict(self._code_of)
+        clone._ids = self._ids[:]
+        clone._langs = bytearray(self._langs)
+        if self._profiles is not None:
+            clone._profiles = list(self._profiles)
+        clone._counts = list(self._counts)
+        clone._merge_threshold = self._merge_threshold
+        return clone
+
+    def merge(self) -> None:
+        """Вливает буфер новых id в массивы и вычищает удаленные записи"""
+        if not self._pending and not self._deleted:
+            return
+        pending = sorted(self._pending.items())
+        ids, profiles = self._ids, self._profiles
+        if not ids:
+            # Массовая загрузка в пустой индекс - массивы строятся целиком
+            self._ids = array("q", [user_id for user_id, _ in pending])
+            self._langs = bytearray(code for _, (code, _) in pending)
+            if profiles is not None:
+                self._profiles = [profile for _, (_, profile) in pending]
+            self._pending = {}
+            return
+        new_ids = array("q")
+        new_langs = bytearray()
+        new_profiles: list[bytes | None] | None = [] if profiles is not None else None
+        start = 0
+        for user_id, (code, profile) in pending:
+            end = bisect_left(ids, user_id, start)
+            self._copy_live(start, end, new_ids, new_langs, new_profiles)
+            start = end
+            new_ids.append(user_id)
+            new_langs.append(code)
+            if new_profiles is not None:
+                new_profiles.append(profile)
+        self._copy_live(start, len(ids), new_ids, new_langs, new_profiles)
+        self._ids, self._langs, self._profiles = new_ids, new_langs, new_profiles
+        self._pending = {}
+        self._deleted = 0
+
+    def _copy_live(
+        self,
+        start: int,
+        end: int,
+        new_ids: array[int],
+        new_langs: bytearray,
+        new_profiles: list[bytes | None] | None,
+    ) -> None:
+        # Копируем срезами между удаленными записями - без цикла по элементам
+        while start < end:
+            stop = self._langs.find(_DELETED, start, end) if self._deleted else -1
+            if stop == -1:
+                stop = end
+            if stop > start:
+                new_ids.extend(self._ids[start:stop])
+                new_langs.extend(self._langs[start:stop])
+                if new_profiles is not None and self._profiles is not None:
+                    new_profiles.extend(self._profiles[start:stop])
+            start = stop + 1
+
+    def _set(self, user_id: int, language: str | None, profile: bytes | None) -> None:
+        code = self._code(language)
+        pos = self._position(user_id)
+        if pos >= 0:
+            old = self._langs[pos]
+            if old == _DELETED:
+                self._deleted -= 1
+            else:
+                self._counts[old] -= 1
+            self._langs[pos] = code
+            if self._profiles is not None:
+                self._profiles[pos] = profile
+        else:
+            entry = self._pending.get(user_id)
+            if entry is not None:
+                self._counts[entry[0]] -= 1
+            self._pending[user_id] = (code, profile)
+        self._counts[code] += 1
+
+    def _position(self, user_id: int) -> int:
+        """Позиция id в основном массиве (включая удаленные) или -1"""
+        ids = self._ids
+        pos = bisect_left(ids, user_id)
+        if pos < len(ids) and ids[pos] == user_id:
+            return pos
+        return -1
+
+    def _merge_limit(self) -> int:
+        # Порог растет с размером индекса, чтобы слияния оставались редкими
+        return max(self._merge_threshold, len(self._ids) // 8)
+
+    def _code(self, language: str | None) -> int:
+        if not language:
+            return _NO_LANGUAGE
+        code = self._code_of.get(language)
+        if code is None:
+            if len(self._codes) > _MAX_LANGUAGES:
+                self._logger.warning(
+                    "Слишком много кодов языков, %r сохранен как неизвестный", language
+                )
+                return _NO_LANGUAGE
+            code = len(self._codes)
+            self._codes.append(language)
+            self._code_of[language] = code
+        return code
@@ -1,67 +1,182 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-from typing import Dict, Literal
+from typing import Dict, Literal, TextIO
 
 from app.services.localization import Language
+from app.services.user_index import CompactUserIndex
 
-# Файл для хранения языковых настроек
+# Файл для хранения языковых настроек (снимок)
 LANGUAGE_FILE = "user_languages.json"
 
+_LANGUAGES = ("ru", "en", "ar", "es", "fr", "de", "pt", "ja", "pl", "tr")
+
 
 class UserLanguageStorage:
-    """Хранилище языковых настроек пользователей"""
-    
-    def __init__(self) -> None:
-        self._languages: Dict[int, Language] = {}
+    """Хранилище языковых настроек пользователей.
+
+    ``set_language`` не переписывает файл целиком: изменение дописывается
+    одной строкой в журнал ``<файл>.journal``. При загрузке снимок дополняется
+    записями журнала, а сжатие (запись нового снимка и очистка журнала)
+    выполняется в фоне - при запуске бота, по накоплении ``compact_after``
+    записей и при остановке.
+    """
+
+    def __init__(self, language_file: str = LANGUAGE_FILE, compact_after: int = 100000) -> None:
+        self._language_file = language_file
+        self._journal_file = language_file + ".journal"
+        self._compacting_file = language_file + ".journal.compacting"
+        self._compact_after = max(1, compact_after)
+        # id в отсортированном массиве, язык - одним байтом
+        self._languages = CompactUserIndex(languages=_LANGUAGES)
+        self._journal: TextIO | None = None
+        self._journal_records = 0
+        self._compaction: asyncio.Task[None] | None = None
         self._logger = logging.getLogger(__name__)
         self._load_languages()
-    
+
     def _load_languages(self) -> None:
-        """Загрузить языковые настройки из файла"""
-        if os.path.exists(LANGUAGE_FILE):
+        """Загрузить языковые настройки: снимок + записи журнала"""
+        if os.path.exists(self._language_file):
             try:
-                with open(LANGUAGE_FILE, "r", encoding="utf-8") as f:
+                with open(self._language_file, encoding="utf-8") as f:
                     data = json.load(f)
-                    for user_id_str, language in data.items():
-                        user_id = int(user_id_str)
-                        if language in ["ru", "en", "ar", "es", "fr", "de", "pt", "ja", "pl", "tr"]:
-                            self._languages[user_id] = language
+                    self._languages.update(
+                        (int(user_id_str), language, None)
+                        for user_id_str, language in data.items()
+                        if language in _LANGUAGES
+                    )
                     self._logger.info("Loaded %d user language preferences", len(self._languages))
             except Exception as e:
                 self._logger.error("Error loading user languages: %s", e)
         else:
-            self._logger.info("Language file not found, creating new: %s", LANGUAGE_FILE)
-    
-    def _save_languages(self) -> None:
-        """Сохранить языковые настройки в файл"""
+            self._logger.info("Language file not found, creating new: %s", self._language_file)
+        # Журнал прерванного сжатия старше текущего журнала - применяем его первым
+        self._journal_records = self._replay_journal(self._compacting_file)
+        self._journal_records += self._replay_journal(self._journal_file)
+
+    def _replay_journal(self, path: str) -> int:
+        """Применить записи журнала, вернуть их количество"""
+        if not os.path.exists(path):
+            return 0
+        records = 0
         try:
-            with open(LANGUAGE_FILE, "w", encoding="utf-8") as f:
-                data = {str(user_id): language for user_id, language in self._languages.items()}
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            self._logger.debug("Saved %d user language preferences", len(self._languages))
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    # Оборванная последняя строка (падение во время записи) пропускается
+                    if len(parts) != 2 or parts[1] not in _LANGUAGES:
+                        continue
+                    try:
+                        self._languages.set(int(parts[0]), parts[1])
+                    except ValueError:
+                        continue
+                    records += 1
+            if records:
+                self._logger.info("Replayed %d language journal records from %s", records, path)
         except Exception as e:
-            self._logger.error("Error saving user languages: %s", e)
-    
+            self._logger.error("Error replaying language journal %s: %s", path, e)
+        return records
+
+    def _append_journal(self, user_id: int, language: Language) -> None:
+        """Дописать изменение в журнал (одна короткая запись, без перезаписи файла)"""
+        try:
+            if self._journal is None:
+                self._journal = open(self._journal_file, "a", encoding="utf-8", buffering=1)
+            self._journal.write(f"{user_id} {language}\n")
+            self._journal_records += 1
+        except Exception as e:
+            self._logger.error("Error writing language journal: %s", e)
+
+    def _write_snapshot(self, data: CompactUserIndex) -> None:
+        """Атомарно записать снимок и удалить поглощенный им журнал"""
+        tmp_file = self._language_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {str(user_id): language for user_id, language, _ in data.items()},
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_file, self._language_file)
+        if os.path.exists(self._compacting_file):
+            os.remove(self._compacting_file)
+
+    async def compact(self) -> None:
+        """Сжать журнал в снимок (запись файла выполняется вне event loop)"""
+        if self._compaction is not None and not self._compaction.done():
+            await self._compaction
+            return
+        await self._compact()
+
+    async def _compact(self) -> None:
+        if not self._journal_records:
+            return
+        # Снимок и ротация журнала - атомарно относительно set_language
+        snapshot = self._languages.copy()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        records = self._journal_records
+        self._journal_records = 0
+        try:
+            if os.path.exists(self._journal_file):
+                if os.path.exists(self._compacting_file):
+                    # Прошлое сжатие не завершилось - журнал удаляется только после снимка
+                    with (
+                        open(self._journal_file, "rb") as src,
+                        open(self._compacting_file, "ab") as dst,
+                    ):
+                        dst.write(src.read())
+                    os.remove(self._journal_file)
+                else:
+                    os.replace(self._journal_file, self._compacting_file)
+            await asyncio.to_thread(self._write_snapshot, snapshot)
+            self._logger.info("Compacted %d language journal records into snapshot", records)
+        except Exception as e:
+            self._journal_records += records
+            self._logger.error("Error compacting user languages: %s", e)
+
+    def schedule_compaction(self) -> None:
+        """Запустить сжатие журнала в фоне"""
+        if self._compaction is not None and not self._compaction.done():
+            return
+        try:
+            self._compaction = asyncio.get_running_loop().create_task(self._compact())
+        except RuntimeError:
+            # Вне event loop (скрипты) - сожмется при следующем запуске
+            pass
+
+    async def aclose(self) -> None:
+        """Дождаться фонового сжатия и сжать остаток журнала"""
+        if self._compaction is not None:
+            await asyncio.gather(self._compaction, return_exceptions=True)
+            self._compaction = None
+        await self.compact()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
     def get_language(self, user_id: int) -> Language:
         """Получить язык пользователя"""
-        return self._languages.get(user_id, "ru")  # По умолчанию русский
-    
+        return self._languages.get_language(user_id, "ru")  # По умолчанию русский
+
     def set_language(self, user_id: int, language: Language) -> None:
         """Установить язык пользователя"""
-        self._languages[user_id] = language
+        if self._languages.get_language(user_id) == language:
+            return
+        self._languages.set(user_id, language)
         self._logger.info("User %d language set to %s", user_id, language)
-        self._save_languages()
-    
+        self._append_journal(user_id, language)
+        if self._journal_records >= self._compact_after:
+            self.schedule_compaction()
+
     def get_user_count_by_language(self) -> Dict[Language, int]:
         """Получить количество пользователей по языкам"""
-        counts = {"ru": 0, "en": 0, "ar": 0, "es": 0, "fr": 0, "de": 0, "pt": 0, "ja": 0, "pl": 0, "tr": 0}
-        for language in self._languages.values():
-            if language in counts:
-                counts[language] += 1
-        return counts
+        counts = self._languages.count_by_language()
+        return {language: counts.get(language, 0) for language in _LANGUAGES}
 
 
 # Глобальный экземпляр
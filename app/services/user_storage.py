@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+import os
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
 from aiogram.types import User
 
+from app.config.settings import USER_STORAGE_BACKEND
+from app.services.user_index import CompactUserIndex
+
+# Разделитель полей профиля в CompactUserIndex
+_SEPARATOR = b"\x1f"
+
 
 @dataclass(frozen=True, slots=True)
 class UserInfo:
@@ -19,12 +28,45 @@ class UserInfo:
     language_code: str | None
 
 
+def _encode_profile(username: str | None, first_name: str | None, last_name: str | None) -> bytes:
+    """Профиль одной строкой bytes (пустое поле равнозначно None)"""
+    fields = (username or "", first_name or "", last_name or "")
+    return "\x1f".join(field.replace("\x1f", " ") for field in fields).encode("utf-8")
+
+
+def _decode_profile(user_id: int, language_code: str | None, profile: bytes | None) -> UserInfo:
+    username, first_name, last_name = (profile or b"\x1f\x1f").decode("utf-8").split("\x1f")
+    return UserInfo(
+        user_id=user_id,
+        username=username or None,
+        first_name=first_name or None,
+        last_name=last_name or None,
+        is_bot=False,  # Боты в хранилище не попадают
+        language_code=language_code,
+    )
+
+
 class UserStorage:
-    """Хранилище пользователей для рассылки"""
+    """Хранилище пользователей для рассылки.
+
+    Пользователи лежат в ``CompactUserIndex``: id в отсортированном массиве,
+    код языка байтом, профиль (username, имя, фамилия) одной строкой ``bytes``,
+    которая разбирается в ``UserInfo`` только при чтении.
+
+    Изменения пишутся отложенно: ``add_user`` только помечает пользователя
+    измененным, а файл перезаписывается пачкой по таймеру (``start_flusher``),
+    при накоплении ``flush_batch_size`` изменений и при остановке бота.
+    Запись атомарная и выполняется вне event loop.
+    """
     
-    def __init__(self, storage_file: str = "users.json") -> None:
+    def __init__(self, storage_file: str = "users.json", flush_batch_size: int = 1000) -> None:
         self._storage_file = Path(storage_file)
-        self._users: dict[int, UserInfo] = {}
+        self._index = CompactUserIndex(with_profiles=True)
+        self._dirty: set[int] = set()
+        self._flush_batch_size = max(1, flush_batch_size)
+        self._save_lock = asyncio.Lock()
+        self._flusher: asyncio.Task[None] | None = None
+        self._pending_flush: asyncio.Task[None] | None = None
         self._logger = logging.getLogger(__name__)
         self._load_users()
     
@@ -34,75 +76,149 @@ class UserStorage:
             if self._storage_file.exists():
                 with open(self._storage_file, "r", encoding="utf-8") as f:
                     data = json.load(f)
-                    for user_id_str, user_data in data.items():
-                        user_id = int(user_id_str)
-                        self._users[user_id] = UserInfo(**user_data)
-                self._logger.info("Загружено %d пользователей", len(self._users))
+                self._index.update(
+                    (
+                        int(user_id_str),
+                        user_data.get("language_code"),
+                        _encode_profile(
+                            user_data.get("username"),
+                            user_data.get("first_name"),
+                            user_data.get("last_name"),
+                        ),
+                    )
+                    for user_id_str, user_data in data.items()
+                )
+                self._logger.info("Загружено %d пользователей", len(self._index))
         except Exception as e:
             self._logger.error("Ошибка загрузки пользователей: %s", e)
     
-    def _save_users(self) -> None:
-        """Сохраняет пользователей в файл"""
+    @staticmethod
+    def _write_index(storage_file: Path, index: CompactUserIndex) -> None:
+        """Атомарно записывает пользователей в файл (временный файл + rename)"""
+        data = {
+            str(user_id): asdict(_decode_profile(user_id, language_code, profile))
+            for user_id, language_code, profile in index.items()
+        }
+        tmp_file = storage_file.with_name(storage_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_file, storage_file)
+
+    async def flush(self) -> None:
+        """Сохраняет накопленные изменения в файл вне event loop"""
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            dirty = self._dirty
+            self._dirty = set()
+            # Снимок (копия массивов) берем в цикле событий, сериализуем в потоке
+            snapshot = self._index.copy()
+            try:
+                await asyncio.to_thread(self._write_index, self._storage_file, snapshot)
+                self._logger.debug("Сохранено изменений пользователей: %d", len(dirty))
+            except Exception as e:
+                # Изменения не потеряны - попробуем записать их в следующий раз
+                self._dirty |= dirty
+                self._logger.error("Ошибка сохранения пользователей: %s", e)
+
+    def _mark_dirty(self, user_id: int) -> None:
+        self._dirty.add(user_id)
+        if len(self._dirty) < self._flush_batch_size:
+            return
+        if self._pending_flush is not None and not self._pending_flush.done():
+            return
         try:
-            data = {
-                str(user_id): {
-                    "user_id": user_info.user_id,
-                    "username": user_info.username,
-                    "first_name": user_info.first_name,
-                    "last_name": user_info.last_name,
-                    "is_bot": user_info.is_bot,
-                    "language_code": user_info.language_code,
-                }
-                for user_id, user_info in self._users.items()
-            }
-            
-            with open(self._storage_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                
-        except Exception as e:
-            self._logger.error("Ошибка сохранения пользователей: %s", e)
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            # Вне event loop (скрипты) - запишется при следующем flush
+            pass
+
+    async def open(self) -> None:
+        """Файл загружается при создании хранилища - открывать нечего"""
+
+    def start_flusher(self, interval_sec: float = 5.0) -> None:
+        """Запускает периодическую запись изменений"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(interval_sec))
+
+    async def _flush_loop(self, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            await self.flush()
+
+    async def aclose(self) -> None:
+        """Останавливает таймер и записывает оставшиеся изменения"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
     
     def add_user(self, user: User) -> None:
         """Добавляет пользователя в хранилище"""
         if user.is_bot:
             return  # Не добавляем ботов
             
-        user_info = UserInfo(
-            user_id=user.id,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            is_bot=user.is_bot,
-            language_code=user.language_code,
-        )
-        
-        self._users[user.id] = user_info
-        self._save_users()
+        profile = _encode_profile(user.username, user.first_name, user.last_name)
+        # Пользователь не изменился - писать нечего (самый частый случай)
+        if self._index.get(user.id) == (user.language_code or None, profile):
+            return
+        self._index.set(user.id, user.language_code, profile)
+        self._mark_dirty(user.id)
         self._logger.debug("Добавлен пользователь: %s (%d)", user.username or user.first_name, user.id)
     
-    def get_all_users(self) -> list[UserInfo]:
+    async def get_all_users(self) -> list[UserInfo]:
         """Возвращает всех пользователей"""
-        return list(self._users.values())
+        return [_decode_profile(*item) for item in self._index.items()]
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[UserInfo]:
+        """Перебирает пользователей пачками, отдавая управление между ними"""
+        for i, item in enumerate(self._index.items(), 1):
+            yield _decode_profile(*item)
+            if i % batch_size == 0:
+                await asyncio.sleep(0)
     
     def get_user_count(self) -> int:
         """Возвращает количество пользователей"""
-        return len(self._users)
+        return len(self._index)
+    
+    def get_stats(self) -> dict[str, int]:
+        """Статистика для админки: всего, с username, с именем"""
+        with_username = with_first_name = 0
+        for _, _, profile in self._index.items():
+            # Профиль: username \x1f имя \x1f фамилия - в UserInfo не разбираем
+            username, first_name, _ = (profile or b"\x1f\x1f").split(_SEPARATOR, 2)
+            with_username += bool(username)
+            with_first_name += bool(first_name)
+        return {
+            "total": len(self._index),
+            "with_username": with_username,
+            "with_first_name": with_first_name,
+        }
     
-    def remove_user(self, user_id: int) -> bool:
+    async def remove_user(self, user_id: int) -> bool:
         """Удаляет пользователя из хранилища"""
-        if user_id in self._users:
-            del self._users[user_id]
-            self._save_users()
+        if self._index.remove(user_id):
+            self._mark_dirty(user_id)
             self._logger.info("Удален пользователь: %d", user_id)
             return True
         return False
     
     def clear_all(self) -> None:
         """Очищает всех пользователей"""
-        self._users.clear()
-        self._save_users()
+        self._dirty.update(self._index)
+        self._index.clear()
         self._logger.info("Все пользователи удалены")
 
 
+def create_user_storage(backend: str = USER_STORAGE_BACKEND) -> Any:
+    """Создает хранилище пользователей: json (по умолчанию) или sqlite"""
+    if backend == "sqlite":
+        from app.services.user_storage_sqlite import SqliteUserStorage
+
+        return SqliteUserStorage()
+    return UserStorage()
+
+
 # Глобальный экземпляр хранилища
-user_storage = UserStorage()
+user_storage = create_user_storage()
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from aiogram.types import User
+
+from app.services.user_storage import UserInfo
+
+_COLUMNS = "user_id, username, first_name, last_name, is_bot, language_code"
+_STATS_QUERY = (
+    "SELECT COUNT(*), COUNT(NULLIF(username, '')), COUNT(NULLIF(first_name, '')) FROM users"
+)
+
+
+_Counts = tuple[int, int, int]
+_ABSENT: _Counts = (0, 0, 0)
+
+
+def _contribution(user_info: UserInfo) -> _Counts:
+    """Вклад пользователя в статистику: (всего, с username, с именем)"""
+    return 1, int(bool(user_info.username)), int(bool(user_info.first_name))
+
+
+def _apply_queue(base: _Counts, pending: dict[int, tuple[UserInfo, float, _Counts]]) -> _Counts:
+    """Статистика базы после записи очереди"""
+    total, with_username, with_first_name = base
+    for user_info, _, stored in pending.values():
+        new = _contribution(user_info)
+        total += new[0] - stored[0]
+        with_username += new[1] - stored[1]
+        with_first_name += new[2] - stored[2]
+    return max(0, total), max(0, with_username), max(0, with_first_name)
+
+
+def _row_to_user(row: tuple[Any, ...]) -> UserInfo:
+    return UserInfo(
+        user_id=row[0],
+        username=row[1],
+        first_name=row[2],
+        last_name=row[3],
+        is_bot=bool(row[4]),
+        language_code=row[5],
+    )
+
+
+class SqliteUserStorage:
+    """Хранилище пользователей в SQLite (WAL) с тем же интерфейсом, что и UserStorage.
+
+    В памяти держится только ограниченный кэш недавно виденных пользователей
+    (для отсева неизмененных) и очередь несохраненных изменений: добавления
+    и очистка. В event loop база не читается и не пишется - очередь
+    записывается пачкой в отдельном потоке, там же пересчитывается статистика.
+    Счетчики между записями - это статистика базы плюс вклад очереди.
+    Удаление пишется сразу (тоже в потоке), чтобы вернуть, была ли запись.
+    Рассылка читает пользователей постранично через ``iter_users``.
+
+    Перенос из users.json и чтение статистики выполняет ``open`` при запуске бота.
+    """
+
+    def __init__(
+        self,
+        storage_file: str = "users.sqlite3",
+        json_file: str | None = "users.json",
+        flush_batch_size: int = 1000,
+        recent_cache_size: int = 50000,
+        touch_interval_sec: float = 3600.0,
+    ) -> None:
+        self._storage_file = Path(storage_file)
+        self._json_file = Path(json_file) if json_file else None
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(__name__)
+        self._conn = sqlite3.connect(self._storage_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            " user_id INTEGER PRIMARY KEY,"
+            " username TEXT,"
+            " first_name TEXT,"
+            " last_name TEXT,"
+            " is_bot INTEGER NOT NULL DEFAULT 0,"
+            " language_code TEXT,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS users_language ON users (language_code)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS users_last_seen ON users (last_seen)")
+        self._conn.commit()
+
+        self._flush_batch_size = max(1, flush_batch_size)
+        self._recent_cache_size = max(1, recent_cache_size)
+        self._touch_interval_sec = touch_interval_sec
+        # Недавно виденные: user_id -> (профиль, когда последний раз записан last_seen)
+        self._recent: dict[int, tuple[UserInfo, float]] = {}
+        # Очередь: user_id -> (профиль, last_seen, вклад записи в базе в статистику)
+        self._pending: dict[int, tuple[UserInfo, float, _Counts]] = {}
+        self._clear_pending = False
+        self._save_lock = asyncio.Lock()
+        self._flusher: asyncio.Task[None] | None = None
+        self._pending_flush: asyncio.Task[None] | None = None
+        # Статистика базы с учетом пачки, которая сейчас записывается (читается в open)
+        self._db_stats: _Counts = _ABSENT
+
+    async def open(self) -> None:
+        """Переносит пользователей из users.json и читает статистику базы вне event loop"""
+        async with self._save_lock:
+            if self._json_file is not None:
+                await asyncio.to_thread(self._migrate_from_json, self._json_file)
+            self._db_stats = await asyncio.to_thread(self._read_stats)
+
+    def _read_stats(self) -> _Counts:
+        with self._lock:
+            return self._conn.execute(_STATS_QUERY).fetchone()
+
+    # --- Миграция ---
+
+    def _migrate_from_json(self, json_file: Path) -> None:
+        """Однократный перенос пользователей из users.json"""
+        if not json_file.exists():
+            return
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+                return
+        try:
+            with open(json_file, encoding="utf-8") as f:
+                data = json.load(f)
+            now = time.time()
+            rows = [
+                (
+                    int(user_id), info.get("username"), info.get("first_name"),
+                    info.get("last_name"), int(bool(info.get("is_bot"))),
+                    info.get("language_code"), now, now,
+                )
+                for user_id, info in data.items()
+            ]
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO users ({_COLUMNS}, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            os.replace(json_file, json_file.with_name(json_file.name + ".migrated"))
+            self._logger.info("Перенесено %d пользователей из %s в SQLite", len(rows), json_file)
+        except Exception as e:
+            self._logger.error("Ошибка миграции пользователей из JSON: %s", e)
+
+    # --- Запись ---
+
+    def add_user(self, user: User) -> None:
+        """Добавляет пользователя в хранилище"""
+        if user.is_bot:
+            return  # Не добавляем ботов
+
+        user_info = UserInfo(
+            user_id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_bot=user.is_bot,
+            language_code=user.language_code,
+        )
+        now = time.time()
+        recent = self._recent.pop(user.id, None)
+        if (
+            recent is not None
+            and recent[0] == user_info
+            and now - recent[1] < self._touch_interval_sec
+        ):
+            # Профиль тот же, активность недавно записана - ничего не делаем
+            self._recent[user.id] = recent
+            return
+
+        pending = self._pending.get(user.id)
+        if pending is not None:
+            stored = pending[2]
+        elif self._clear_pending or recent is None:
+            # Пользователя нет в кэше - считаем новым
+            stored = _ABSENT
+        else:
+            # Без очереди кэш недавних совпадает с базой
+            stored = _contribution(recent[0])
+        self._remember(user.id, user_info, now)
+        self._pending[user.id] = (user_info, now, stored)
+        if len(self._pending) >= self._flush_batch_size:
+            self._schedule_flush()
+
+    async def remove_user(self, user_id: int) -> bool:
+        """Удаляет пользователя вне event loop, возвращает, был ли он в хранилище"""
+        self._recent.pop(user_id, None)
+        pending = self._pending.pop(user_id, None)
+        if self._clear_pending:
+            # Таблица и так будет очищена при следующей записи
+            return pending is not None
+        async with self._save_lock:
+            removed, self._db_stats = await asyncio.to_thread(self._write, [], [user_id], False)
+        if removed:
+            self._logger.info("Удален пользователь: %d", user_id)
+        return bool(removed) or pending is not None
+
+    def clear_all(self) -> None:
+        """Очищает всех пользователей (таблица очищается при следующей записи)"""
+        self._recent.clear()
+        self._pending.clear()
+        self._clear_pending = True
+        self._schedule_flush()
+        self._logger.info("Все пользователи удалены")
+
+    def _remember(self, user_id: int, user_info: UserInfo, now: float) -> None:
+        self._recent[user_id] = (user_info, now)
+        while len(self._recent) > self._recent_cache_size:
+            del self._recent[next(iter(self._recent))]
+
+    def _schedule_flush(self) -> None:
+        if self._pending_flush is not None and not self._pending_flush.done():
+            return
+        try:
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            pass
+
+    def _write(
+        self, upserts: list[tuple[UserInfo, float]], deletes: list[int], clear: bool
+    ) -> tuple[int, _Counts]:
+        """Записывает пачку одной транзакцией, возвращает число удаленных и статистику"""
+        with self._lock, self._conn:
+            if clear:
+                self._conn.execute("DELETE FROM users")
+            self._conn.executemany(
+                f"INSERT INTO users ({_COLUMNS}, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(user_id) DO UPDATE SET"
+                " username = excluded.username,"
+                " first_name = excluded.first_name,"
+                " last_name = excluded.last_name,"
+                " language_code = excluded.language_code,"
+                " last_seen = excluded.last_seen",
+                [
+                    (
+                        info.user_id, info.username, info.first_name, info.last_name,
+                        int(info.is_bot), info.language_code, seen, seen,
+                    )
+                    for info, seen in upserts
+                ],
+            )
+            removed = self._conn.executemany(
+                "DELETE FROM users WHERE user_id = ?", [(user_id,) for user_id in deletes]
+            ).rowcount
+            stats = self._conn.execute(_STATS_QUERY).fetchone()
+        return max(0, removed), stats
+
+    async def flush(self) -> None:
+        """Записывает накопленные изменения одной транзакцией вне event loop"""
+        async with self._save_lock:
+            if not self._pending and not self._clear_pending:
+                return
+            pending, clear = self._pending, self._clear_pending
+            db_stats = self._db_stats
+            # Пока пачка пишется, счетчики уже учитывают ее
+            self._db_stats = _apply_queue(_ABSENT if clear else db_stats, pending)
+            self._pending = {}
+            self._clear_pending = False
+            try:
+                _, self._db_stats = await asyncio.to_thread(
+                    self._write,
+                    [(info, seen) for info, seen, _ in pending.values()],
+                    [],
+                    clear,
+                )
+            except Exception as e:
+                # Возвращаем в очередь то, что не перезаписано новыми изменениями
+                for user_id, entry in pending.items():
+                    self._pending.setdefault(user_id, entry)
+                self._clear_pending = self._clear_pending or clear
+                self._db_stats = db_stats
+                self._logger.error("Ошибка сохранения пользователей: %s", e)
+
+    def start_flusher(self, interval_sec: float = 5.0) -> None:
+        """Запускает периодическую запись изменений"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(interval_sec))
+
+    async def _flush_loop(self, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            await self.flush()
+
+    async def aclose(self) -> None:
+        """Останавливает таймер, записывает изменения и закрывает базу"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # --- Чтение ---
+
+    def _fetch_page(self, after_id: int, limit: int) -> list[UserInfo]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?",
+                (after_id, limit),
+            ).fetchall()
+        return [_row_to_user(row) for row in rows]
+
+    async def iter_users(self, batch_size: int = 1000) -> AsyncIterator[UserInfo]:
+        """Постранично перебирает пользователей (курсор по user_id)"""
+        await self.flush()
+        after_id = -(2**63)
+        while True:
+            page = await asyncio.to_thread(self._fetch_page, after_id, batch_size)
+            for user_info in page:
+                yield user_info
+            if len(page) < batch_size:
+                return
+            after_id = page[-1].user_id
+
+    async def get_all_users(self) -> list[UserInfo]:
+        """Возвращает всех пользователей (для рассылки лучше iter_users)"""
+        return [user_info async for user_info in self.iter_users()]
+
+    def get_user_count(self) -> int:
+        """Возвращает количество пользователей (с учетом еще не записанных)"""
+        return self.get_stats()["total"]
+
+    def get_stats(self) -> dict[str, int]:
+        """Статистика для админки: всего, с username, с именем (с учетом очереди).
+
+        Между записями это оценка: добавленные не из кэша считаются новыми.
+        После ``flush`` счетчики точные.
+        """
+        total, with_username, with_first_name = _apply_queue(
+            _ABSENT if self._clear_pending else self._db_stats, self._pending
+        )
+        return {
+            "total": total,
+            "with_username": with_username,
+            "with_first_name": with_first_name,
+        }
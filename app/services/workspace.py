@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any
+
+from app.config.settings import TELEGRAM_UPLOAD_LIMIT_BYTES
+
+# Префикс временных папок скачивания (по нему же их находит уборщик)
+DIR_PREFIX = "tiktok_"
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+class DownloadWorkspace:
+    """Каталог для скачиваний с квотой на диск и уборкой осиротевших папок.
+
+    Каждая папка при создании резервирует ``reserve_bytes`` (по умолчанию лимит
+    загрузки Telegram), а после скачивания резерв уменьшается до реального
+    размера. Если квота исчерпана, создание новой папки ждет освобождения места.
+    Уборщик периодически удаляет старые папки, которые никто не отслеживает:
+    остатки упавших процессов и прошлых запусков, включая ``/tmp/tiktok_*``.
+    """
+
+    def __init__(
+        self,
+        root: str | None = None,
+        quota_bytes: int = 1024 * 1024 * 1024,
+        reserve_bytes: int = TELEGRAM_UPLOAD_LIMIT_BYTES,
+        stale_after_sec: float = 3600.0,
+    ) -> None:
+        self._root = root or os.path.join(tempfile.gettempdir(), "tiktokbot")
+        self._quota_bytes = quota_bytes
+        self._reserve_bytes = reserve_bytes
+        self._stale_after_sec = stale_after_sec
+        self._active: dict[str, int] = {}
+        self._reserved = 0
+        self._waiters = 0
+        self._condition = asyncio.Condition()
+        self._janitor: asyncio.Task[None] | None = None
+        self._logger = logging.getLogger(__name__)
+        # Метрики
+        self._created = 0
+        self._waited = 0
+        self._janitor_removed = 0
+        self._disk_used = 0
+
+    def configure(
+        self, root: str | None = None, quota_bytes: int | None = None
+    ) -> None:
+        """Настраивает каталог и квоту (до первого скачивания)"""
+        if root:
+            self._root = root
+        if quota_bytes is not None:
+            self._quota_bytes = quota_bytes
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    async def create_dir(self) -> str:
+        """Создает папку для скачивания, дожидаясь места в квоте"""
+        reserve = min(self._reserve_bytes, self._quota_bytes)
+        async with self._condition:
+            if not self._fits(reserve):
+                self._waited += 1
+                self._waiters += 1
+                try:
+                    await self._condition.wait_for(lambda: self._fits(reserve))
+                finally:
+                    self._waiters -= 1
+            self._reserved += reserve
+        try:
+            path = await asyncio.to_thread(self._make_dir)
+        except BaseException:
+            await self._unreserve(reserve)
+            raise
+        self._active[path] = reserve
+        self._created += 1
+        return path
+
+    async def settle(self, path: str) -> None:
+        """Уменьшает резерв папки до фактического размера после скачивания"""
+        directory = self._tracked_dir(path)
+        if directory is None:
+            return
+        size = await asyncio.to_thread(_dir_size, directory)
+        reserved = self._active.get(directory)
+        if reserved is None or size >= reserved:
+            return
+        self._active[directory] = size
+        await self._unreserve(reserved - size)
+
+    async def release(self, path: str) -> None:
+        """Удаляет папку (или файл внутри нее) и возвращает место в квоту"""
+        directory = self._tracked_dir(path)
+        if directory is None:
+            # Папка не наша (например, создана до перезапуска) - удаляем по префиксу
+            await asyncio.to_thread(self._remove_untracked, path)
+            return
+        reserved = self._active.pop(directory)
+        try:
+            await asyncio.to_thread(shutil.rmtree, directory, True)
+        finally:
+            await self._unreserve(reserved)
+
+    def start_janitor(self, interval_sec: float = 600.0) -> None:
+        """Запускает периодическую уборку старых папок"""
+        if self._janitor is None:
+            self._janitor = asyncio.create_task(self._janitor_loop(interval_sec))
+
+    async def sweep(self) -> int:
+        """Удаляет старые неотслеживаемые папки, возвращает их количество"""
+        roots = {self._root, tempfile.gettempdir()}
+        removed, disk_used = await asyncio.to_thread(self._sweep, roots, set(self._active))
+        self._janitor_removed += removed
+        self._disk_used = disk_used
+        return removed
+
+    def get_stats(self) -> dict[str, Any]:
+        try:
+            free = shutil.disk_usage(self._root).free if os.path.isdir(self._root) else None
+        except OSError:
+            free = None
+        return {
+            "root": self._root,
+            "active_dirs": len(self._active),
+            "reserved_bytes": self._reserved,
+            "quota_bytes": self._quota_bytes,
+            "disk_used_bytes": self._disk_used,
+            "disk_free_bytes": free,
+            "waiting": self._waiters,
+            "waited": self._waited,
+            "created": self._created,
+            "janitor_removed": self._janitor_removed,
+        }
+
+    async def aclose(self) -> None:
+        if self._janitor is not None:
+            self._janitor.cancel()
+            await asyncio.gather(self._janitor, return_exceptions=True)
+            self._janitor = None
+
+    def _fits(self, reserve: int) -> bool:
+        # Одна папка допускается всегда, иначе квота меньше резерва заблокирует всех
+        return not self._reserved or self._reserved + reserve <= self._quota_bytes
+
+    async def _unreserve(self, amount: int) -> None:
+        async with self._condition:
+            self._reserved = max(0, self._reserved - amount)
+            self._condition.notify_all()
+
+    def _make_dir(self) -> str:
+        os.makedirs(self._root, exist_ok=True)
+        return tempfile.mkdtemp(prefix=DIR_PREFIX, dir=self._root)
+
+    def _tracked_dir(self, path: str) -> str | None:
+        if path in self._active:
+            return path
+        parent = os.path.dirname(path)
+        return parent if parent in self._active else None
+
+    def _remove_untracked(self, path: str) -> None:
+        parent = os.path.dirname(path)
+        if os.path.basename(parent).startswith(DIR_PREFIX):
+            shutil.rmtree(parent, ignore_errors=True)
+        elif os.path.isfile(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                self._logger.warning("Не удалось удалить файл %s: %s", path, e)
+
+    def _sweep(self, roots: set[str], active: set[str]) -> tuple[int, int]:
+        deadline = time.time() - self._stale_after_sec
+        removed = 0
+        for root in roots:
+            try:
+                entries = list(os.scandir(root))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.startswith(DIR_PREFIX) or entry.path in active:
+                    continue
+                try:
+                    if not entry.is_dir(follow_symlinks=False) or entry.stat().st_mtime > deadline:
+                        continue
+                except OSError:
+                    continue
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        disk_used = _dir_size(self._root) if os.path.isdir(self._root) else 0
+        return removed, disk_used
+
+    async def _janitor_loop(self, interval_sec: float) -> None:
+        while True:
+            try:
+                removed = await self.sweep()
+                if removed:
+                    self._logger.info("Уборщик удалил старых папок скачивания: %d", removed)
+            except Exception as e:
+                self._logger.warning("Ошибка уборки папок скачивания: %s", e)
+            await asyncio.sleep(interval_sec)
+
+
+# Глобальный каталог скачиваний
+download_workspace = DownloadWorkspace()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Корень проекта - чтобы рабочий процесс нашел пакет app при любом cwd
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+
+
+class WorkerJobError(Exception):
+    """Рабочий процесс сообщил об ошибке задания"""
+
+    def __init__(self, message: str, kind: str | None = None) -> None:
+        super().__init__(message)
+        self.kind = kind
+
+
+@dataclass(slots=True, eq=False)
+class _Worker:
+    process: asyncio.subprocess.Process
+    jobs: int = 0
+    init_sec: float = 0.0
+
+
+class YtDlpWorkerPool:
+    """Ограниченный пул процессов yt-dlp.
+
+    Задание выполняется в отдельном процессе: по таймауту или отмене процесс
+    убивается вместе со скачиванием, поэтому ни поток, ни трафик, ни временная
+    папка не остаются висеть. После ``max_jobs_per_worker`` заданий процесс
+    перезапускается, чтобы ограничить рост памяти.
+
+    Процессы импортируют yt-dlp и создают ``YoutubeDL`` при старте, а ``warm()``
+    поднимает их заранее, так что первое задание не платит за холодный старт.
+    """
+
+    def __init__(self, max_workers: int = 4, max_jobs_per_worker: int = 50) -> None:
+        self._max_workers = max(1, max_workers)
+        self._max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self._semaphore = asyncio.Semaphore(self._max_workers)
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._closed = False
+        self._background: set[asyncio.Task[None]] = set()
+        self._logger = logging.getLogger(__name__)
+        # Метрики
+        self._jobs = 0
+        self._killed = 0
+        self._recycled = 0
+        self._spawned = 0
+        self._init_sec_total = 0.0
+        # Задержка задания: "cold" - пришлось поднимать процесс, "warm" - готовый из пула
+        self._latency: dict[str, list[float]] = {"cold": [0.0, 0], "warm": [0.0, 0]}
+
+    async def run(
+        self,
+        job: dict[str, Any],
+        timeout_sec: float,
+        on_progress: Callable[[int, int | None], None] | None = None,
+    ) -> dict[str, Any]:
+        """Выполняет задание в рабочем процессе и возвращает его результат"""
+        async with self._semaphore:
+            if self._closed:
+                raise RuntimeError("Пул yt-dlp закрыт")
+            started = time.monotonic()
+            kind = "warm" if self._idle else "cold"
+            if self._idle:
+                worker = self._idle.pop()
+            else:
+                worker = await asyncio.wait_for(self._spawn(), timeout_sec)
+            try:
+                self._busy.add(worker)
+                result = await asyncio.wait_for(
+                    self._execute(worker, job, on_progress),
+                    max(0.1, timeout_sec - (time.monotonic() - started)),
+                )
+            except BaseException:
+                # Таймаут, отмена или сбой процесса - убиваем, заданию конец
+                self._busy.discard(worker)
+                await self._kill(worker)
+                raise
+            self._busy.discard(worker)
+            self._jobs += 1
+            self._record_latency(kind, time.monotonic() - started)
+            self._release(worker)
+        if result.get("type") == "error":
+            raise WorkerJobError(result.get("message") or "yt-dlp worker error", result.get("kind"))
+        return result
+
+    async def warm(self, count: int | None = None) -> None:
+        """Заранее поднимает рабочие процессы (в фоне при запуске бота)"""
+        target = self._max_workers if count is None else min(count, self._max_workers)
+        missing = target - len(self._idle) - len(self._busy)
+        if missing <= 0 or self._closed:
+            return
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, _Worker):
+                self._release(result)
+            else:
+                self._logger.warning("Не удалось прогреть процесс yt-dlp: %s", result)
+        self._logger.info("Прогрето процессов yt-dlp: %d", len(self._idle))
+
+    def get_stats(self) -> dict[str, Any]:
+        cold_total, cold_count = self._latency["cold"]
+        warm_total, warm_count = self._latency["warm"]
+        return {
+            "max_workers": self._max_workers,
+            "idle": len(self._idle),
+            "busy": len(self._busy),
+            "jobs": self._jobs,
+            "killed": self._killed,
+            "recycled": self._recycled,
+            "spawned": self._spawned,
+            "init_avg_sec": self._init_sec_total / self._spawned if self._spawned else 0.0,
+            "cold_jobs": int(cold_count),
+            "cold_avg_sec": cold_total / cold_count if cold_count else 0.0,
+            "warm_jobs": int(warm_count),
+            "warm_avg_sec": warm_total / warm_count if warm_count else 0.0,
+        }
+
+    def _record_latency(self, kind: str, elapsed_sec: float) -> None:
+        bucket = self._latency[kind]
+        bucket[0] += elapsed_sec
+        bucket[1] += 1
+
+    async def aclose(self) -> None:
+        """Останавливает все рабочие процессы"""
+        self._closed = True
+        workers = [*self._idle, *self._busy]
+        self._idle.clear()
+        self._busy.clear()
+        await asyncio.gather(*(self._kill(w) for w in workers), return_exceptions=True)
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def _spawn(self) -> _Worker:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PROJECT_ROOT, env.get("PYTHONPATH")]))
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "app.services.ytdlp_worker",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=_PROJECT_ROOT,
+            env=env,
+        )
+        worker = _Worker(process)
+        try:
+            # Ждем, пока процесс импортирует yt-dlp и будет готов к заданиям
+            ready = await asyncio.wait_for(self._read_message(worker), 60)
+        except BaseException:
+            await self._kill(worker)
+            raise
+        worker.init_sec = float(ready.get("init_sec") or 0.0)
+        self._spawned += 1
+        self._init_sec_total += worker.init_sec
+        self._logger.info(
+            "Запущен процесс yt-dlp pid=%s (инициализация %.2f с)", process.pid, worker.init_sec
+        )
+        return worker
+
+    async def _read_message(self, worker: _Worker) -> dict[str, Any]:
+        assert worker.process.stdout is not None
+        line = await worker.process.stdout.readline()
+        if not line:
+            raise WorkerJobError("Процесс yt-dlp неожиданно завершился")
+        return json.loads(line)
+
+    async def _execute(
+        self,
+        worker: _Worker,
+        job: dict[str, Any],
+        on_progress: Callable[[int, int | None], None] | None,
+    ) -> dict[str, Any]:
+        process = worker.process
+        assert process.stdin is not None
+        worker.jobs += 1
+        job = {**job, "progress": on_progress is not None}
+        process.stdin.write((json.dumps(job, ensure_ascii=False) + "\n").encode())
+        await process.stdin.drain()
+        while True:
+            message = await self._read_message(worker)
+            kind = message.get("type")
+            if kind in ("result", "error"):
+                return message
+            if kind == "progress" and on_progress is not None:
+                try:
+                    on_progress(int(message.get("downloaded") or 0), message.get("total"))
+                except Exception as e:
+                    self._logger.debug("Ошибка колбэка прогресса: %s", e)
+
+    def _release(self, worker: _Worker) -> None:
+        """Возвращает процесс в пул или перезапускает отработавший свое"""
+        if self._closed or worker.process.returncode is not None:
+            self._in_background(self._kill(worker))
+        elif len(self._idle) >= self._max_workers:
+            self._in_background(self._retire(worker))
+        elif worker.jobs >= self._max_jobs_per_worker:
+            self._recycled += 1
+            self._in_background(self._replace(worker))
+        else:
+            self._idle.append(worker)
+
+    def _in_background(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replace(self, worker: _Worker) -> None:
+        """Перезапускает процесс, сразу поднимая теплую замену"""
+        await self._retire(worker)
+        if not self._closed:
+            try:
+                replacement = await self._spawn()
+            except Exception as e:
+                self._logger.warning("Не удалось поднять замену процесса yt-dlp: %s", e)
+                return
+            self._release(replacement)
+
+    async def _retire(self, worker: _Worker) -> None:
+        """Мягко завершает процесс: закрываем stdin, он выходит сам"""
+        process = worker.process
+        if process.stdin is not None:
+            process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), 10)
+        except TimeoutError:
+            await self._kill(worker)
+
+    async def _kill(self, worker: _Worker) -> None:
+        process = worker.process
+        if process.returncode is None:
+            self._killed += 1
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        # Дожидаемся смерти процесса даже при повторной отмене
+        await asyncio.shield(process.wait())
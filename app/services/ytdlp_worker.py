@@ -0,0 +1,193 @@
+"""Рабочий процесс yt-dlp.
+
+Запускается пулом как ``python -m app.services.ytdlp_worker``. Принимает задания
+JSON-строками из stdin и отвечает JSON-строками в stdout. Модуль намеренно
+не импортирует ничего из бота, чтобы процесс стартовал быстро и не тянул
+глобальное состояние (хранилища пользователей и т.п.).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import Any, TextIO
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0 Safari/537.36"
+)
+
+
+def build_ydl_opts() -> dict[str, Any]:
+    # Папка задается через "paths" на каждое задание, поэтому экземпляр
+    # YoutubeDL можно создать один раз и переиспользовать
+    return {
+        "outtmpl": "%(id)s.%(ext)s",
+        "format": "best[ext=mp4]/best",
+        "quiet": True,
+        "no_warnings": True,
+        "extract_flat": False,
+        "http_headers": {
+            "User-Agent": _USER_AGENT,
+            "Referer": "https://www.tiktok.com/",
+        },
+        "extractor_args": {
+            "tiktok": {
+                "download_api": True,
+            }
+        },
+        "merge_output_format": "mp4",
+        "nocheckcertificate": True,
+        # Оптимизации для скорости
+        "socket_timeout": 10,
+        "retries": 2,
+        "fragment_retries": 2,
+        "concurrent_fragment_downloads": 4,
+        "http_chunk_size": 1048576,  # 1MB chunks
+    }
+
+
+def create_downloader() -> Any:
+    """Импортирует yt-dlp и создает переиспользуемый экземпляр YoutubeDL"""
+    import yt_dlp  # type: ignore
+
+    ydl = yt_dlp.YoutubeDL(build_ydl_opts())
+    # Экстрактор TikTok создается лениво при первом обращении - делаем это заранее
+    ydl.get_info_extractor("TikTok")
+    return ydl
+
+
+class VideoTooLargeError(Exception):
+    """Видео не пролезает в лимит загрузки Telegram"""
+
+
+def _format_under(max_bytes: int) -> str:
+    """Формат не больше лимита; размер неизвестен - допускаем (проверим после)"""
+    size = f"[filesize<?{max_bytes}][filesize_approx<?{max_bytes}]"
+    return f"best[ext=mp4]{size}/best{size}"
+
+
+def _estimate_size(info: dict[str, Any]) -> int | None:
+    size = info.get("filesize") or info.get("filesize_approx")
+    if size:
+        return int(size)
+    # Оценка по битрейту и длительности
+    tbr, duration = info.get("tbr"), info.get("duration")
+    if tbr and duration:
+        return int(float(tbr) * 1000 / 8 * float(duration))
+    return None
+
+
+def download_video(ydl: Any, job: dict[str, Any]) -> dict[str, Any]:
+    """Проба метаданных, выбор формата под лимит и скачивание в temp_dir"""
+    temp_dir = job["temp_dir"]
+    max_bytes = int(job.get("max_bytes") or 0)
+    ydl.params["paths"] = {"home": temp_dir}
+    # Селектор формата YoutubeDL строит один раз в __init__ - подменяем его явно
+    format_spec = _format_under(max_bytes) if max_bytes else "best[ext=mp4]/best"
+    ydl.params["format"] = format_spec
+    ydl.format_selector = ydl.build_format_selector(format_spec)
+
+    # Этап 1: только метаданные, без скачивания
+    try:
+        info = ydl.extract_info(job["url"], download=False)
+    except Exception as e:
+        if max_bytes and "requested format is not available" in str(e).lower():
+            raise VideoTooLargeError(str(e)) from e
+        raise
+    if not isinstance(info, dict):
+        raise ValueError("yt-dlp не вернул метаданные видео")
+
+    size = _estimate_size(info)
+    if max_bytes and size and size > max_bytes:
+        raise VideoTooLargeError(f"{size} > {max_bytes}")
+    meta = {
+        "size": size,
+        "duration": info.get("duration"),
+        "width": info.get("width"),
+        "height": info.get("height"),
+        "video_id": info.get("id"),
+        "thumbnail": info.get("thumbnail"),
+    }
+
+    # Маленькие файлы можно отдать Telegram по ссылке, не скачивая самим
+    url_max_bytes = int(job.get("url_max_bytes") or 0)
+    direct_url = info.get("url")
+    if url_max_bytes and size and size <= url_max_bytes and isinstance(direct_url, str):
+        return {"url": direct_url, **meta}
+
+    # Этап 2: скачиваем уже выбранный формат
+    ydl.process_info(info)
+    filename = ydl.prepare_filename(info)
+    if isinstance(filename, str) and os.path.exists(filename):
+        return {"path": filename, **meta}
+
+    # Если не нашли по prepare_filename, ищем в папке
+    for file in os.listdir(temp_dir):
+        if file.endswith(".mp4"):
+            return {"path": os.path.join(temp_dir, file), **meta}
+
+    raise ValueError("yt-dlp не смог скачать файл")
+
+
+def _send(out: TextIO, message: dict[str, Any]) -> None:
+    out.write(json.dumps(message, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+class ProgressReporter:
+    """Хук прогресса yt-dlp: пересылает байты родителю не чаще раза в interval_sec"""
+
+    def __init__(self, out: TextIO, interval_sec: float = 0.5) -> None:
+        self._out = out
+        self._interval_sec = interval_sec
+        self._sent_at = 0.0
+        self.enabled = False
+
+    def __call__(self, status: dict[str, Any]) -> None:
+        if not self.enabled or status.get("status") != "downloading":
+            return
+        now = time.monotonic()
+        if now - self._sent_at < self._interval_sec:
+            return
+        self._sent_at = now
+        total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        _send(self._out, {
+            "type": "progress",
+            "downloaded": int(status.get("downloaded_bytes") or 0),
+            "total": int(total) if total else None,
+        })
+
+
+def main() -> None:
+    # stdout занят протоколом - все случайные print() уводим в stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    # Прогрев: импорт yt-dlp и инициализация экстракторов до первого задания
+    started = time.monotonic()
+    ydl = create_downloader()
+    reporter = ProgressReporter(out)
+    ydl.add_progress_hook(reporter)
+    _send(out, {"type": "ready", "init_sec": time.monotonic() - started})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        started = time.monotonic()
+        reporter.enabled = bool(job.get("progress"))
+        try:
+            result = download_video(ydl, job)
+        except VideoTooLargeError as e:
+            _send(out, {"type": "error", "kind": "too_large", "message": str(e)})
+        except Exception as e:
+            _send(out, {"type": "error", "message": str(e)})
+        else:
+            _send(out, {"type": "result", **result, "elapsed_sec": time.monotonic() - started})
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,125 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
+from typing import NamedTuple
+from urllib.parse import urljoin
+
 import httpx
 
+from app.services.cache import TTLCache
+from app.utils.validators import extract_video_id
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0 Safari/537.36"
+)
+_MAX_REDIRECTS = 5
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий пул соединений для служебных запросов (раскрытие коротких ссылок и т.п.)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            headers={"User-Agent": _USER_AGENT},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+    return _client
+
+
+async def aclose_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Раскрытые короткие ссылки: LRU + TTL
+_redirect_cache = TTLCache(max_entries=5000, default_ttl_sec=24 * 3600)
+
 
 async def expand_url_if_short(url: str, timeout_sec: float = 10.0) -> str:
     """Follow redirects and return final URL. Falls back to GET if HEAD is not allowed.
 
+    Stops early as soon as the redirect target contains a video id. Results are
+    cached, and the shared connection pool is reused between calls.
     Returns original url on any error.
     """
+    cached = _redirect_cache.get(url)
+    if cached is not None:
+        return cached
+
+    client = get_http_client()
+    current = url
     try:
-        async with httpx.AsyncClient(
-            timeout=httpx.Timeout(timeout_sec),
-            follow_redirects=True,
-        ) as client:
-            try:
-                resp = await client.head(url)
+        for _ in range(_MAX_REDIRECTS):
+            resp = await client.head(current, timeout=timeout_sec)
+            if resp.status_code == 405:
+                # Some hosts reject HEAD; try GET with small limit (stream only headers)
+                resp = await client.get(
+                    current, headers={"Range": "bytes=0-0"}, timeout=timeout_sec
+                )
+            if not resp.is_redirect:
                 resp.raise_for_status()
-                return str(resp.url)
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 405:
-                    # Some hosts reject HEAD; try GET with small limit (stream only headers)
-                    resp = await client.get(url, headers={"Range": "bytes=0-0"})
-                    resp.raise_for_status()
-                    return str(resp.url)
-                raise
+                break
+            current = urljoin(current, resp.headers["Location"])
+            if extract_video_id(current):
+                break
     except Exception:
         return url
 
+    _redirect_cache.set(url, current)
+    return current
+
+
+class CanonicalLink(NamedTuple):
+    video_id: str | None
+    url: str
+
+
+async def canonicalize_tiktok_url(url: str) -> CanonicalLink:
+    """Возвращает числовой id видео и полную ссылку (короткие ссылки раскрываются)"""
+    video_id = extract_video_id(url)
+    if video_id is None:
+        url = await expand_url_if_short(url)
+        video_id = extract_video_id(url)
+    return CanonicalLink(video_id=video_id, url=url)
+
+
+async def probe_content_length(url: str, timeout_sec: float = 5.0) -> int | None:
+    """Размер файла по заголовку Content-Length (HEAD); None, если неизвестен"""
+    try:
+        resp = await get_http_client().head(url, timeout=timeout_sec, follow_redirects=True)
+        resp.raise_for_status()
+        return int(resp.headers["Content-Length"])
+    except Exception:
+        return None
+
 
+async def download_to_file(
+    url: str,
+    path: str,
+    max_bytes: int,
+    timeout_sec: float = 60.0,
+    on_progress: Callable[[int, int | None], None] | None = None,
+) -> int:
+    """Скачивает файл потоком через общий пул соединений, не превышая max_bytes"""
+    written = 0
+    client = get_http_client()
+    async with client.stream("GET", url, timeout=timeout_sec, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        length = resp.headers.get("Content-Length")
+        total = int(length) if length and length.isdigit() else None
+        with open(path, "wb") as f:
+            async for chunk in resp.aiter_bytes(1024 * 1024):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise ValueError(f"Файл больше лимита {max_bytes} байт")
+                await asyncio.to_thread(f.write, chunk)
+                if on_progress is not None:
+                    on_progress(written, total)
+    return written
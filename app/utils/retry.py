@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+class RetryBudget:
+    """Бюджет повторов на процесс: не дает ретраям умножать нагрузку при сбоях.
+
+    Каждый исходный запрос добавляет ``ratio`` токенов, каждый повтор тратит один.
+    ``min_per_sec`` гарантирует минимальный поток повторов при малом трафике.
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_per_sec: float = 1.0, max_tokens: float = 50.0
+    ) -> None:
+        self._ratio = max(0.0, ratio)
+        self._min_per_sec = max(0.0, min_per_sec)
+        self._max_tokens = max(1.0, max_tokens)
+        self._tokens = self._max_tokens
+        self._updated_at = time.monotonic()
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_spend(self) -> bool:
+        """Разрешает один повтор, если в бюджете есть токен"""
+        now = time.monotonic()
+        self._tokens = min(
+            self._max_tokens, self._tokens + (now - self._updated_at) * self._min_per_sec
+        )
+        self._updated_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+
+def backoff_delay(attempt: int, base_sec: float, cap_sec: float = 10.0) -> float:
+    """Экспоненциальная задержка с полным джиттером (attempt начинается с 1)"""
+    return random.uniform(0.0, min(cap_sec, base_sec * 2 ** (attempt - 1)))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Разбирает заголовок Retry-After (секунды или HTTP-дата)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
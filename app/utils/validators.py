@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 from typing import Final
+from urllib.parse import urlsplit
 
 _TIKTOK_DOMAINS: Final = (
     r"(?:https?://)?(?:www\.|m\.)?tiktok\.com/[^\s]+",
@@ -15,6 +16,13 @@ _TIKTOK_URL_RE: Final = re.compile(
     flags=re.IGNORECASE,
 )
 
+# Формы ссылок, в которых id видео виден без перехода по редиректу
+_VIDEO_ID_RES: Final = (
+    re.compile(r"/(?:video|photo|v)/(\d{8,25})"),
+    re.compile(r"/embed(?:/v2)?/(\d{8,25})"),
+    re.compile(r"[?&](?:item_id|share_item_id|aweme_id)=(\d{8,25})"),
+)
+
 
 def extract_tiktok_url(text: str) -> str | None:
     if not text:
@@ -31,3 +39,21 @@ def extract_tiktok_url(text: str) -> str | None:
     return url
 
 
+def canonical_link_key(url: str) -> str:
+    """Ключ ссылки без схемы, поддомена www/m, параметров и хвостового слэша"""
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    return host + parts.path.rstrip("/")
+
+
+def extract_video_id(url: str) -> str | None:
+    """Возвращает числовой id видео, если он присутствует в ссылке"""
+    for pattern in _VIDEO_ID_RES:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return None
@@ -0,0 +1,174 @@
+"""Рассылка: прежний последовательный цикл против BroadcastEngine.
+
+Поднимает локальный поддельный Bot API (aiohttp) с задержкой ответа ``--rtt``
+и лимитом ``--limit`` сообщений в секунду на весь бот: сверх лимита сервер
+отвечает 429 с ``retry_after``. Часть получателей "заблокировала" бота (403).
+Настоящий ``aiogram.Bot`` ходит в этот сервер через TelegramAPIServer.
+
+Запуск из корня проекта:
+    python -m benchmarks.broadcast_engine --users 300 --rtt 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="bench_broadcast_"))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+
+from app.services.broadcaster import BroadcastEngine, BroadcastResult  # noqa: E402
+
+_TOKEN = "42:bench"
+
+
+class FakeBotApi:
+    """sendMessage с задержкой, общим лимитом частоты и заблокированными чатами"""
+
+    def __init__(self, rtt_sec: float, limit_per_sec: int, blocked_every: int) -> None:
+        self.rtt_sec = rtt_sec
+        self.limit_per_sec = limit_per_sec
+        self.blocked_every = blocked_every
+        self.accepted: collections.deque[float] = collections.deque()
+        self.delivered: set[int] = set()
+        self.rejected_429 = 0
+
+    def reset(self) -> None:
+        self.accepted.clear()
+        self.delivered.clear()
+        self.rejected_429 = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        data = await request.post()
+        chat_id = int(data["chat_id"])
+        await asyncio.sleep(self.rtt_sec)
+        now = time.monotonic()
+        while self.accepted and now - self.accepted[0] >= 1.0:
+            self.accepted.popleft()
+        if len(self.accepted) >= self.limit_per_sec:
+            self.rejected_429 += 1
+            return web.json_response({
+                "ok": False,
+                "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            }, status=429)
+        if self.blocked_every and chat_id % self.blocked_every == 0:
+            return web.json_response({
+                "ok": False,
+                "error_code": 403,
+                "description": "Forbidden: bot was blocked by the user",
+            }, status=403)
+        self.accepted.append(now)
+        self.delivered.add(chat_id)
+        return web.json_response({
+            "ok": True,
+            "result": {
+                "message_id": len(self.delivered),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": data.get("text", ""),
+            },
+        })
+
+
+async def legacy_broadcast(bot: Bot, chat_ids: list[int]) -> BroadcastResult:
+    """Прежний send_broadcast: по одному сообщению и sleep(0.1), без обработки 429"""
+    result = BroadcastResult(total=len(chat_ids))
+    started = time.monotonic()
+    for chat_id in chat_ids:
+        try:
+            await bot.send_message(chat_id, "bench")
+            result.sent += 1
+            await asyncio.sleep(0.1)
+        except Exception as e:
+            if "bot was blocked" in str(e).lower():
+                result.blocked += 1
+            else:
+                result.failed += 1
+    result.elapsed_sec = time.monotonic() - started
+    return result
+
+
+async def engine_broadcast(
+    bot: Bot, chat_ids: list[int], rate: float, concurrency: int
+) -> BroadcastResult:
+    async def send(chat_id: int) -> None:
+        await bot.send_message(chat_id, "bench")
+
+    async def recipients() -> AsyncIterator[int]:
+        for chat_id in chat_ids:
+            yield chat_id
+
+    engine = BroadcastEngine(send, rate_per_sec=rate, concurrency=concurrency)
+    return await engine.run(recipients())
+
+
+def report(name: str, result: BroadcastResult, api: FakeBotApi) -> None:
+    rate = result.sent / result.elapsed_sec if result.elapsed_sec else 0.0
+    print(
+        f"{name:28s} {result.elapsed_sec:7.2f} с, {rate:5.1f} сообщ/с, "
+        f"доставлено {len(api.delivered)}, заблок. {result.blocked}, ошибок {result.failed}, "
+        f"429 от сервера {api.rejected_429}, пауз {result.flood_waits}"
+        + (f", итоговая скорость {result.final_rate:.1f}/с" if result.final_rate else "")
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--rtt", type=float, default=0.05, help="задержка ответа Bot API, с")
+    parser.add_argument("--limit", type=int, default=30, help="лимит сервера, сообщ/с")
+    parser.add_argument(
+        "--blocked-every", type=int, default=50, help="каждый N-й чат заблокировал бота"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    api = FakeBotApi(args.rtt, args.limit, args.blocked_every)
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+
+    session = AiohttpSession(api=TelegramAPIServer.from_base(f"http://127.0.0.1:{port}"))
+    bot = Bot(_TOKEN, session=session)
+    chat_ids = list(range(1, args.users + 1))
+    blocked = sum(1 for c in chat_ids if args.blocked_every and c % args.blocked_every == 0)
+    print(
+        f"Получателей: {args.users}, RTT {args.rtt:.2f} с, лимит сервера {args.limit}/с, "
+        f"заблокировали: {blocked}"
+    )
+    try:
+        if not args.skip_legacy:
+            api.reset()
+            report("прежний цикл", await legacy_broadcast(bot, chat_ids), api)
+        for rate in (25.0, float(args.limit) * 1.5):
+            api.reset()
+            # Окно лимита сервера не должно переходить между прогонами
+            await asyncio.sleep(1.0)
+            result = await engine_broadcast(bot, chat_ids, rate, args.concurrency)
+            report(f"engine {rate:.0f}/с x{args.concurrency}", result, api)
+    finally:
+        await bot.session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""Сравнение режимов прогресс-бара: classic и fast.
+
+Прогоняет настоящий обработчик ``on_text`` с поддельными Telegram и резолвером:
+каждый вызов Bot API стоит ``--rtt`` секунд, резолвер отвечает за ``--resolve``.
+Измеряется время от получения сообщения до отправки видео.
+
+Запуск из корня проекта:
+    python -m benchmarks.progress_pipeline --runs 5 --rtt 0.15 --resolve 1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+# Глобальные хранилища читают файлы из текущего каталога - уводим их во временный
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="bench_progress_"))
+
+from app.bot.handlers.tiktok import setup_tiktok_handlers  # noqa: E402
+from app.services.bot_identity import BotIdentity  # noqa: E402
+from app.services.providers.base import VideoResult  # noqa: E402
+
+
+class FakeTelegram:
+    """Имитирует задержку Bot API и считает вызовы"""
+
+    def __init__(self, rtt_sec: float) -> None:
+        self.rtt_sec = rtt_sec
+        self.calls = 0
+        self.video_sent_at: float | None = None
+
+    async def call(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.rtt_sec)
+
+    def status_message(self) -> Any:
+        async def edit_text(text: str, **kwargs: Any) -> None:
+            await self.call()
+
+        async def delete_message(chat_id: int, message_id: int) -> None:
+            await self.call()
+
+        return SimpleNamespace(
+            edit_text=edit_text,
+            bot=SimpleNamespace(delete_message=delete_message),
+            chat=SimpleNamespace(id=1),
+            message_id=2,
+        )
+
+    def message(self, video_id: int) -> Any:
+        async def reply(text: str, **kwargs: Any) -> Any:
+            await self.call()
+            return self.status_message()
+
+        async def reply_video(video: Any, **kwargs: Any) -> Any:
+            await self.call()
+            self.video_sent_at = time.monotonic()
+            return SimpleNamespace(video=None, animation=None, document=None)
+
+        async def get_me() -> Any:
+            await self.call()
+            return SimpleNamespace(username="bench_bot", id=1)
+
+        return SimpleNamespace(
+            text=f"https://www.tiktok.com/@user/video/{video_id}",
+            from_user=SimpleNamespace(id=1, username="bench"),
+            chat=SimpleNamespace(type="private"),
+            bot=SimpleNamespace(get_me=get_me),
+            reply=reply,
+            reply_video=reply_video,
+            answer=reply,
+        )
+
+
+class FakeResolver:
+    def __init__(self, resolve_sec: float) -> None:
+        self.resolve_sec = resolve_sec
+
+    async def get_video(self, tiktok_url: str) -> VideoResult:
+        await asyncio.sleep(self.resolve_sec)
+        return VideoResult(source="url", location="https://example.com/v.mp4", provider="fake")
+
+
+async def run_mode(
+    mode: str, id_offset: int, runs: int, rtt_sec: float, resolve_sec: float
+) -> None:
+    router = setup_tiktok_handlers(FakeResolver(resolve_sec), progress_mode=mode)  # type: ignore[arg-type]
+    on_text = router.message.handlers[0].callback
+    # Профиль бота получен при запуске, как в BotApplication.run
+    bot_identity = BotIdentity()
+    await bot_identity.get(FakeTelegram(0.0).message(0).bot)
+    latencies: list[float] = []
+    handler_times: list[float] = []
+    calls: list[int] = []
+    for i in range(runs):
+        telegram = FakeTelegram(rtt_sec)
+        # У каждого режима свой диапазон id: иначе второй режим попадёт в video_cache,
+        # file_id_cache и объединение запросов, заполненные первым
+        message = telegram.message(7_000_000_000_000_000_000 + id_offset + i)
+        started = time.monotonic()
+        await on_text(message, bot_identity=bot_identity)
+        handler_times.append(time.monotonic() - started)
+        assert telegram.video_sent_at is not None
+        latencies.append(telegram.video_sent_at - started)
+        calls.append(telegram.calls)
+    print(
+        f"{mode:8s} до отправки видео: {statistics.mean(latencies):.3f} с "
+        f"(min {min(latencies):.3f}), обработчик: {statistics.mean(handler_times):.3f} с, "
+        f"вызовов Bot API: {statistics.mean(calls):.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rtt", type=float, default=0.15, help="задержка одного вызова Bot API, с")
+    parser.add_argument("--resolve", type=float, default=1.0, help="время резолвера, с")
+    args = parser.parse_args()
+    print(f"RTT Bot API: {args.rtt:.2f} с, резолвер: {args.resolve:.2f} с, прогонов: {args.runs}")
+    for index, mode in enumerate(("classic", "fast")):
+        await run_mode(mode, index * 1_000_000, args.runs, args.rtt, args.resolve)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""Память на пользователя: словари UserInfo против CompactUserIndex.
+
+Строит N пользователей в прежнем представлении (``dict[int, UserInfo]`` в
+UserStorage плюс ``dict[int, str]`` языков) и в компактном (два индекса:
+с профилями и с языками), измеряет память через tracemalloc, время поиска,
+подсчета по языкам и полного перебора.
+
+Запуск из корня проекта:
+    python -m benchmarks.user_index_memory --users 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="bench_index_"))
+
+from app.services.user_index import CompactUserIndex  # noqa: E402
+from app.services.user_storage import UserInfo, _encode_profile  # noqa: E402
+
+_LANGUAGES = ("ru", "en", "ar", "es", "fr", "de", "pt", "ja", "pl", "tr")
+
+
+def make_users_json(count: int) -> tuple[str, list[int]]:
+    """users.json как в UserStorage (строки при загрузке создаются заново, как в боте)"""
+    rng = random.Random(42)
+    ids = rng.sample(range(100_000_000, 8_000_000_000), count)
+    data = {
+        str(user_id): {
+            "user_id": user_id,
+            "username": f"user{user_id}" if rng.random() < 0.7 else None,
+            "first_name": f"Name{user_id % 5000}",
+            "last_name": f"Surname{user_id % 3000}" if rng.random() < 0.4 else None,
+            "is_bot": False,
+            "language_code": _LANGUAGES[user_id % len(_LANGUAGES)],
+        }
+        for user_id in ids
+    }
+    return json.dumps(data), ids
+
+
+def build_dicts(text: str) -> tuple[dict[int, UserInfo], dict[int, str]]:
+    data = json.loads(text)
+    profiles = {int(user_id): UserInfo(**info) for user_id, info in data.items()}
+    languages = {int(user_id): info["language_code"] for user_id, info in data.items()}
+    return profiles, languages
+
+
+def build_compact(text: str) -> tuple[CompactUserIndex, CompactUserIndex]:
+    data = json.loads(text)
+    profiles = CompactUserIndex(with_profiles=True)
+    profiles.update(
+        (
+            int(user_id),
+            info["language_code"],
+            _encode_profile(info["username"], info["first_name"], info["last_name"]),
+        )
+        for user_id, info in data.items()
+    )
+    languages = CompactUserIndex(languages=_LANGUAGES)
+    languages.update((int(user_id), info["language_code"], None) for user_id, info in data.items())
+    return profiles, languages
+
+
+def measure_memory(build: Callable[[], Any]) -> tuple[Any, int, float]:
+    # Время без tracemalloc (он сильно замедляет выделения), память - отдельным прогоном
+    started = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def timed(fn: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def bench_dicts(text: str, probe: list[int]) -> tuple[int, float, float, float, float]:
+    """Прежнее представление; словари освобождаются при выходе из функции"""
+    (profiles, languages), size, build = measure_memory(lambda: build_dicts(text))
+    lookup = timed(lambda: [languages.get(user_id) for user_id in probe])
+    counts = timed(
+        lambda: [sum(1 for lang in languages.values() if lang == code) for code in _LANGUAGES]
+    )
+    iterate = timed(lambda: sum(1 for _ in profiles.values()))
+    return size, build, lookup, counts, iterate
+
+
+def bench_compact(text: str, probe: list[int]) -> tuple[int, float, float, float, float]:
+    (profiles, languages), size, build = measure_memory(lambda: build_compact(text))
+    lookup = timed(lambda: [languages.get_language(user_id) for user_id in probe])
+    counts = timed(languages.count_by_language)
+    iterate = timed(lambda: sum(1 for _ in profiles.items()))
+    return size, build, lookup, counts, iterate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    text, ids = make_users_json(args.users)
+    probe = random.Random(1).sample(ids, min(args.lookups, len(ids)))
+    print(f"Пользователей: {args.users:,d}, поисков: {len(probe):,d}")
+
+    dict_bytes, dict_build, dict_lookup, dict_counts, dict_iter = bench_dicts(text, probe)
+    gc.collect()
+    compact_bytes, compact_build, compact_lookup, compact_counts, compact_iter = bench_compact(
+        text, probe
+    )
+
+    rows = [
+        ("память, МБ", dict_bytes / 2**20, compact_bytes / 2**20),
+        ("байт на пользователя", dict_bytes / args.users, compact_bytes / args.users),
+        ("построение, с", dict_build, compact_build),
+        ("поиск, мкс", dict_lookup / len(probe) * 1e6, compact_lookup / len(probe) * 1e6),
+        ("счетчики языков, мс", dict_counts * 1e3, compact_counts * 1e3),
+        ("перебор, с", dict_iter, compact_iter),
+    ]
+    print(f"{'':24s}{'dict':>12s}{'compact':>12s}")
+    for name, old, new in rows:
+        print(f"{name:24s}{old:12.2f}{new:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Стоимость set_language: перезапись всего файла против журнала.
+
+Для каждого размера базы создается снимок user_languages.json, затем
+измеряется среднее время одного ``set_language``. Старый способ (перезапись
+всего JSON на каждое изменение) воспроизводится для сравнения и на больших
+базах прогоняется меньшее число раз. В конце измеряется загрузка с
+воспроизведением журнала и фоновое сжатие.
+
+Запуск из корня проекта:
+    python -m benchmarks.user_language_journal --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="bench_lang_"))
+
+from app.services.user_language import UserLanguageStorage  # noqa: E402
+
+_LANGUAGES = ("ru", "en", "ar", "es", "fr", "de", "pt", "ja", "pl", "tr")
+
+
+def make_snapshot(path: str, size: int) -> None:
+    data = {str(1_000_000_000 + i): _LANGUAGES[i % len(_LANGUAGES)] for i in range(size)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    for suffix in (".journal", ".journal.compacting"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def legacy_set_language(path: str, languages: dict[int, str], user_id: int, language: str) -> None:
+    """Поведение до журнала: весь файл переписывается на каждое изменение"""
+    languages[user_id] = language
+    with open(path, "w", encoding="utf-8") as f:
+        data = {str(uid): lang for uid, lang in languages.items()}
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def measure(fn, runs: int) -> float:
+    times = []
+    for i in range(runs):
+        started = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - started)
+    return statistics.mean(times)
+
+
+async def bench_size(size: int, runs: int, legacy_runs: int) -> None:
+    path = f"langs_{size}.json"
+    make_snapshot(path, size)
+
+    storage = UserLanguageStorage(path, compact_after=10**9)
+    journal_sec = measure(
+        lambda i: storage.set_language(1_000_000_000 + i, _LANGUAGES[(i + 1) % len(_LANGUAGES)]),
+        runs,
+    )
+
+    languages = {user_id: language for user_id, language, _ in storage._languages.items()}
+    legacy_sec = measure(
+        lambda i: legacy_set_language(path + ".legacy", languages, 1_000_000_000 + i, "en"),
+        legacy_runs,
+    )
+
+    started = time.perf_counter()
+    await storage.aclose()
+    compact_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reloaded = UserLanguageStorage(path)
+    load_sec = time.perf_counter() - started
+    assert len(reloaded._languages) == size
+
+    print(
+        f"{size:>9,d} польз.: журнал {journal_sec * 1e6:8.1f} мкс, "
+        f"перезапись {legacy_sec * 1e3:9.2f} мс ({legacy_sec / journal_sec:,.0f}x), "
+        f"сжатие {compact_sec:.2f} с, загрузка {load_sec:.2f} с"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--runs", type=int, default=10_000, help="вызовов set_language с журналом")
+    parser.add_argument("--legacy-runs", type=int, default=3, help="вызовов со старой перезаписью")
+    args = parser.parse_args()
+    # Логи на каждое изменение языка искажают замер
+    logging.disable(logging.INFO)
+    for size in args.sizes:
+        await bench_size(size, args.runs, args.legacy_runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import pytest
+
+from app.services import broadcaster
+from app.services.broadcaster import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [100.0]
+    monkeypatch.setattr(broadcaster.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_rate_recovers_after_quiet_period(clock: list[float]) -> None:
+    bucket = TokenBucket(20.0, backoff=0.5, recovery_after_sec=10.0, recovery_step=1.0)
+    bucket.pause(2.0)
+    assert bucket.rate == 10.0
+
+    # Пауза 2 с + спокойный период 10 с - скорость еще не растет
+    clock[0] += 12.0
+    assert bucket.rate == 10.0
+
+    clock[0] += 4.0
+    assert bucket.rate == 14.0
+
+    clock[0] += 60.0
+    assert bucket.rate == 20.0
+
+
+def test_new_flood_wait_backs_off_from_recovered_rate(clock: list[float]) -> None:
+    bucket = TokenBucket(20.0, backoff=0.5, recovery_after_sec=10.0, recovery_step=1.0)
+    bucket.pause(2.0)
+    clock[0] += 16.0
+    bucket.pause(2.0)
+    assert bucket.rate == 7.0
@@ -0,0 +1,31 @@
+import pytest
+
+from app.services.providers.errors import looks_permanent
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "HTTP Error 503: Service Unavailable",
+        "ERROR: [TikTok] 123: Unable to download webpage: HTTP Error 502: Bad Gateway",
+        "HTTP 429",
+        "Video temporarily unavailable, try again later",
+        "Read timed out",
+    ],
+)
+def test_service_errors_are_not_permanent(message: str) -> None:
+    assert not looks_permanent(message)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "ERROR: [TikTok] 123: Video unavailable",
+        "ERROR: [TikTok] 123: This video is private",
+        "ERROR: [TikTok] 123: Video not available, status code 10204",
+        "HTTP Error 404: Not Found",
+        "Url parsing is failed! Please check url.",
+    ],
+)
+def test_content_errors_are_permanent(message: str) -> None:
+    assert looks_permanent(message)